@@ -0,0 +1,111 @@
+"""
+Benchmark: fixed vs adaptive (AIMD) concurrency against a provider with hidden capacity.
+
+The simulated provider serves up to ``--capacity`` concurrent calls at the
+base latency. Beyond that, latency grows with the overload and a share of
+calls is rejected with 429. A burst of calls goes through the shared
+LLMGateway with a fixed ``max_concurrency`` and then with
+``rate_limits.adaptive`` enabled, starting from the same window. The report
+covers wall time, failed calls, 429s, retries and the final and peak window.
+
+Usage (from python_backend/):
+    python benchmarks/adaptive_concurrency.py [--calls 300] [--capacity 12] [--start 4]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from llm.gateway import LLMGateway
+from utils.metrics import METRICS
+
+
+class RateLimitedError(Exception):
+    def __init__(self):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+
+
+class CapacityProvider:
+    """Fixed latency up to ``capacity`` concurrent calls; slower and 429s above it."""
+
+    def __init__(self, capacity, latency):
+        self.capacity = capacity
+        self.latency = latency
+        self.active = 0
+        self.rejected = 0
+        self.peak = 0
+
+    async def generate(self, prompt, **options):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            overload = self.active - self.capacity
+            if overload > 0 and overload % 2 == 0:
+                self.rejected += 1
+                await asyncio.sleep(self.latency * 0.1)
+                raise RateLimitedError()
+            await asyncio.sleep(self.latency * (1 + max(0, overload) * 0.5))
+            return "ok"
+        finally:
+            self.active -= 1
+
+
+async def run(args, adaptive):
+    METRICS.reset()
+    provider = CapacityProvider(args.capacity, args.latency)
+    config = {
+        "provider": "bench",
+        "model": "bench",
+        "rate_limits": {
+            "max_concurrency": args.start,
+            "requests_per_minute": 10 ** 9,
+            "adaptive": {"enabled": adaptive, "max_concurrency": args.capacity * 4},
+        },
+        "retry": {"max_attempts": 10, "base_delay_seconds": args.latency, "max_delay_seconds": args.latency * 4},
+        "circuit_breaker": {"enabled": False},
+        "single_flight": {"enabled": False},
+    }
+    gateway = LLMGateway(config, client=provider)
+    windows = []
+
+    async def sample_window():
+        while True:
+            windows.append(METRICS.snapshot()["gauges"].get("llm.concurrency_limit{model=bench,provider=bench}", args.start))
+            await asyncio.sleep(args.latency / 2)
+
+    sampler = asyncio.ensure_future(sample_window())
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(gateway.generate(f"call {i}", call_site="bench") for i in range(args.calls)), return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+    retries = sum(v for k, v in METRICS.snapshot()["counters"].items() if k.startswith("llm.retries"))
+    failed = sum(isinstance(r, Exception) for r in results)
+    return elapsed, failed, provider.rejected, retries, windows[-1] if windows else args.start, max(windows or [args.start])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--capacity", type=int, default=12, help="Concurrent calls the provider serves without slowing down")
+    parser.add_argument("--start", type=int, default=4, help="Fixed max_concurrency / starting adaptive window")
+    parser.add_argument("--latency", type=float, default=0.05, help="Base seconds per call")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)  # Retries of injected 429s are expected
+
+    print(f"{args.calls} calls, provider capacity {args.capacity}, starting window {args.start}")
+    print(f"{'mode':<10}{'wall s':>10}{'failed':>8}{'429s':>8}{'retries':>10}{'window':>9}{'peak':>7}")
+    for label, adaptive in (("fixed", False), ("adaptive", True)):
+        elapsed, failed, rejected, retries, window, peak = asyncio.run(run(args, adaptive))
+        print(f"{label:<10}{elapsed:>10.2f}{failed:>8}{rejected:>8}{retries:>10.0f}{window:>9.0f}{peak:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
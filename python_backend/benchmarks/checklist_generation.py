@@ -0,0 +1,138 @@
+"""
+Benchmark: end-to-end checklist generation against the built-in mock provider.
+
+Generates a full checklist (phases -> tasks -> steps) through ChecklistGenerator
+and the shared LLMGateway with ``provider: mock``, so runs are reproducible
+without API keys. Reports wall time for each ``generation_concurrency`` value
+(jobs of the generation graph in flight), plus the critical path of the last
+plan and LLM calls and token usage per call site for the last value.
+
+With ``--adaptive-depth``, tasks judged atomic (``--atomic-rate`` of the mock's
+tasks are flagged ``"atomic": true``) skip step generation; the share of tasks
+skipped is reported by reason.
+
+Usage (from python_backend/):
+    python benchmarks/checklist_generation.py [--items 3] [--latency 0.2] [--runs 3] [--generation-concurrency 1,4]
+        [--council-refinement] [--adaptive-depth] [--atomic-rate 0.3]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core.checklist_generator import ChecklistGenerator
+from council.council_critique import CouncilCritiqueModule
+from llm.gateway import LLMGateway
+from utils.metrics import METRICS
+from utils.prompt_manager import PromptManager
+
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "prompts")
+COUNCIL_PERSONAS = ("Logical_Validator", "Completeness_Checker", "Risk_Assessor", "Clarity_Reviewer")
+
+
+def build_config(args, generation_concurrency=1):
+    """
+    ``llm`` config using the mock provider with a lognormal latency per call.
+    """
+    return {
+        "provider": "mock",
+        "model": "mock",
+        "rate_limits": {"max_concurrency": args.max_concurrency, "requests_per_minute": 100000},
+        "mock": {
+            "seed": args.seed,
+            "items_per_list": args.items,
+            "seconds_per_output_token": args.seconds_per_token,
+            "seconds_per_prompt_token": args.seconds_per_prompt_token,
+            "latency": {"default": {"distribution": "lognormal", "median_seconds": args.latency, "sigma": args.sigma}},
+            "errors": {"rate": args.error_rate},
+            "malformed_rate": args.malformed_rate,
+            "atomic_rate": args.atomic_rate,
+        },
+        "structured_output": {"enabled": not args.no_structured_output},
+        "prompt_cache": {"enabled": not args.no_prompt_cache},
+        "max_phases": args.items,
+        "max_tasks_per_phase": args.items,
+        "max_steps_per_task": args.items,
+        "generation_concurrency": generation_concurrency,
+        "council_refinement": args.council_refinement,
+        "adaptive_depth": {"enabled": args.adaptive_depth},
+    }
+
+
+async def run(args, generation_concurrency):
+    config = build_config(args, generation_concurrency)
+    gateway = LLMGateway(config)
+    prompt_manager = PromptManager(PROMPTS_DIR)
+    council = CouncilCritiqueModule(
+        {"personas": [{"name": name} for name in COUNCIL_PERSONAS]}, prompt_manager, llm_client=gateway
+    )
+    generator = ChecklistGenerator(config, prompt_manager, llm_client=gateway, council_module=council)
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        checklist = await generator.generate_checklist("Build a command-line todo application with persistence")
+        timings.append(time.perf_counter() - started)
+    return timings, gateway.client_for("mock").usage_snapshot(), checklist["metadata"]["schedule"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=3, help="Phases per plan, tasks per phase and steps per task")
+    parser.add_argument("--latency", type=float, default=0.2, help="Median simulated seconds per call")
+    parser.add_argument("--sigma", type=float, default=0.3, help="Lognormal latency spread")
+    parser.add_argument("--seconds-per-token", type=float, default=0.0)
+    parser.add_argument("--seconds-per-prompt-token", type=float, default=0.0, help="Simulated prefill time per uncached prompt token")
+    parser.add_argument("--no-prompt-cache", action="store_true", help="Do not send static prompt prefixes as cache hints")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls failing with a retryable 503")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of JSON responses truncated when no schema is requested")
+    parser.add_argument("--no-structured-output", action="store_true", help="Do not pass response schemas or validate responses")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Provider concurrency cap (rate_limits.max_concurrency)")
+    parser.add_argument("--generation-concurrency", default="1,2,4,8",
+                        help="Comma-separated generation_concurrency values to compare (1 = serial)")
+    parser.add_argument("--council-refinement", action="store_true", help="Review each task's steps with the council")
+    parser.add_argument("--adaptive-depth", action="store_true", help="Skip step generation for atomic tasks")
+    parser.add_argument("--atomic-rate", type=float, default=0.0, help="Share of mock tasks flagged atomic")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.items} items per level, median latency {args.latency}s, {args.runs} runs")
+    print(f"{'concurrency':<14}{'mean s':>10}{'min s':>10}{'max s':>10}{'speedup':>10}")
+    baseline = None
+    METRICS.reset()
+    for concurrency in (int(v) for v in args.generation_concurrency.split(",")):
+        timings, usage, schedule = asyncio.run(run(args, concurrency))
+        mean = sum(timings) / len(timings)
+        baseline = baseline or mean
+        print(f"{concurrency:<14}{mean:>10.3f}{min(timings):>10.3f}{max(timings):>10.3f}{baseline / mean:>9.2f}x")
+    print()
+    print(f"critical path of the last plan ({schedule['wall_seconds']:.3f}s wall):")
+    print(f"{'node':<16}{'ready s':>10}{'start s':>10}{'end s':>10}{'seconds':>10}")
+    for key in schedule["critical_path"]:
+        node = schedule["nodes"][key]
+        print(f"{key:<16}{node['ready']:>10.3f}{node['start']:>10.3f}{node['end']:>10.3f}{node['seconds']:>10.3f}")
+    print()
+    print(f"{'call site':<30}{'calls':>8}{'errors':>8}{'prompt tok':>12}{'cached tok':>12}{'output tok':>12}")
+    for call_site, entry in sorted(usage["call_sites"].items()) + [("total", usage["total"])]:
+        print(
+            f"{call_site:<30}{entry['calls']:>8}{entry['errors']:>8}{entry['prompt_tokens']:>12}"
+            f"{entry['cached_prompt_tokens']:>12}{entry['completion_tokens']:>12}"
+        )
+    decisions = {
+        key: count for key, count in METRICS.snapshot()["counters"].items() if key.startswith("plan.step_decompositions")
+    }
+    if decisions:
+        total = sum(decisions.values())
+        print()
+        print(f"{'step decomposition (all runs)':<50}{'tasks':>8}{'share':>8}")
+        for key, count in sorted(decisions.items()):
+            print(f"{key:<50}{count:>8.0f}{count / total:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
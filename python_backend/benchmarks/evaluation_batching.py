@@ -0,0 +1,107 @@
+"""
+Benchmark: batched vs per-pair alternative evaluation in ReasoningTree.
+
+Runs ``evaluate_alternatives`` against a simulated provider (fixed base latency
+plus per-output-token decode time) through the shared LLMGateway, and reports
+LLM call counts, wall time and estimated prompt tokens for both modes.
+
+Usage (from python_backend/):
+    python benchmarks/evaluation_batching.py [--alternatives 3] [--criteria 4] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core.reasoning_tree import ReasoningTree
+from llm.gateway import LLMGateway
+from llm.tokens import estimate_tokens
+
+CRITERIA = ["clarity", "completeness", "logical_flow", "risks", "coherence", "feasibility"]
+
+
+class EchoPromptManager:
+    """Renders prompts as their name plus arguments (per-pair prompt files are not shipped)."""
+
+    def format_prompt(self, prompt_name, **kwargs):
+        return f"{prompt_name}\n" + "\n".join(f"{k}: {v}" for k, v in kwargs.items())
+
+
+class SimulatedProvider:
+    """Answers evaluation prompts after ``base_latency + output_tokens * seconds_per_token``."""
+
+    def __init__(self, alternatives, criteria, base_latency, seconds_per_token):
+        self.alternatives = alternatives
+        self.criteria = criteria
+        self.base_latency = base_latency
+        self.seconds_per_token = seconds_per_token
+        self.calls = 0
+        self.prompt_tokens = 0
+
+    async def generate(self, prompt, **options):
+        self.calls += 1
+        self.prompt_tokens += estimate_tokens(prompt)
+        if prompt.startswith("evaluate_alternatives_batch"):
+            body = {"evaluations": [
+                {"alternative_idx": i, "criteria": {
+                    c: {"score": 0.5 + 0.1 * i, "justification": "Covers the goal with a reasonable ordering."}
+                    for c in self.criteria
+                }} for i in range(self.alternatives)
+            ]}
+        else:
+            body = {"evaluation": {"score": 0.7, "justification": "Covers the goal with a reasonable ordering."}}
+        text = json.dumps(body)
+        await asyncio.sleep(self.base_latency + estimate_tokens(text) * self.seconds_per_token)
+        return text
+
+
+async def run_mode(batch, args):
+    criteria = CRITERIA[:args.criteria]
+    provider = SimulatedProvider(args.alternatives, criteria, args.base_latency, args.seconds_per_token)
+    gateway = LLMGateway({"rate_limits": {"max_concurrency": args.max_concurrency}}, client=provider)
+    tree = ReasoningTree(
+        {"evaluation_criteria": criteria, "batch_evaluation": batch},
+        EchoPromptManager(),
+        llm_client=gateway
+    )
+    alternatives = [
+        [{"name": f"Alternative {a} phase {p}", "description": "Set up, build and verify the component."} for p in range(5)]
+        for a in range(args.alternatives)
+    ]
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        await tree.evaluate_alternatives("Build a CLI tool", alternatives, "phase")
+        timings.append(time.perf_counter() - started)
+    return {
+        "calls_per_run": provider.calls / args.runs,
+        "prompt_tokens_per_run": provider.prompt_tokens / args.runs,
+        "mean_seconds": sum(timings) / len(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alternatives", type=int, default=3)
+    parser.add_argument("--criteria", type=int, default=4, choices=range(1, len(CRITERIA) + 1))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--base-latency", type=float, default=0.4, help="Simulated seconds per call before decoding")
+    parser.add_argument("--seconds-per-token", type=float, default=0.002, help="Simulated decode time per output token")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Gateway in-flight limit")
+    args = parser.parse_args()
+
+    print(f"{args.alternatives} alternatives x {args.criteria} criteria, {args.runs} runs, concurrency {args.max_concurrency}")
+    print(f"{'mode':<10}{'calls/run':>12}{'prompt tok/run':>16}{'mean s':>10}")
+    for label, batch in (("per-pair", False), ("batched", True)):
+        result = asyncio.run(run_mode(batch, args))
+        print(f"{label:<10}{result['calls_per_run']:>12.1f}{result['prompt_tokens_per_run']:>16.0f}{result['mean_seconds']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark: memory and serialization of the typed plan model vs nested checklist dicts.
+
+Builds a synthetic plan of ``--phases`` x ``--tasks`` x ``--steps`` nodes in
+checklist wire format and compares:
+
+- memory held by the plan as parsed JSON dicts vs as ``core.plan_model.Plan``
+- full serialization (``json.dumps`` with ``indent=2`` and canonical compact
+  JSON) vs ``Plan.canonical_json``, cold, cached, and after replacing one task
+- structural hashing (sha1 over canonical JSON) vs ``Plan.digest``, likewise
+- conversion to and from the wire format (checked to be lossless)
+
+Usage (from python_backend/):
+    python benchmarks/plan_model.py [--phases 20] [--tasks 20] [--steps 10] [--repeat 5]
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core.plan_model import Plan
+
+
+def build_plan(phases, tasks, steps):
+    """
+    Checklist dict shaped like ChecklistGenerator output.
+    """
+    return {
+        "goal": "Build a command-line todo application with persistence",
+        "phases": [
+            {
+                "name": f"Phase {p + 1}: Deliver milestone {p + 1}",
+                "description": f"Everything needed to complete milestone {p + 1} of the application.",
+                "tasks": [
+                    {
+                        "name": f"Task {t + 1} of phase {p + 1}",
+                        "description": f"Implement and verify component {t + 1} of milestone {p + 1}.",
+                        "steps": [
+                            {
+                                "step_id": f"phase{p}_task{t}_step{s}",
+                                "prompt": f"Write the code for part {s + 1} of component {t + 1} and add unit tests.",
+                                "description": f"Part {s + 1} of component {t + 1}.",
+                            }
+                            for s in range(steps)
+                        ],
+                    }
+                    for t in range(tasks)
+                ],
+                "reasoning": {"tasks": {"alternatives": [], "evaluations": [], "justification": "Direct LLM generation"}},
+            }
+            for p in range(phases)
+        ],
+        "metadata": {"context": {}, "reasoning": {}},
+    }
+
+
+def timed(fn, repeat):
+    """
+    Best-of-``repeat`` seconds for ``fn()``.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def held_bytes(factory):
+    """
+    Bytes still allocated after ``factory()`` returns (its result is kept alive).
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = factory()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del value
+    return held
+
+
+def canonical_dump(checklist):
+    body = {k: v for k, v in checklist.items() if k != "metadata"}
+    return json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def replace_one_task(plan):
+    phase = plan.phases[len(plan.phases) // 2]
+    task = phase.tasks[0]
+    return plan.with_phase(len(plan.phases) // 2, phase.with_task(0, task.with_steps(task.steps[:-1])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phases", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    checklist = build_plan(args.phases, args.tasks, args.steps)
+    wire = json.dumps(checklist)
+    plan = Plan.from_dict(checklist)
+    assert plan.to_dict() == checklist, "round trip is not lossless"
+    assert plan.canonical_json() == canonical_dump(checklist)
+    nodes = args.phases * (1 + args.tasks * (1 + args.steps))
+    print(f"{nodes} nodes, {len(wire) / 1e6:.2f} MB of JSON")
+
+    dict_bytes = held_bytes(lambda: json.loads(wire))
+    model_bytes = held_bytes(lambda: Plan.from_dict(json.loads(wire)))
+    print(f"\n{'memory':<40}{'MB':>10}")
+    print(f"{'nested dicts (json.loads)':<40}{dict_bytes / 1e6:>10.2f}")
+    print(f"{'Plan model':<40}{model_bytes / 1e6:>10.2f}")
+
+    def cold():
+        return Plan.from_dict(checklist)
+
+    rows = [
+        ("json.dumps(indent=2)", lambda: json.dumps(checklist, indent=2)),
+        ("json.dumps canonical", lambda: canonical_dump(checklist)),
+        ("canonical_json, cold", lambda: cold().canonical_json()),
+        ("canonical_json, cached", plan.canonical_json),
+        ("canonical_json, one task replaced", lambda: replace_one_task(plan).canonical_json()),
+        ("sha1(json.dumps canonical)", lambda: hashlib.sha1(canonical_dump(checklist).encode("utf-8")).hexdigest()),
+        ("digest, cold", lambda: cold().digest),
+        ("digest, cached", lambda: plan.digest),
+        ("digest, one task replaced", lambda: replace_one_task(plan).digest),
+        ("Plan.from_dict", cold),
+        ("Plan.to_dict", plan.to_dict),
+    ]
+    plan.digest  # Warm the caches used by the "cached" and "one task replaced" rows
+    print(f"\n{'operation':<40}{'ms':>10}")
+    for label, fn in rows:
+        print(f"{label:<40}{timed(fn, args.repeat) * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: checklist payload size with inline, by-reference and omitted reasoning metadata.
+
+Generates a checklist of ``--items`` phases x tasks x steps against the mock
+provider and compares the serialized response and its parsed memory for:
+
+- inline: alternatives stored as copies of the phase/task lists (the format
+  before reasoning metadata referred to the plan by id), reconstructed from
+  the by-reference plan with ``core.reasoning_refs.resolve``
+- by reference: the current format
+- omitted: ``include_reasoning=False``
+
+``--alternatives`` adds that many non-selected alternatives to every
+reasoning entry, as a reasoning tree with several candidates would produce.
+
+Usage (from python_backend/):
+    python benchmarks/reasoning_metadata.py [--items 8] [--alternatives 0]
+"""
+
+import argparse
+import asyncio
+import copy
+import gc
+import json
+import logging
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core import reasoning_refs
+from core.checklist_generator import ChecklistGenerator
+from llm.gateway import LLMGateway
+from utils.prompt_manager import PromptManager
+
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "prompts")
+
+
+def build_config(items):
+    return {
+        "provider": "mock",
+        "model": "mock",
+        "rate_limits": {"max_concurrency": 16, "requests_per_minute": 100000},
+        "mock": {"items_per_list": items},
+        "max_phases": items,
+        "max_tasks_per_phase": items,
+        "max_steps_per_task": items,
+        "generation_concurrency": 16,
+        "journal": {"enabled": False},
+    }
+
+
+def add_alternatives(checklist, count):
+    """
+    Give every reasoning entry ``count`` extra (non-selected) alternatives.
+    """
+    entries = [(checklist["metadata"]["reasoning"], "phases", "phases")]
+    entries += [(phase["reasoning"], "tasks", f"tasks/{p}") for p, phase in enumerate(checklist["phases"])]
+    for reasoning, kind, key in entries:
+        selected = reasoning_refs.resolve(checklist, key)
+        nodes = reasoning.setdefault("nodes", {})
+        for i in range(1, count + 1):
+            ref = f"{key}/alt{i}"
+            nodes[ref] = [{k: v for k, v in item.items() if k in ("name", "description")} for item in selected]
+            reasoning[kind]["alternatives"].append(ref)
+
+
+def inline(checklist):
+    """
+    The checklist with every alternative id replaced by a copy of its list.
+    """
+    expanded = copy.deepcopy(checklist)
+    entries = [(expanded["metadata"]["reasoning"], "phases")]
+    entries += [(phase["reasoning"], "tasks") for phase in expanded["phases"]]
+    for reasoning, kind in entries:
+        entry = reasoning[kind]
+        entry["alternatives"] = [copy.deepcopy(reasoning_refs.resolve(checklist, ref)) for ref in entry["alternatives"]]
+        del entry["selected"]
+    for reasoning, _ in entries:
+        reasoning.pop("nodes", None)
+    return expanded
+
+
+def held_bytes(factory):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = factory()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del value
+    return held
+
+
+async def generate(items, include_reasoning):
+    config = build_config(items)
+    generator = ChecklistGenerator(config, PromptManager(PROMPTS_DIR), llm_client=LLMGateway(config))
+    return await generator.generate_checklist(
+        "Build a command-line todo application with persistence", include_reasoning=include_reasoning
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=8, help="Phases per plan, tasks per phase and steps per task")
+    parser.add_argument("--alternatives", type=int, default=0, help="Extra alternatives per reasoning entry")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    checklist = asyncio.run(generate(args.items, True))
+    add_alternatives(checklist, args.alternatives)
+    bare = asyncio.run(generate(args.items, False))
+    for plan in (checklist, bare):
+        plan["metadata"].pop("schedule", None)  # Timings differ between runs
+
+    print(f"{args.items} items per level, {args.alternatives} extra alternatives per entry")
+    print(f"{'format':<20}{'JSON KB':>10}{'parsed KB':>12}")
+    for label, plan in (("inline", inline(checklist)), ("by reference", checklist), ("omitted", bare)):
+        wire = json.dumps(plan)
+        print(f"{label:<20}{len(wire) / 1e3:>10.1f}{held_bytes(lambda: json.loads(wire)) / 1e3:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
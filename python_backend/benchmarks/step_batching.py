@@ -0,0 +1,125 @@
+"""
+Benchmark: batched vs per-task step generation in ChecklistGenerator.
+
+Generates full checklists against the built-in mock provider with
+``batch_steps`` off (one ``generate_steps`` call per task) and on (one
+``generate_steps_batch`` call per phase), and reports per mode:
+
+- LLM calls, mean wall time and prompt/output tokens
+- per-task fallbacks (tasks the batch left out or got wrong, by reason)
+- a structural quality proxy: the share of tasks whose steps all have a
+  ``step_id`` and a non-empty ``prompt``, and the mean steps per task
+
+``--omission-rate`` makes the mock drop each task from a batched response
+with that probability, to exercise the fallback path.
+
+Usage (from python_backend/):
+    python benchmarks/step_batching.py [--items 4] [--latency 0.2] [--runs 3] [--omission-rate 0.1]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core.checklist_generator import ChecklistGenerator
+from llm.gateway import LLMGateway
+from utils.metrics import METRICS
+from utils.prompt_manager import PromptManager
+
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "prompts")
+
+
+def build_config(args, batch_steps):
+    """
+    ``llm`` config using the mock provider with a lognormal latency per call.
+    """
+    return {
+        "provider": "mock",
+        "model": "mock",
+        "rate_limits": {"max_concurrency": args.max_concurrency, "requests_per_minute": 100000},
+        "mock": {
+            "seed": args.seed,
+            "items_per_list": args.items,
+            "seconds_per_output_token": args.seconds_per_token,
+            "latency": {"default": {"distribution": "lognormal", "median_seconds": args.latency, "sigma": args.sigma}},
+            "batch_omission_rate": args.omission_rate,
+        },
+        "max_phases": args.items,
+        "max_tasks_per_phase": args.items,
+        "max_steps_per_task": args.items,
+        "generation_concurrency": args.generation_concurrency,
+        "batch_steps": batch_steps,
+        "journal": {"enabled": False},
+    }
+
+
+def well_formed(steps):
+    return bool(steps) and all(step.get("step_id") and step.get("prompt") for step in steps)
+
+
+async def run(args, batch_steps):
+    config = build_config(args, batch_steps)
+    gateway = LLMGateway(config)
+    generator = ChecklistGenerator(config, PromptManager(PROMPTS_DIR), llm_client=gateway)
+
+    METRICS.reset()
+    timings = []
+    tasks = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        checklist = await generator.generate_checklist("Build a command-line todo application with persistence")
+        timings.append(time.perf_counter() - started)
+        tasks.extend(task for phase in checklist["phases"] for task in phase["tasks"])
+    fallbacks = {
+        key: count for key, count in METRICS.snapshot()["counters"].items() if key.startswith("plan.batch_step_fallbacks")
+    }
+    return timings, gateway.client_for("mock").usage_snapshot(), tasks, fallbacks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=4, help="Phases per plan, tasks per phase and steps per task")
+    parser.add_argument("--latency", type=float, default=0.2, help="Median simulated seconds per call")
+    parser.add_argument("--sigma", type=float, default=0.3, help="Lognormal latency spread")
+    parser.add_argument("--seconds-per-token", type=float, default=0.0)
+    parser.add_argument("--omission-rate", type=float, default=0.0, help="Chance the mock drops a task from a batched response")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Provider concurrency cap (rate_limits.max_concurrency)")
+    parser.add_argument("--generation-concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.items} items per level, median latency {args.latency}s, omission rate {args.omission_rate}, {args.runs} runs")
+    print(
+        f"{'mode':<12}{'calls':>8}{'mean s':>10}{'prompt tok':>12}{'output tok':>12}"
+        f"{'fallbacks':>11}{'well-formed':>13}{'steps/task':>12}"
+    )
+    details = []
+    for label, batch_steps in (("per-task", False), ("batched", True)):
+        timings, usage, tasks, fallbacks = asyncio.run(run(args, batch_steps))
+        total = usage["total"]
+        formed = sum(well_formed(task.get("steps")) for task in tasks) / len(tasks)
+        steps_per_task = sum(len(task.get("steps") or []) for task in tasks) / len(tasks)
+        print(
+            f"{label:<12}{total['calls'] // args.runs:>8}{sum(timings) / len(timings):>10.3f}"
+            f"{total['prompt_tokens'] // args.runs:>12}{total['completion_tokens'] // args.runs:>12}"
+            f"{sum(fallbacks.values()) / args.runs:>11.1f}{formed:>12.0%}{steps_per_task:>12.2f}"
+        )
+        details.append((label, usage, fallbacks))
+    print("\n(calls, tokens and fallbacks are per plan)")
+
+    for label, usage, fallbacks in details:
+        print(f"\n{label}:")
+        print(f"{'call site':<30}{'calls':>8}{'prompt tok':>12}{'output tok':>12}")
+        for call_site, entry in sorted(usage["call_sites"].items()):
+            print(f"{call_site:<30}{entry['calls']:>8}{entry['prompt_tokens']:>12}{entry['completion_tokens']:>12}")
+        for key, count in sorted(fallbacks.items()):
+            print(f"{key:<50}{count:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Progress events produced while a checklist is generated.
+"""
+
+# Event types, in the order they can first occur
+PHASES_READY = "phases_ready"
+TASKS_READY = "tasks_ready"
+STEPS_READY = "steps_ready"
+DONE = "done"
+
+# Key of the event payload in ``ChecklistEvent.to_dict``
+_PAYLOAD_KEYS = {PHASES_READY: "phases", TASKS_READY: "tasks", STEPS_READY: "steps"}
+
+
+class ChecklistEvent:
+    """
+    A part of the plan that has become final.
+
+    ``phases_ready`` carries the phase list (without tasks), ``tasks_ready``
+    the tasks of phase ``phase_idx`` (without steps), ``steps_ready`` the
+    final steps of task ``task_idx`` of phase ``phase_idx``, and ``done`` the
+    complete checklist. Payloads are snapshots taken when the event was
+    produced; later generation does not change them.
+    """
+
+    __slots__ = ("type", "phase_idx", "task_idx", "data")
+
+    def __init__(self, type, data, phase_idx=None, task_idx=None):
+        self.type = type
+        self.data = data
+        self.phase_idx = phase_idx
+        self.task_idx = task_idx
+
+    def to_dict(self):
+        """
+        JSON-ready form for notifications. ``done`` omits the checklist, which
+        is the result of the request itself.
+        """
+        event = {"event": self.type}
+        if self.phase_idx is not None:
+            event["phaseIndex"] = self.phase_idx
+        if self.task_idx is not None:
+            event["taskIndex"] = self.task_idx
+        if self.type in _PAYLOAD_KEYS:
+            event[_PAYLOAD_KEYS[self.type]] = self.data
+        return event
+
+    def __repr__(self):
+        return f"ChecklistEvent({self.type!r}, phase_idx={self.phase_idx!r}, task_idx={self.task_idx!r})"
+
+
+def phases_ready(phases):
+    return ChecklistEvent(PHASES_READY, [dict(phase) for phase in phases])
+
+
+def tasks_ready(phase_idx, tasks):
+    return ChecklistEvent(TASKS_READY, [dict(task) for task in tasks], phase_idx=phase_idx)
+
+
+def steps_ready(phase_idx, task_idx, steps):
+    return ChecklistEvent(STEPS_READY, list(steps), phase_idx=phase_idx, task_idx=task_idx)
+
+
+def done(checklist):
+    return ChecklistEvent(DONE, checklist)
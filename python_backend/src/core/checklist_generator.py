@@ -5,14 +5,47 @@ Implementation of the hierarchical checklist generator.
 import asyncio
 import json
 import logging # Import logging
+import uuid
 from typing import List, Dict, Any
-from llm_client import LLMClient
 
 # Adjust import paths for the new location
 from exceptions import ChecklistGeneratorError, LLMError
 from utils.prompt_manager import PromptManager
 from core.reasoning_tree import ReasoningTree
 from core.checkpoint_manager import CheckpointManager
+from core.plan_scheduler import PlanScheduler
+from core.plan_store import PlanStore
+from core.generation_journal import GenerationJournal
+from core.decomposition_policy import DecompositionPolicy
+from core import checklist_events
+from core import reasoning_refs
+from llm.gateway import LLMGateway
+from llm.single_flight import SingleFlight
+from llm.structured_output import extract_json, schema_for, validate
+from llm.prompt_budget import PromptBudget
+from utils.metrics import METRICS
+
+# Decomposition depths for lazy plans, shallowest first
+DEPTHS = ("phases", "tasks", "steps")
+
+
+class _GenerationRun:
+    """
+    State shared by the scheduler jobs of one generation: a full plan, a
+    regenerated subtree or a lazy expansion.
+    """
+
+    __slots__ = ("goal", "checklist", "scheduler", "emit", "depth", "journal", "reasoning", "replayed")
+
+    def __init__(self, goal, checklist, scheduler, emit=None, depth="steps", journal=None, reasoning=True):
+        self.goal = goal
+        self.checklist = checklist
+        self.scheduler = scheduler
+        self.emit = emit or (lambda event: None)
+        self.depth = depth  # Deepest level the jobs generate
+        self.journal = journal  # PlanJournal of a resumable plan, or None
+        self.reasoning = reasoning  # Whether to record reasoning metadata
+        self.replayed = 0  # Nodes taken from the journal instead of the LLM
 
 
 class ChecklistGenerator:
@@ -20,7 +53,8 @@ class ChecklistGenerator:
     Generates hierarchical checklists from high-level goals.
     """
 
-    def __init__(self, config, prompt_manager, checkpoint_manager=None, reasoning_tree=None, logger=None):
+    def __init__(self, config, prompt_manager, checkpoint_manager=None, reasoning_tree=None, llm_client=None,
+                 council_module=None, logger=None):
         """
         Initialize the ChecklistGenerator.
 
@@ -29,6 +63,9 @@ class ChecklistGenerator:
             prompt_manager (PromptManager): Prompt manager instance.
             checkpoint_manager (CheckpointManager, optional): Checkpoint manager instance.
             reasoning_tree (ReasoningTree, optional): Reasoning tree instance.
+            llm_client (LLMGateway, optional): Shared LLM gateway. A private one is created if omitted.
+            council_module (CouncilCritiqueModule, optional): Reviews each task's steps when
+                ``council_refinement`` is enabled.
             logger (logging.Logger, optional): Logger instance.
         """
         self.config = config
@@ -38,28 +75,129 @@ class ChecklistGenerator:
         self.reasoning_tree = reasoning_tree
         self.logger = logger or logging.getLogger(self.__class__.__name__) # Get logger
 
-        # Initialize LLM client
-        self.llm_client = LLMClient()
+        # Initialize LLM client (prefer the shared gateway so rate limits apply process-wide)
+        self.llm_client = llm_client or LLMGateway(config)
+
+        # Compacts the growing plan context embedded in each prompt
+        self.prompt_budget = PromptBudget(config.get("prompt_budget", {}), logger=logging.getLogger("PromptBudget"))
 
         # Set decomposition limits
         self.max_phases = config.get("max_phases", 7)
         self.max_tasks_per_phase = config.get("max_tasks_per_phase", 7)
         self.max_steps_per_task = config.get("max_steps_per_task", 10)
 
-    async def generate_checklist(self, goal, context=None):
+        # Upper bound on concurrent generation jobs for one checklist (1 = serial)
+        self.generation_concurrency = max(1, int(config.get("generation_concurrency", 4)))
+
+        # Tasks that are already a single action skip step generation
+        self.decomposition_policy = DecompositionPolicy(config.get("adaptive_depth", {}))
+
+        # Generate the steps of all tasks of a phase in one call instead of one call per task
+        self.batch_steps = config.get("batch_steps", False)
+
+        # Optional council review of every task's steps as part of generation
+        self.council_module = council_module
+        self.council_refinement = bool(config.get("council_refinement", False) and council_module)
+
+        # Record alternatives, evaluations and justifications (by reference) unless a request opts out
+        self.include_reasoning = config.get("include_reasoning", True)
+
+        # Completed nodes per plan id, so a retried plan only makes the missing calls
+        self.journal = GenerationJournal(config.get("journal", {}), logger=logging.getLogger("GenerationJournal"))
+
+        # Lazy plans (generated below full depth) by plan id, expanded on demand
+        self.plan_store = PlanStore(config.get("plan_cache", {}), logger=logging.getLogger("PlanStore"))
+        self._expansions = SingleFlight()
+
+    async def generate_checklist(self, goal, context=None, depth="steps", plan_id=None, include_reasoning=None):
         """
         Generate a hierarchical checklist from a high-level goal.
 
         Args:
             goal (str): The high-level goal.
             context (dict, optional): Additional context information.
+            depth (str, optional): Deepest level to generate: "phases", "tasks" or
+                "steps". Shallower (lazy) plans are kept in the plan store under
+                ``metadata.plan_id`` and grown with ``expand_node``.
+            plan_id (str, optional): Id of the plan, returned as ``metadata.plan_id``.
+                Nodes completed under this id are journaled, so retrying a failed
+                plan with its id (and the same goal and context) only makes the
+                missing LLM calls. A new id is generated if omitted.
+            include_reasoning (bool, optional): Whether to record reasoning metadata
+                (``metadata.reasoning`` and each phase's ``reasoning``); defaults to
+                the ``include_reasoning`` setting. Alternatives in it are ids of
+                lists in the plan or its node tables (see ``core.reasoning_refs``).
 
         Returns:
             dict: Generated hierarchical checklist.
 
         Raises:
+            ValueError: If ``depth`` is not a known depth.
             ChecklistGeneratorError: If the checklist cannot be generated.
         """
+        return await self._build_checklist(goal, context, depth=depth, plan_id=plan_id,
+                                           include_reasoning=include_reasoning)
+
+    async def iter_checklist(self, goal, context=None, depth="steps", plan_id=None, include_reasoning=None):
+        """
+        Generate a checklist, yielding each part of the plan as soon as it is final.
+
+        Yields ``ChecklistEvent``s: ``phases_ready`` once, ``tasks_ready`` per
+        phase, ``steps_ready`` per task (after council refinement, if enabled),
+        in completion order, and finally ``done`` with the full checklist (the
+        same dict ``generate_checklist`` returns). Closing the generator early
+        cancels the remaining generation.
+
+        Args:
+            goal (str): The high-level goal.
+            context (dict, optional): Additional context information.
+            depth (str, optional): Deepest level to generate (see ``generate_checklist``).
+            plan_id (str, optional): Id of the plan, for resuming (see ``generate_checklist``).
+            include_reasoning (bool, optional): Whether to record reasoning metadata (see ``generate_checklist``).
+
+        Raises:
+            ChecklistGeneratorError: If the checklist cannot be generated.
+        """
+        queue = asyncio.Queue()
+
+        async def produce():
+            try:
+                checklist = await self._build_checklist(goal, context, emit=queue.put_nowait, depth=depth,
+                                                        plan_id=plan_id, include_reasoning=include_reasoning)
+            except Exception as e:
+                queue.put_nowait(e)
+            else:
+                queue.put_nowait(checklist_events.done(checklist))
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                event = await queue.get()
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+                if event.type == checklist_events.DONE:
+                    return
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+    async def _build_checklist(self, goal, context=None, emit=None, depth="steps", plan_id=None,
+                               include_reasoning=None):
+        """
+        Generate the checklist, passing progress events to ``emit`` if given.
+
+        Generation runs as a dependency graph on a ``PlanScheduler``: the phase
+        list, then the tasks of each phase, then the steps of each task (and,
+        with ``council_refinement``, a council review of those steps). Each job
+        starts as soon as its parent exists, so the steps of early phases are
+        generated while later phases are still being split into tasks.
+        Per-node timings and the critical path are returned under
+        ``metadata.schedule``.
+        """
+        if depth not in DEPTHS:
+            raise ValueError(f"Unknown plan depth '{depth}' (expected one of {', '.join(DEPTHS)})")
+        journal = None
         try:
             # Initialize context if not provided
             context = context or {}
@@ -70,79 +208,37 @@ class ChecklistGenerator:
                 "phases": [],
                 "metadata": {
                     "context": context,
-                    "reasoning": {}
                 }
             }
-
-            # Generate phases
-            self.logger.info("Generating phases...")
-            phases_result = await self._generate_phases(goal, context)
-            checklist["phases"] = phases_result["selected"]
-            checklist["metadata"]["reasoning"]["phases"] = {
-                "alternatives": phases_result.get("alternatives", []),
-                "evaluations": phases_result.get("evaluations", []),
-                "justification": phases_result.get("justification", "")
-            }
-
-            # Checkpointing logic removed as it's less relevant for RPC calls
-
-            # Generate tasks for each phase
-            self.logger.info("Generating tasks for each phase...")
-            for phase_idx, phase in enumerate(checklist["phases"]):
-                self.logger.info("Generating tasks for Phase %d: %s", phase_idx + 1, phase.get('name', 'Unnamed Phase'))
-                phase_context = {
-                    "goal": goal,
-                    "phase_idx": phase_idx,
-                    "phase_name": phase.get("name"),
-                    "phase_description": phase.get("description"),
-                    "phases": checklist["phases"] # Pass current state
-                }
-
-                tasks_result = await self._generate_tasks(goal, phase_context)
-                phase["tasks"] = tasks_result["selected"]
-                self.logger.info("Tasks generated for Phase %d.", phase_idx + 1)
-
-                if "reasoning" not in phase:
-                    phase["reasoning"] = {}
-
-                phase["reasoning"]["tasks"] = {
-                    "alternatives": tasks_result.get("alternatives", []),
-                    "evaluations": tasks_result.get("evaluations", []),
-                    "justification": tasks_result.get("justification", "")
-                }
-
-                # Checkpointing logic removed
-
-                # Generate steps for each task
-                self.logger.info("Generating steps for each task in Phase %d...", phase_idx + 1)
-                for task_idx, task in enumerate(phase["tasks"]):
-                    self.logger.info("Generating steps for Task %d: %s", task_idx + 1, task.get('name', 'Unnamed Task'))
-                    task_context = {
-                        "goal": goal,
-                        "phase_idx": phase_idx,
-                        "phase_name": phase.get("name"),
-                        "phase_description": phase.get("description"),
-                        "task_idx": task_idx,
-                        "task_name": task.get("name"),
-                        "task_description": task.get("description"),
-                        "phases": checklist["phases"], # Pass current state
-                        "tasks": phase["tasks"] # Pass current tasks in phase
-                    }
-
-                    steps = await self._generate_steps(goal, task_context)
-                    # Ensure steps have unique IDs (if not provided by LLM)
-                    for i, step in enumerate(steps):
-                         if "step_id" not in step:
-                              step["step_id"] = f"phase{phase_idx}_task{task_idx}_step{i}"
-                         # Ensure 'prompt' key exists, maybe using 'description' as fallback
-                         if "prompt" not in step:
-                              step["prompt"] = step.get("description", f"Implement step {i+1} for task '{task.get('name')}'")
-
-
-                    task["steps"] = steps
-                    self.logger.info("Steps generated for Task %d.", task_idx + 1)
-
-                    # Checkpointing logic removed
+            if include_reasoning is None:
+                include_reasoning = self.include_reasoning
+            if include_reasoning:
+                checklist["metadata"]["reasoning"] = {}
+
+            # Journal completed nodes per plan id so a retry resumes where this run stops
+            if self.journal.enabled:
+                plan_id = plan_id or uuid.uuid4().hex
+                journal = self.journal.open(plan_id, goal, context)
+            if plan_id:
+                checklist["metadata"]["plan_id"] = plan_id
+
+            run = _GenerationRun(goal, checklist, self._scheduler(), emit, depth, journal, include_reasoning)
+            run.scheduler.add("phases", lambda: self._phases_job(run, context))
+            await run.scheduler.run()
+            if run.replayed:
+                self.logger.info("Plan %s: %d nodes replayed from its journal.", plan_id, run.replayed)
+                METRICS.increment("plan.journal_replayed_nodes", run.replayed)
+
+            report = run.scheduler.report()
+            checklist["metadata"]["schedule"] = report
+            self.logger.info("Checklist generated in %.2fs (%d nodes); critical path: %s",
+                             report["wall_seconds"], len(report["nodes"]), " -> ".join(report["critical_path"]))
+
+            if depth != "steps":
+                # Lazy plan: keep it so nodes can be expanded on demand
+                checklist["metadata"]["depth"] = depth
+                plan_id = self.plan_store.put(checklist, plan_id)
+                self.logger.info("Stored lazy plan %s (depth '%s').", plan_id, depth)
 
             # Final checkpointing logic removed
 
@@ -152,8 +248,395 @@ class ChecklistGenerator:
             # Catch specific LLM errors if possible
             if "API key not valid" in str(e):
                  raise LLMError(f"LLM API key is not valid. Please check configuration. Original error: {e}")
+            if journal is not None and len(journal):
+                # Completed nodes stay journaled; a retry with the same plan id resumes from them
+                raise ChecklistGeneratorError(f"Failed to generate checklist (plan {plan_id}, "
+                                              f"{len(journal)} nodes journaled): {str(e)}")
             raise ChecklistGeneratorError(f"Failed to generate checklist: {str(e)}")
 
+    async def regenerate_node(self, checklist, phase_idx, task_idx=None, emit=None):
+        """
+        Regenerate one subtree of an existing checklist, using the rest of the plan as context.
+
+        With only ``phase_idx``, the phase keeps its name and description and
+        gets new tasks and steps; with ``task_idx`` too, that task gets new
+        steps. The input checklist is not modified.
+
+        Args:
+            checklist (dict): Checklist as returned by ``generate_checklist``.
+            phase_idx (int): Index of the phase.
+            task_idx (int, optional): Index of the task within the phase.
+            emit (callable, optional): Receives ``ChecklistEvent``s (``tasks_ready``,
+                ``steps_ready``) as parts of the subtree become final.
+
+        Returns:
+            dict: The regenerated phase (``task_idx`` omitted) or task.
+
+        Raises:
+            ValueError: If the path does not exist in the checklist.
+            ChecklistGeneratorError: If the subtree cannot be regenerated.
+        """
+        phases = checklist.get("phases") or []
+        self._resolve_node(checklist, phase_idx, task_idx)
+
+        # Copy the path from the root so the caller's checklist is left untouched
+        if task_idx is None:
+            phase = {k: v for k, v in phases[phase_idx].items() if k not in ("tasks", "reasoning")}
+            task = None
+        else:
+            phase = {**phases[phase_idx], "tasks": list(phases[phase_idx]["tasks"])}
+            task = {k: v for k, v in phase["tasks"][task_idx].items() if k != "steps"}
+            phase["tasks"][task_idx] = task
+        working = {**checklist, "phases": [*phases[:phase_idx], phase, *phases[phase_idx + 1:]]}
+
+        try:
+            run = _GenerationRun(checklist.get("goal", ""), working, self._scheduler(), emit,
+                                 reasoning=self._has_reasoning(checklist))
+            # A task asked to be regenerated always gets new steps from the LLM
+            self._schedule_node(run, phase_idx, phase, task_idx, task, adaptive=False)
+            await run.scheduler.run()
+        except Exception as e:
+            self.logger.error("Subtree regeneration failed: %s", str(e), exc_info=True)
+            raise ChecklistGeneratorError(f"Failed to regenerate plan node: {str(e)}")
+
+        return phase if task is None else task
+
+    async def expand_node(self, plan_id, phase_idx, task_idx=None, emit=None):
+        """
+        Generate the tasks of a phase, or the steps of a task, of a lazy plan on demand.
+
+        The result is added to the stored plan, so expanding the same node again
+        (or concurrently) costs no further LLM calls. The returned node is a
+        copy; later expansions do not change it. Expansions are counted in
+        ``plan.node_expansions`` with ``cached`` "false" (generated), "shared"
+        (joined an in-flight expansion) or "true" (already in the plan).
+
+        Args:
+            plan_id (str): Id of a plan generated with a shallow ``depth``.
+            phase_idx (int): Index of the phase.
+            task_idx (int, optional): Index of the task within the phase.
+            emit (callable, optional): Receives the ``tasks_ready`` or ``steps_ready`` event.
+
+        Returns:
+            dict: The expanded phase (with ``tasks``, but no steps) or task (with ``steps``).
+
+        Raises:
+            KeyError: If the plan id is unknown or has expired.
+            ValueError: If the path does not exist in the plan.
+            ChecklistGeneratorError: If the node cannot be expanded.
+        """
+        plan = self.plan_store.get(plan_id)
+        if plan is None:
+            raise KeyError(f"Unknown or expired plan id '{plan_id}'")
+        phase, task = plan.at(phase_idx, task_idx)
+        level = "tasks" if task is None else "steps"
+        if (phase.tasks if task is None else task.steps) is not None:
+            METRICS.increment("plan.node_expansions", level=level, cached="true")
+            return (phase if task is None else task).to_dict()
+
+        async def expand():
+            # The jobs generate into a working copy; only the expanded node goes back into the store
+            checklist = plan.to_dict()
+            phase, task = self._resolve_node(checklist, phase_idx, task_idx)
+            run = _GenerationRun(checklist.get("goal", ""), checklist, self._scheduler(), emit, depth=level,
+                                 reasoning=self._has_reasoning(checklist))
+            self._schedule_node(run, phase_idx, phase, task_idx, task)
+            await run.scheduler.run()
+            node = phase if task is None else task
+            self.plan_store.update(plan_id, lambda current: current.with_node(phase_idx, task_idx, node))
+            return node
+
+        try:
+            # Concurrent requests for the same node share one expansion
+            result, shared = await self._expansions.run(f"{plan_id}/{phase_idx}/{task_idx}", expand)
+        except Exception as e:
+            self.logger.error("Expansion of plan %s failed: %s", plan_id, str(e), exc_info=True)
+            raise ChecklistGeneratorError(f"Failed to expand plan node: {str(e)}")
+        # Joining an in-flight expansion is not a cache hit; count it separately
+        METRICS.increment("plan.node_expansions", level=level, cached="shared" if shared else "false")
+        return result
+
+    def _resolve_node(self, checklist, phase_idx, task_idx=None):
+        """
+        Look up the phase (and task) at a node path.
+
+        Returns:
+            tuple: (phase, task), with task None if ``task_idx`` is None.
+
+        Raises:
+            ValueError: If the path does not exist in the checklist.
+        """
+        phases = checklist.get("phases") or []
+        if not isinstance(phase_idx, int) or not 0 <= phase_idx < len(phases):
+            raise ValueError(f"Phase index {phase_idx} is out of range (checklist has {len(phases)} phases)")
+        phase = phases[phase_idx]
+        if task_idx is None:
+            return phase, None
+        tasks = phase.get("tasks") or []
+        if not isinstance(task_idx, int) or not 0 <= task_idx < len(tasks):
+            raise ValueError(f"Task index {task_idx} is out of range (phase {phase_idx} has {len(tasks)} tasks)")
+        return phase, tasks[task_idx]
+
+    @staticmethod
+    def _has_reasoning(checklist):
+        # Regenerated and expanded nodes follow the plan's choice of reasoning metadata
+        return "reasoning" in (checklist.get("metadata") or {})
+
+    def _record_reasoning(self, reasoning, kind, key, result):
+        """
+        Store the reasoning behind a generated list under ``reasoning[kind]``,
+        referring to alternatives by id (see ``core.reasoning_refs``).
+        """
+        nodes = reasoning.get("nodes", {})
+        reasoning[kind] = reasoning_refs.compact(result, key, nodes)
+        if nodes:
+            reasoning["nodes"] = nodes
+
+    def _scheduler(self):
+        # At most `generation_concurrency` jobs (LLM calls or council reviews) run at once
+        return PlanScheduler(self.generation_concurrency, logger=logging.getLogger("PlanScheduler"))
+
+    def _schedule_node(self, run, phase_idx, phase, task_idx=None, task=None, adaptive=True):
+        """
+        Schedule generation below one node: a phase's tasks, or a task's steps.
+
+        With ``adaptive`` False, a task gets a step-generation call even if it is atomic.
+        """
+        if task is None:
+            self.logger.info("Generating below Phase %d.", phase_idx + 1)
+            run.scheduler.add(f"tasks/{phase_idx}", lambda: self._tasks_job(run, phase_idx, phase))
+        else:
+            self.logger.info("Generating below Phase %d, Task %d.", phase_idx + 1, task_idx + 1)
+            if not (adaptive and self._skip_decomposition(run, phase_idx, phase, task_idx, task)):
+                self._schedule_steps(run, phase_idx, phase, task_idx, task)
+
+    async def _phases_job(self, run, context):
+        """
+        Generate the phase list, then schedule task generation for every phase.
+        """
+        checklist = run.checklist
+        self.logger.info("Generating phases...")
+        phases_result = await self._journaled(run, "phases", lambda: self._generate_phases(run.goal, context))
+        checklist["phases"] = phases_result["selected"]
+        if run.reasoning:
+            self._record_reasoning(checklist["metadata"]["reasoning"], "phases", "phases", phases_result)
+        run.emit(checklist_events.phases_ready(checklist["phases"]))
+        if run.depth == "phases":
+            return
+
+        self.logger.info("Generating tasks and steps for %d phases (concurrency %d)...",
+                         len(checklist["phases"]), self.generation_concurrency)
+        for phase_idx, phase in enumerate(checklist["phases"]):
+            run.scheduler.add(
+                f"tasks/{phase_idx}",
+                lambda phase_idx=phase_idx, phase=phase: self._tasks_job(run, phase_idx, phase),
+                deps=("phases",),
+            )
+
+    async def _tasks_job(self, run, phase_idx, phase):
+        """
+        Generate the tasks of a phase, then schedule step generation for every task.
+        """
+        self.logger.info("Generating tasks for Phase %d: %s", phase_idx + 1, phase.get('name', 'Unnamed Phase'))
+        phase_context = {
+            "goal": run.goal,
+            "phase_idx": phase_idx,
+            "phase_name": phase.get("name"),
+            "phase_description": phase.get("description"),
+            "phases": run.checklist["phases"] # Pass current state
+        }
+
+        tasks_result = await self._journaled(
+            run, f"tasks/{phase_idx}", lambda: self._generate_tasks(run.goal, phase_context)
+        )
+        phase["tasks"] = tasks_result["selected"]
+        self.logger.info("Tasks generated for Phase %d.", phase_idx + 1)
+
+        if run.reasoning:
+            self._record_reasoning(phase.setdefault("reasoning", {}), "tasks", f"tasks/{phase_idx}", tasks_result)
+        run.emit(checklist_events.tasks_ready(phase_idx, phase["tasks"]))
+        if run.depth != "steps":
+            return
+
+        self.logger.info("Generating steps for each task in Phase %d...", phase_idx + 1)
+        pending = [
+            task_idx for task_idx, task in enumerate(phase["tasks"])
+            if not self._skip_decomposition(run, phase_idx, phase, task_idx, task)
+        ]
+        if self.batch_steps and len(pending) > 1:
+            run.scheduler.add(
+                f"steps/{phase_idx}",
+                lambda: self._steps_batch_job(run, phase_idx, phase, pending),
+                deps=(f"tasks/{phase_idx}",),
+            )
+            return
+        for task_idx in pending:
+            self._schedule_steps(run, phase_idx, phase, task_idx, phase["tasks"][task_idx], deps=(f"tasks/{phase_idx}",))
+
+    def _skip_decomposition(self, run, phase_idx, phase, task_idx, task):
+        """
+        Make an atomic task its own single step, without an LLM call.
+
+        Returns:
+            bool: True if the task was atomic and needs no step job.
+        """
+        reason = self.decomposition_policy.atomic_reason(task)
+        METRICS.increment("plan.step_decompositions", decision=reason or "llm")
+        if reason is None:
+            return False
+        self.logger.info("Task %d of Phase %d is atomic (%s); skipping step generation.", task_idx + 1, phase_idx + 1, reason)
+        self._assign_steps(run, phase_idx, task_idx, task, self.decomposition_policy.single_step(task))
+        self._schedule_refine(run, phase_idx, phase, task_idx, task)
+        return True
+
+    def _schedule_steps(self, run, phase_idx, phase, task_idx, task, deps=()):
+        """
+        Add the step job of a task and, with council refinement, its review job.
+        """
+        key = f"steps/{phase_idx}/{task_idx}"
+        run.scheduler.add(key, lambda: self._steps_job(run, phase_idx, phase, task_idx, task), deps=deps)
+        self._schedule_refine(run, phase_idx, phase, task_idx, task, deps=(key,))
+
+    def _schedule_refine(self, run, phase_idx, phase, task_idx, task, deps=()):
+        """
+        Add the council review job of a task's steps, if council refinement is enabled.
+        """
+        if self.council_refinement:
+            run.scheduler.add(
+                f"refine/{phase_idx}/{task_idx}",
+                lambda: self._refine_job(run, phase_idx, phase, task_idx, task),
+                deps=deps,
+            )
+
+    async def _steps_batch_job(self, run, phase_idx, phase, task_indices):
+        """
+        Generate the steps of several tasks of a phase with one LLM call.
+
+        Tasks whose entry is missing from the response or fails validation fall
+        back to their own step job, as do all tasks if the batched call fails.
+        """
+        tasks = [phase["tasks"][i] for i in task_indices]
+        task_keys = [f"task_{i + 1}" for i in task_indices]
+        self.logger.info("Generating steps for %d tasks of Phase %d in one call...", len(tasks), phase_idx + 1)
+        phase_context = {
+            "goal": run.goal,
+            "phase_idx": phase_idx,
+            "phase_name": phase.get("name"),
+            "phase_description": phase.get("description"),
+            "phases": run.checklist["phases"], # Pass current state
+        }
+        batch_tasks = {
+            key: {"name": task.get("name"), "description": task.get("description")}
+            for key, task in zip(task_keys, tasks)
+        }
+        try:
+            steps_by_task = await self._journaled(
+                run, f"steps/{phase_idx}", lambda: self._generate_steps_batch(run.goal, phase_context, batch_tasks)
+            )
+        except ChecklistGeneratorError as e:
+            self.logger.warning("Batched step generation failed for Phase %d; generating per task: %s", phase_idx + 1, e)
+            METRICS.increment("plan.batch_step_fallbacks", value=len(tasks), reason="batch_failed")
+            steps_by_task = {}
+            failed = True
+        else:
+            failed = False
+
+        steps_schema = schema_for("generate_steps")["properties"]["steps"]
+        for task_idx, key, task in zip(task_indices, task_keys, tasks):
+            steps = steps_by_task.get(key)
+            if not failed:
+                if steps is None:
+                    reason = "missing"
+                elif not steps or validate(steps, steps_schema):
+                    reason = "invalid"
+                else:
+                    self._assign_steps(run, phase_idx, task_idx, task, steps)
+                    self._schedule_refine(run, phase_idx, phase, task_idx, task)
+                    continue
+                self.logger.warning("Batched steps for Task %d of Phase %d were %s; generating them separately.",
+                                    task_idx + 1, phase_idx + 1, reason)
+                METRICS.increment("plan.batch_step_fallbacks", reason=reason)
+            self._schedule_steps(run, phase_idx, phase, task_idx, task)
+
+    async def _steps_job(self, run, phase_idx, phase, task_idx, task):
+        """
+        Generate and normalize the steps of one task.
+        """
+        self.logger.info("Generating steps for Task %d: %s", task_idx + 1, task.get('name', 'Unnamed Task'))
+        task_context = {
+            "goal": run.goal,
+            "phase_idx": phase_idx,
+            "phase_name": phase.get("name"),
+            "phase_description": phase.get("description"),
+            "task_idx": task_idx,
+            "task_name": task.get("name"),
+            "task_description": task.get("description"),
+            "phases": run.checklist["phases"], # Pass current state
+            "tasks": phase["tasks"] # Pass current tasks in phase
+        }
+
+        steps = await self._journaled(
+            run, f"steps/{phase_idx}/{task_idx}", lambda: self._generate_steps(run.goal, task_context)
+        )
+        self._assign_steps(run, phase_idx, task_idx, task, steps)
+
+    def _assign_steps(self, run, phase_idx, task_idx, task, steps):
+        """
+        Normalize generated steps, attach them to their task and report them.
+        """
+        self._number_steps(phase_idx, task_idx, steps)
+        for i, step in enumerate(steps):
+             # Ensure 'prompt' key exists, maybe using 'description' as fallback
+             if "prompt" not in step:
+                  step["prompt"] = step.get("description", f"Implement step {i+1} for task '{task.get('name')}'")
+
+        task["steps"] = steps
+        self.logger.info("Steps generated for Task %d.", task_idx + 1)
+        if not self.council_refinement:
+            run.emit(checklist_events.steps_ready(phase_idx, task_idx, steps))
+
+    @staticmethod
+    def _number_steps(phase_idx, task_idx, steps):
+        """
+        Give steps plan-unique IDs by position, replacing the LLM's own.
+
+        LLMs number steps per task ("step_1", ...), so their IDs repeat across
+        tasks; a batched response repeats them within one call.
+        """
+        for i, step in enumerate(steps):
+            step["step_id"] = f"phase{phase_idx}_task{task_idx}_step{i}"
+
+    async def _refine_job(self, run, phase_idx, phase, task_idx, task):
+        """
+        Run the council critique over a task's freshly generated steps.
+        """
+        context = {
+            "goal": run.goal,
+            "phase_name": phase.get("name"),
+            "task_name": task.get("name"),
+            "task_description": task.get("description"),
+        }
+        # review_and_refine returns the original steps if the council fails
+        task["steps"] = await self._journaled(
+            run, f"refine/{phase_idx}/{task_idx}", lambda: self.council_module.review_and_refine(task["steps"], context)
+        )
+        # The council may add, drop or reorder steps
+        self._number_steps(phase_idx, task_idx, task["steps"])
+        run.emit(checklist_events.steps_ready(phase_idx, task_idx, task["steps"]))
+
+    async def _journaled(self, run, key, produce):
+        """
+        Replay a node's result from the plan's journal, or produce and record it.
+        """
+        if run.journal is None:
+            return await produce()
+        result = run.journal.get(key)
+        if result is not None:
+            run.replayed += 1
+            return result
+        result = await produce()
+        run.journal.record(key, result)
+        return result
 
     async def _generate_phases(self, goal, context):
         """
@@ -167,15 +650,19 @@ class ChecklistGenerator:
             #     # ... reasoning tree logic ...
             # else:
             self.logger.info("Generating phases directly using LLM.")
-            prompt = self.prompt_manager.format_prompt(
-                "generate_phases", # Assumes this prompt exists
-                goal=goal,
-                context=json.dumps(context, indent=2),
-                max_phases=self.max_phases
+            prompt = self.prompt_budget.build_prompt(
+                "generate_phases",
+                context,
+                lambda context_json: self.prompt_manager.format_prompt(
+                    "generate_phases", # Assumes this prompt exists
+                    goal=goal,
+                    context=context_json,
+                    max_phases=self.max_phases
+                )
             )
 
             self.logger.debug("Calling LLM for phase generation...")
-            response = await self._call_llm(prompt)
+            response = await self._call_llm(prompt, "generate_phases")
             self.logger.debug("LLM response received for phase generation.")
             phases = self._parse_json_response(response, "phases") # Use helper
             self.logger.info("Phases generated.")
@@ -198,17 +685,22 @@ class ChecklistGenerator:
         try:
             # Simplified direct generation
             self.logger.info("Generating tasks directly using LLM for phase: %s", phase_context.get('phase_name'))
-            prompt = self.prompt_manager.format_prompt(
-                "generate_tasks", # Assumes this prompt exists
-                goal=goal,
-                phase_name=phase_context.get("phase_name"),
-                phase_description=phase_context.get("phase_description"),
-                context=json.dumps(phase_context, indent=2),
-                max_tasks=self.max_tasks_per_phase
+            prompt = self.prompt_budget.build_prompt(
+                "generate_tasks",
+                phase_context,
+                lambda context_json: self.prompt_manager.format_prompt(
+                    "generate_tasks", # Assumes this prompt exists
+                    goal=goal,
+                    phase_name=phase_context.get("phase_name"),
+                    phase_description=phase_context.get("phase_description"),
+                    context=context_json,
+                    max_tasks=self.max_tasks_per_phase,
+                    atomic_instruction=self.decomposition_policy.task_instruction()
+                )
             )
 
             self.logger.debug("Calling LLM for task generation...")
-            response = await self._call_llm(prompt)
+            response = await self._call_llm(prompt, "generate_tasks")
             self.logger.debug("LLM response received for task generation.")
             tasks = self._parse_json_response(response, "tasks") # Use helper
             self.logger.info("Tasks generated.")
@@ -229,18 +721,22 @@ class ChecklistGenerator:
         """
         try:
             self.logger.info("Generating steps using LLM for task: %s", task_context.get('task_name'))
-            prompt = self.prompt_manager.format_prompt(
-                "generate_steps", # Assumes this prompt exists
-                goal=goal,
-                phase_name=task_context.get("phase_name"),
-                task_name=task_context.get("task_name"),
-                task_description=task_context.get("task_description"),
-                context=json.dumps(task_context, indent=2),
-                max_steps=self.max_steps_per_task
+            prompt = self.prompt_budget.build_prompt(
+                "generate_steps",
+                task_context,
+                lambda context_json: self.prompt_manager.format_prompt(
+                    "generate_steps", # Assumes this prompt exists
+                    goal=goal,
+                    phase_name=task_context.get("phase_name"),
+                    task_name=task_context.get("task_name"),
+                    task_description=task_context.get("task_description"),
+                    context=context_json,
+                    max_steps=self.max_steps_per_task
+                )
             )
 
             self.logger.debug("Calling LLM for step generation...")
-            response = await self._call_llm(prompt)
+            response = await self._call_llm(prompt, "generate_steps")
             self.logger.debug("LLM response received for step generation.")
             steps = self._parse_json_response(response, "steps") # Use helper
             self.logger.info("Steps generated.")
@@ -250,11 +746,49 @@ class ChecklistGenerator:
             self.logger.error("Step generation failed for task %s: %s", task_context.get('task_name'), str(e), exc_info=True)
             raise ChecklistGeneratorError(f"Failed to generate steps: {str(e)}")
 
-    async def _call_llm(self, prompt):
+    async def _generate_steps_batch(self, goal, phase_context, tasks):
+        """
+        Generate steps for all tasks of a phase in one call.
+
+        Args:
+            goal (str): The high-level goal.
+            phase_context (dict): Phase and plan context for the prompt.
+            tasks (dict): Task name and description by task key ("task_1", ...).
+
+        Returns:
+            dict: Step lists by task key, as returned by the LLM (not yet validated).
+        """
+        try:
+            self.logger.info("Generating steps using LLM for %d tasks of phase: %s", len(tasks), phase_context.get('phase_name'))
+            prompt = self.prompt_budget.build_prompt(
+                "generate_steps_batch",
+                phase_context,
+                lambda context_json: self.prompt_manager.format_prompt(
+                    "generate_steps_batch",
+                    goal=goal,
+                    phase_name=phase_context.get("phase_name"),
+                    phase_description=phase_context.get("phase_description"),
+                    tasks=json.dumps(tasks, indent=2, ensure_ascii=False),
+                    context=context_json,
+                    max_steps=self.max_steps_per_task
+                )
+            )
+
+            response = await self._call_llm(prompt, "generate_steps_batch")
+            parsed_json = extract_json(response)
+            steps_by_task = parsed_json.get("steps_by_task") if isinstance(parsed_json, dict) else None
+            if not isinstance(steps_by_task, dict):
+                raise ChecklistGeneratorError("Expected object 'steps_by_task' not found in LLM JSON response.")
+            return steps_by_task
+        except Exception as e:
+            self.logger.error("Batched step generation failed for phase %s: %s", phase_context.get('phase_name'), str(e))
+            raise ChecklistGeneratorError(f"Failed to generate steps: {str(e)}")
+
+    async def _call_llm(self, prompt, call_site=None):
         """
         Call the LLM with the given prompt.
         """
-        return await self.llm_client.generate(prompt)
+        return await self.llm_client.generate(prompt, call_site=call_site)
 
     def _parse_json_response(self, response, expected_key):
         """
@@ -271,18 +805,8 @@ class ChecklistGenerator:
             ChecklistGeneratorError: If parsing fails or the key is missing.
         """
         try:
-            # Clean potential markdown fences
-            if "```json" in response:
-                json_str = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_str = response.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = response.strip()
-
-            # Handle potential escape sequences if needed (basic handling)
-            json_str = json_str.replace('\\n', '\n').replace('\\"', '"')
-
-            parsed_json = json.loads(json_str)
+            # Fenced or prose-wrapped JSON is located without rewriting string escapes
+            parsed_json = extract_json(response)
 
             if expected_key not in parsed_json:
                 raise ChecklistGeneratorError(f"Expected key '{expected_key}' not found in LLM JSON response.")
@@ -0,0 +1,87 @@
+"""
+Per-task decision whether decomposing a task into steps is worth an LLM call.
+"""
+
+import re
+
+# Imperative verbs that name one concrete action. Broad verbs ("build", "design",
+# "implement", "test", ...) are left out: a short task using them is often a whole
+# piece of work.
+ACTION_VERBS = frozenset({
+    "add", "call", "clone", "commit", "compile", "copy", "delete", "disable", "download",
+    "enable", "export", "import", "install", "move", "open", "publish", "push", "register",
+    "remove", "rename", "replace", "restart", "run", "save", "set", "tag", "uninstall", "upload",
+})
+
+# Appended to the generate_tasks instructions when the "atomic" flag is used
+ATOMIC_INSTRUCTION = (
+    ' Also set "atomic" to true for a task that is already a single concrete action'
+    " (it would be one step on its own), and to false for a task that needs to be"
+    ' broken down into several steps (e.g., `{"name": "...", "description": "...", "atomic": true}`).'
+)
+
+_WORD = re.compile(r"[a-z][a-z'-]*")
+
+
+class DecompositionPolicy:
+    """
+    Decides which tasks are atomic: already a single concrete action, so they
+    become one-step tasks without a ``generate_steps`` call.
+
+    A task is atomic if the task-generation output marked it ``"atomic": true``
+    (``use_atomic_flag``), or if its description has at most
+    ``max_description_words`` words and names between one and
+    ``max_action_verbs`` action verbs (``heuristic``). Disabled by default.
+    """
+
+    def __init__(self, config=None):
+        """
+        Initialize the DecompositionPolicy.
+
+        Args:
+            config (dict, optional): The ``decomposition.adaptive_depth`` configuration section.
+        """
+        config = config or {}
+        self.enabled = config.get("enabled", False)
+        self.use_atomic_flag = config.get("use_atomic_flag", True)
+        self.heuristic = config.get("heuristic", True)
+        self.max_description_words = config.get("max_description_words", 12)
+        self.max_action_verbs = config.get("max_action_verbs", 1)
+
+    def atomic_reason(self, task):
+        """
+        Why a task needs no step decomposition, or None if it does.
+
+        Returns:
+            str or None: "atomic_flag" or "heuristic" for an atomic task.
+        """
+        if not self.enabled:
+            return None
+        if self.use_atomic_flag and task.get("atomic") is True:
+            return "atomic_flag"
+        if self.heuristic and self._looks_atomic(task.get("description") or task.get("name") or ""):
+            return "heuristic"
+        return None
+
+    def task_instruction(self):
+        """
+        Extra ``generate_tasks`` instruction asking for the ``atomic`` flag, or "" if it is unused.
+        """
+        return ATOMIC_INSTRUCTION if self.enabled and self.use_atomic_flag else ""
+
+    def _looks_atomic(self, text):
+        words = _WORD.findall(text.lower())
+        if not words or len(words) > self.max_description_words:
+            return False
+        verbs = sum(1 for word in words if word in ACTION_VERBS)
+        return 1 <= verbs <= self.max_action_verbs
+
+    @staticmethod
+    def single_step(task):
+        """
+        The only step of an atomic task: the task's own description.
+
+        It has no ``step_id``, so the generator assigns a plan-unique one.
+        """
+        text = task.get("description") or task.get("name") or ""
+        return [{"prompt": text, "description": text}]
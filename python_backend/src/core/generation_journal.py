@@ -0,0 +1,109 @@
+"""
+Per-plan journal of completed generation nodes, for resuming failed plans.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from llm.single_flight import request_key
+from utils.metrics import METRICS
+
+
+class PlanJournal:
+    """
+    Completed node results of one plan, keyed by scheduler node key
+    ("phases", "tasks/0", "steps/0/1", ...).
+
+    Results are stored as JSON, so later in-place changes to the plan do not
+    alter them and every replay gets a fresh copy.
+    """
+
+    __slots__ = ("plan_id", "fingerprint", "entries", "last_used")
+
+    def __init__(self, plan_id, fingerprint, last_used):
+        self.plan_id = plan_id
+        self.fingerprint = fingerprint
+        self.entries = {}
+        self.last_used = last_used
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        The recorded result of a node, or None.
+        """
+        entry = self.entries.get(key)
+        return None if entry is None else json.loads(entry)
+
+    def record(self, key, result):
+        self.entries[key] = json.dumps(result, ensure_ascii=False)
+
+
+class GenerationJournal:
+    """
+    Journals of recently generated plans, by plan id.
+
+    A request that names an existing plan id with the same goal and context
+    gets that plan's journal back, so nodes that completed before a failure
+    are replayed instead of regenerated. A different goal or context under
+    the same id starts a fresh journal. Journals live in memory; the least
+    recently used are dropped beyond ``max_plans``, and any unused for
+    ``ttl_seconds`` expire.
+    """
+
+    def __init__(self, config=None, logger=None, clock=time.monotonic):
+        """
+        Initialize the GenerationJournal.
+
+        Args:
+            config (dict, optional): The ``decomposition.journal`` configuration section.
+            logger (logging.Logger, optional): Logger instance.
+            clock (callable, optional): Monotonic clock, injectable for benchmarks.
+        """
+        config = config or {}
+        self.enabled = config.get("enabled", True)
+        self.max_plans = max(1, int(config.get("max_plans", 100)))
+        self.ttl_seconds = config.get("ttl_seconds", 3600)
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._clock = clock
+        self._journals = OrderedDict()
+
+    def open(self, plan_id, goal, context):
+        """
+        The journal for a plan, resumed if one exists for the same request.
+
+        Args:
+            plan_id (str): Plan id.
+            goal (str): The plan's goal.
+            context (dict): The plan's request context.
+
+        Returns:
+            PlanJournal: The plan's journal (possibly empty).
+        """
+        self._evict()
+        fingerprint = request_key(goal, context)
+        journal = self._journals.get(plan_id)
+        if journal is not None and journal.fingerprint != fingerprint:
+            self.logger.info("Plan %s was requested with a different goal or context; starting over.", plan_id)
+            journal = None
+        if journal is None:
+            journal = PlanJournal(plan_id, fingerprint, self._clock())
+            self._journals[plan_id] = journal
+        elif journal.entries:
+            self.logger.info("Resuming plan %s with %d journaled nodes.", plan_id, len(journal))
+            METRICS.increment("plan.journal_resumes")
+        journal.last_used = self._clock()
+        self._journals.move_to_end(plan_id)
+        self._evict()
+        return journal
+
+    def _evict(self):
+        if self.ttl_seconds:
+            cutoff = self._clock() - self.ttl_seconds
+            while self._journals and next(iter(self._journals.values())).last_used < cutoff:
+                self._journals.popitem(last=False)
+        while len(self._journals) > self.max_plans:
+            self._journals.popitem(last=False)
@@ -0,0 +1,313 @@
+"""
+Compact typed plan model: phases, tasks and steps with stable IDs.
+"""
+
+import hashlib
+import json
+import uuid
+
+
+def _canonical(value):
+    """
+    Deterministic JSON: sorted keys, no padding whitespace.
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+# Stands in for the child list while a node's own fields are serialized
+_CHILDREN_PLACEHOLDER = f"<children {uuid.uuid4().hex}>"
+_RENDERED_PLACEHOLDER = json.dumps(_CHILDREN_PLACEHOLDER)
+
+
+class PlanNode:
+    """
+    Base of the plan node types.
+
+    Nodes are slotted and treated as immutable: ``with_*`` methods return a
+    new node that shares every unchanged child, so the cached canonical JSON
+    and digests of untouched subtrees stay valid.
+
+    ``to_dict``/``from_dict`` convert losslessly to and from the checklist
+    wire format: keys the model has no field for (``reasoning``, extra LLM
+    output, ...) are kept in ``extra``, and a node whose children were never
+    generated (a lazy plan) keeps ``None`` rather than an empty list.
+    """
+
+    __slots__ = ("node_id", "extra", "_json", "_digest")
+
+    FIELDS = ()  # Wire keys stored in typed slots, in wire order
+    CHILDREN = None  # Wire key of the child list, if any
+
+    def _init(self, node_id, extra):
+        self.node_id = node_id
+        self.extra = extra or None  # None instead of empty dicts keeps small nodes small
+        self._json = None
+        self._digest = None
+
+    def _children(self):
+        return None
+
+    def _fields(self):
+        """
+        Wire key/value pairs other than the children, in wire order.
+        """
+        pairs = [(key, getattr(self, key)) for key in self.FIELDS if getattr(self, key) is not None]
+        if self.extra:
+            pairs.extend(self.extra.items())
+        return pairs
+
+    def to_dict(self):
+        """
+        The node in checklist wire format (a new dict on every call).
+        """
+        data = dict(self._fields())
+        children = self._children()
+        if children is not None:
+            data[self.CHILDREN] = [child.to_dict() for child in children]
+        return data
+
+    def canonical_json(self):
+        """
+        Compact JSON with sorted keys, cached per node.
+
+        Identical to ``json.dumps(self.to_dict(), sort_keys=True,
+        separators=(",", ":"), ensure_ascii=False)``, but built from the
+        children's cached strings, so re-serializing after a change only
+        renders the changed path.
+        """
+        if self._json is None:
+            fields = dict(self._fields())
+            children = self._children()
+            if children is None:
+                self._json = _canonical(fields)
+            else:
+                # One dumps call per node: render the children list into a placeholder's sorted position
+                fields[self.CHILDREN] = _CHILDREN_PLACEHOLDER
+                rendered = "[" + ",".join(child.canonical_json() for child in children) + "]"
+                self._json = _canonical(fields).replace(_RENDERED_PLACEHOLDER, rendered, 1)
+        return self._json
+
+    @property
+    def digest(self):
+        """
+        Structural hash (hex) for cache keys, cached per node.
+
+        Computed from the node's own fields and its children's digests (a
+        Merkle hash), so it never serializes a subtree whose digest is known.
+        """
+        if self._digest is None:
+            children = self._children()
+            own = self.canonical_json() if children is None else _canonical(dict(self._fields()))
+            h = hashlib.sha1(own.encode("utf-8"))
+            if children is not None:
+                h.update(b"[")
+                for child in children:
+                    h.update(child.digest.encode("ascii"))
+                h.update(b"]")
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.node_id!r})"
+
+
+def _split(data, fields, children_key=None):
+    """
+    Split a wire dict into typed fields and extras.
+
+    Keys present with a null value go to the extras so they survive the round trip.
+    """
+    values = {}
+    extra = {}
+    for key, value in data.items():
+        if key == children_key:
+            continue
+        if key in fields and value is not None:
+            values[key] = value
+        else:
+            extra[key] = value
+    return values, extra
+
+
+class Step(PlanNode):
+    """
+    A single executable step. ``node_id`` is its position,
+    ``phase{p}_task{t}_step{i}``, which the generator also uses as the wire
+    ``step_id``; a plan from elsewhere may carry other (even repeated)
+    ``step_id`` values, so they are kept as a field rather than used as the id.
+    """
+
+    __slots__ = ("step_id", "prompt", "description")
+
+    FIELDS = ("step_id", "prompt", "description")
+
+    def __init__(self, node_id, step_id=None, prompt=None, description=None, extra=None):
+        self.step_id = step_id
+        self.prompt = prompt
+        self.description = description
+        self._init(node_id, extra)
+
+    @classmethod
+    def from_dict(cls, data, node_id):
+        values, extra = _split(data, cls.FIELDS)
+        return cls(node_id, extra=extra, **values)
+
+
+class Task(PlanNode):
+    """
+    A task and its steps (``None`` until generated). ``node_id`` is ``phase{p}_task{t}``.
+    """
+
+    __slots__ = ("name", "description", "steps")
+
+    FIELDS = ("name", "description")
+    CHILDREN = "steps"
+
+    def __init__(self, node_id, name=None, description=None, steps=None, extra=None):
+        self.name = name
+        self.description = description
+        self.steps = None if steps is None else tuple(steps)
+        self._init(node_id, extra)
+
+    def _children(self):
+        return self.steps
+
+    @classmethod
+    def from_dict(cls, data, node_id):
+        values, extra = _split(data, cls.FIELDS, cls.CHILDREN)
+        steps = data.get(cls.CHILDREN)
+        if steps is not None:
+            steps = [Step.from_dict(step, f"{node_id}_step{i}") for i, step in enumerate(steps)]
+        return cls(node_id, steps=steps, extra=extra, **values)
+
+    def with_steps(self, steps):
+        return Task(self.node_id, self.name, self.description, steps, self.extra)
+
+
+class Phase(PlanNode):
+    """
+    A phase and its tasks (``None`` until generated). ``node_id`` is ``phase{p}``.
+    """
+
+    __slots__ = ("name", "description", "tasks")
+
+    FIELDS = ("name", "description")
+    CHILDREN = "tasks"
+
+    def __init__(self, node_id, name=None, description=None, tasks=None, extra=None):
+        self.name = name
+        self.description = description
+        self.tasks = None if tasks is None else tuple(tasks)
+        self._init(node_id, extra)
+
+    def _children(self):
+        return self.tasks
+
+    @classmethod
+    def from_dict(cls, data, node_id):
+        values, extra = _split(data, cls.FIELDS, cls.CHILDREN)
+        tasks = data.get(cls.CHILDREN)
+        if tasks is not None:
+            tasks = [Task.from_dict(task, f"{node_id}_task{i}") for i, task in enumerate(tasks)]
+        return cls(node_id, tasks=tasks, extra=extra, **values)
+
+    def with_tasks(self, tasks):
+        return Phase(self.node_id, self.name, self.description, tasks, self.extra)
+
+    def with_task(self, task_idx, task):
+        tasks = list(self.tasks)
+        tasks[task_idx] = task
+        return self.with_tasks(tasks)
+
+
+class Plan(PlanNode):
+    """
+    A whole checklist. ``metadata`` is kept as a plain dict and, unlike the
+    goal and phases, is not part of ``canonical_json`` or the digest (it
+    holds timings and ids that differ between otherwise identical plans).
+    """
+
+    __slots__ = ("goal", "phases", "metadata")
+
+    FIELDS = ("goal",)
+    CHILDREN = "phases"
+
+    def __init__(self, goal, phases=(), metadata=None, extra=None):
+        self.goal = goal
+        self.phases = tuple(phases)
+        self.metadata = metadata
+        self._init("plan", extra)
+
+    def _children(self):
+        return self.phases
+
+    def to_dict(self):
+        data = super().to_dict()
+        if self.metadata is not None:
+            data["metadata"] = self.metadata
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        values, extra = _split(data, cls.FIELDS, cls.CHILDREN)
+        extra.pop("metadata", None)
+        phases = [Phase.from_dict(phase, f"phase{i}") for i, phase in enumerate(data.get(cls.CHILDREN) or [])]
+        return cls(values.get("goal"), phases, data.get("metadata"), extra)
+
+    def with_phase(self, phase_idx, phase):
+        phases = list(self.phases)
+        phases[phase_idx] = phase
+        return Plan(self.goal, phases, self.metadata, self.extra)
+
+    def at(self, phase_idx, task_idx=None):
+        """
+        The phase (and task) at a node path.
+
+        Returns:
+            tuple: (Phase, Task), with the task None if ``task_idx`` is None.
+
+        Raises:
+            ValueError: If the path does not exist in the plan.
+        """
+        if not isinstance(phase_idx, int) or not 0 <= phase_idx < len(self.phases):
+            raise ValueError(f"Phase index {phase_idx} is out of range (checklist has {len(self.phases)} phases)")
+        phase = self.phases[phase_idx]
+        if task_idx is None:
+            return phase, None
+        tasks = phase.tasks or ()
+        if not isinstance(task_idx, int) or not 0 <= task_idx < len(tasks):
+            raise ValueError(f"Task index {task_idx} is out of range (phase {phase_idx} has {len(tasks)} tasks)")
+        return phase, tasks[task_idx]
+
+    def with_node(self, phase_idx, task_idx, data):
+        """
+        A plan with the phase (``task_idx`` None) or task at a path replaced by a wire dict.
+
+        Every other phase and task is shared with this plan.
+        """
+        phase = self.phases[phase_idx]
+        if task_idx is None:
+            return self.with_phase(phase_idx, Phase.from_dict(data, phase.node_id))
+        task = Task.from_dict(data, phase.tasks[task_idx].node_id)
+        return self.with_phase(phase_idx, phase.with_task(task_idx, task))
+
+    def node(self, node_id):
+        """
+        Find a phase, task or step by ``node_id``, or None.
+        """
+        for phase in self.phases:
+            if phase.node_id == node_id:
+                return phase
+            for task in phase.tasks or ():
+                if task.node_id == node_id:
+                    return task
+                for step in task.steps or ():
+                    if step.node_id == node_id:
+                        return step
+        return None
@@ -0,0 +1,181 @@
+"""
+Dependency-graph scheduler for checklist generation jobs.
+"""
+
+import asyncio
+import logging
+import time
+
+
+class PlanNode:
+    """
+    One generation job (a phase list, a phase's tasks, a task's steps, ...) and its timings.
+
+    Times are seconds on the scheduler's clock; ``ready_at`` is when the last
+    dependency finished, ``started_at`` when the job got a concurrency slot.
+    """
+
+    __slots__ = ("key", "deps", "job", "added_at", "ready_at", "started_at", "finished_at", "future")
+
+    def __init__(self, key, deps, job, added_at):
+        self.key = key
+        self.deps = tuple(deps)
+        self.job = job
+        self.added_at = added_at
+        self.ready_at = None
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    @property
+    def duration(self):
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class PlanScheduler:
+    """
+    Runs generation jobs as a dependency graph: each node starts as soon as all
+    of its dependencies have finished, with at most ``concurrency`` jobs
+    running at a time.
+
+    Jobs may add further nodes while they run (a phase's task job adds the
+    step jobs of the tasks it produced), so the graph unfolds as the plan is
+    generated and independent branches are pipelined: steps for phase 1's tasks
+    run while phase 2's tasks are still being generated. If a job fails, every
+    other node is cancelled and the error is re-raised from ``run``.
+
+    ``report`` returns per-node timings and the critical path, the chain of
+    nodes that determined the total wall time.
+    """
+
+    def __init__(self, concurrency=4, logger=None, clock=time.perf_counter):
+        """
+        Initialize the PlanScheduler.
+
+        Args:
+            concurrency (int, optional): Maximum jobs running at once (1 = serial).
+            logger (logging.Logger, optional): Logger instance.
+            clock (callable, optional): Monotonic clock, injectable for benchmarks.
+        """
+        self.concurrency = max(1, int(concurrency))
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._clock = clock
+        self._limiter = asyncio.Semaphore(self.concurrency)
+        self._nodes = {}
+        self._started_at = None
+
+    def add(self, key, job, deps=()):
+        """
+        Schedule a job.
+
+        Args:
+            key (str): Unique node key, e.g. "tasks/0".
+            job (callable): Coroutine function called with no arguments; its result becomes the node's result.
+            deps (iterable, optional): Keys of nodes that must finish first. They must already be added.
+
+        Returns:
+            PlanNode: The scheduled node.
+        """
+        if key in self._nodes:
+            raise ValueError(f"Duplicate plan node '{key}'")
+        missing = [dep for dep in deps if dep not in self._nodes]
+        if missing:
+            raise ValueError(f"Plan node '{key}' depends on unknown nodes: {missing}")
+        node = PlanNode(key, deps, job, self._now())
+        node.future = asyncio.ensure_future(self._run_node(node))
+        self._nodes[key] = node
+        return node
+
+    def result(self, key):
+        """
+        Result of a finished node.
+        """
+        return self._nodes[key].future.result()
+
+    async def run(self):
+        """
+        Wait until every node, including nodes added while running, has finished.
+
+        Raises:
+            Exception: The first job failure; all unfinished nodes are cancelled.
+        """
+        if self._started_at is None:
+            self._started_at = self._clock()
+        try:
+            while True:
+                pending = [node.future for node in self._nodes.values() if not node.future.done()]
+                if not pending:
+                    break
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+                for future in done:
+                    if not future.cancelled() and future.exception() is not None:
+                        raise future.exception()
+        finally:
+            for node in self._nodes.values():
+                if not node.future.done():
+                    node.future.cancel()
+
+    async def _run_node(self, node):
+        if node.deps:
+            await asyncio.gather(*(self._nodes[dep].future for dep in node.deps))
+        node.ready_at = self._now()
+        async with self._limiter:
+            node.started_at = self._now()
+            try:
+                return await node.job()
+            finally:
+                node.finished_at = self._now()
+
+    def _now(self):
+        if self._started_at is None:
+            self._started_at = self._clock()
+        return self._clock() - self._started_at
+
+    def critical_path(self):
+        """
+        Keys of the chain of nodes that ended last, following at each step the
+        dependency that finished last (the one that held the node back).
+
+        Returns:
+            list: Node keys from the root to the last node to finish.
+        """
+        finished = [node for node in self._nodes.values() if node.finished_at is not None]
+        if not finished:
+            return []
+        node = max(finished, key=lambda n: n.finished_at)
+        path = [node.key]
+        while node.deps:
+            node = max((self._nodes[dep] for dep in node.deps), key=lambda n: n.finished_at or 0.0)
+            path.append(node.key)
+        return path[::-1]
+
+    def report(self):
+        """
+        Per-node timings and the critical path.
+
+        Returns:
+            dict: ``wall_seconds``, ``critical_path`` (node keys), and ``nodes``
+            mapping each key to its ``deps`` and its ``ready``, ``start`` and
+            ``end`` offsets and ``seconds`` (all in seconds, rounded to ms).
+        """
+        nodes = {}
+        for node in self._nodes.values():
+            nodes[node.key] = {
+                "deps": list(node.deps),
+                "ready": _round(node.ready_at),
+                "start": _round(node.started_at),
+                "end": _round(node.finished_at),
+                "seconds": _round(node.duration),
+            }
+        ends = [node.finished_at for node in self._nodes.values() if node.finished_at is not None]
+        return {
+            "wall_seconds": _round(max(ends) if ends else 0.0),
+            "critical_path": self.critical_path(),
+            "nodes": nodes,
+        }
+
+
+def _round(value):
+    return None if value is None else round(value, 3)
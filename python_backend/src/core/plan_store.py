@@ -0,0 +1,102 @@
+"""
+Server-side store of partially generated (lazy) plans, keyed by plan id.
+"""
+
+import logging
+import time
+import uuid
+from collections import OrderedDict
+
+from core.plan_model import Plan
+
+
+class PlanStore:
+    """
+    Least-recently-used store of checklists by plan id.
+
+    Plans are dropped once ``max_plans`` is exceeded (least recently used
+    first) or when they have not been used for ``ttl_seconds``. They are kept
+    as immutable ``Plan`` models rather than the caller's dicts: an expanded
+    node replaces its subtree in a new ``Plan`` that shares every other node,
+    and nothing handed out to a caller is changed later.
+    """
+
+    def __init__(self, config=None, logger=None, clock=time.monotonic):
+        """
+        Initialize the PlanStore.
+
+        Args:
+            config (dict, optional): The ``decomposition.plan_cache`` configuration section.
+            logger (logging.Logger, optional): Logger instance.
+            clock (callable, optional): Monotonic clock, injectable for benchmarks.
+        """
+        config = config or {}
+        self.max_plans = max(1, int(config.get("max_plans", 100)))
+        self.ttl_seconds = config.get("ttl_seconds", 3600)
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._clock = clock
+        self._plans = OrderedDict()  # plan_id -> (Plan, last_used)
+
+    def __len__(self):
+        return len(self._plans)
+
+    def put(self, checklist, plan_id=None):
+        """
+        Store a checklist and record its id under ``metadata.plan_id``.
+
+        Args:
+            checklist (dict): The checklist, in wire format.
+            plan_id (str, optional): Id to store it under; a new one is generated if omitted.
+
+        Returns:
+            str: The plan id.
+        """
+        plan_id = plan_id or uuid.uuid4().hex
+        checklist.setdefault("metadata", {})["plan_id"] = plan_id
+        self._store(plan_id, Plan.from_dict(checklist))
+        return plan_id
+
+    def update(self, plan_id, change):
+        """
+        Replace a stored plan with ``change(plan)``.
+
+        The change is applied to the plan as stored now, so changes made
+        since the caller read it (e.g., a concurrent expansion of another
+        node) are kept.
+
+        Returns:
+            Plan or None: The new plan, or None if the id is unknown or expired.
+        """
+        plan = self.get(plan_id)
+        if plan is None:
+            return None
+        plan = change(plan)
+        self._store(plan_id, plan)
+        return plan
+
+    def get(self, plan_id):
+        """
+        The stored ``Plan``, or None if the id is unknown or expired.
+        """
+        self._evict()
+        entry = self._plans.get(plan_id)
+        if entry is None:
+            return None
+        self._plans[plan_id] = (entry[0], self._clock())
+        self._plans.move_to_end(plan_id)
+        return entry[0]
+
+    def _store(self, plan_id, plan):
+        self._plans[plan_id] = (plan, self._clock())
+        self._plans.move_to_end(plan_id)
+        self._evict()
+
+    def _evict(self):
+        if self.ttl_seconds:
+            cutoff = self._clock() - self.ttl_seconds
+            while self._plans and next(iter(self._plans.values()))[1] < cutoff:
+                plan_id, _ = self._plans.popitem(last=False)
+                self.logger.debug("Plan %s expired.", plan_id)
+        while len(self._plans) > self.max_plans:
+            plan_id, _ = self._plans.popitem(last=False)
+            self.logger.debug("Plan %s evicted (store holds %d plans).", plan_id, self.max_plans)
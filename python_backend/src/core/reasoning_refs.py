@@ -0,0 +1,80 @@
+"""
+Reasoning metadata that refers to plan content by id instead of copying it.
+
+Alternatives are referred to by id. The id of a list in the plan is its
+generation node key: "phases" for the phase list, "tasks/{p}" for the tasks
+of phase ``p``. The alternative that was selected is the plan's own list, so
+its id is that key. Every other alternative is kept once in the ``nodes``
+table next to the reasoning that produced it, under "{key}/alt{i}":
+``metadata.reasoning.nodes`` for phase alternatives and
+``phases[p].reasoning.nodes`` for task alternatives. This keeps a regenerated
+or expanded phase self-contained.
+"""
+
+
+def compact(result, key, nodes):
+    """
+    Reasoning metadata for one generation result, with ids in place of content.
+
+    Args:
+        result (dict): Generation result with ``selected``, ``alternatives``,
+            ``evaluations`` and ``justification``.
+        key (str): Node key of the selected list in the plan ("phases", "tasks/{p}").
+        nodes (dict): Node table of the reasoning's owner; non-selected
+            alternatives are added to it.
+
+    Returns:
+        dict: ``{"selected", "alternatives", "evaluations", "justification"}``;
+        evaluations name their alternative by id (``alternative``) rather
+        than by index (``alternative_idx``).
+    """
+    selected = result.get("selected")
+    refs = []
+    for i, alternative in enumerate(result.get("alternatives", [])):
+        if alternative is selected or alternative == selected:
+            refs.append(key)
+        else:
+            ref = f"{key}/alt{i}"
+            nodes[ref] = alternative
+            refs.append(ref)
+
+    evaluations = []
+    for evaluation in result.get("evaluations", []):
+        idx = evaluation.get("alternative_idx") if isinstance(evaluation, dict) else None
+        if isinstance(idx, int) and 0 <= idx < len(refs):
+            evaluation = {"alternative": refs[idx], **{k: v for k, v in evaluation.items() if k != "alternative_idx"}}
+        evaluations.append(evaluation)
+
+    return {
+        "selected": key,
+        "alternatives": refs,
+        "evaluations": evaluations,
+        "justification": result.get("justification", ""),
+    }
+
+
+def resolve(checklist, ref):
+    """
+    The phase or task list an alternative id refers to.
+
+    Args:
+        checklist (dict): Checklist as returned by ``ChecklistGenerator.generate_checklist``.
+        ref (str): Alternative id from its reasoning metadata.
+
+    Returns:
+        list or None: The list, or None if the id does not resolve (for example
+        because reasoning metadata was not requested).
+    """
+    phases = checklist.get("phases") or []
+    if ref == "phases":
+        return phases
+    if ref.startswith("phases/"):
+        return (checklist.get("metadata") or {}).get("reasoning", {}).get("nodes", {}).get(ref)
+
+    parts = ref.split("/")
+    if parts[0] != "tasks" or len(parts) < 2 or not parts[1].isdigit() or int(parts[1]) >= len(phases):
+        return None
+    phase = phases[int(parts[1])]
+    if len(parts) == 2:
+        return phase.get("tasks")
+    return (phase.get("reasoning") or {}).get("nodes", {}).get(ref)
@@ -6,11 +6,13 @@ import asyncio
 import json
 import logging # Import logging
 from typing import List, Dict, Any
-from llm_client import LLMClient
 
 # Adjust import paths
 from exceptions import ReasoningTreeError, LLMError
 from utils.prompt_manager import PromptManager
+from llm.gateway import LLMGateway
+from llm.structured_output import extract_json
+from utils.metrics import METRICS
 
 
 class ReasoningTree:
@@ -25,21 +27,21 @@ class ReasoningTree:
         Args:
             config (dict): Reasoning tree configuration.
             prompt_manager (PromptManager): Prompt manager instance.
-            llm_client: LLM client instance (Note: This might be redundant if client is configured globally).
+            llm_client (LLMGateway, optional): Shared LLM gateway. A private one is created if omitted.
             logger (logging.Logger, optional): Logger instance.
         """
         self.config = config
         self.prompt_manager = prompt_manager
         self.logger = logger or logging.getLogger(self.__class__.__name__) # Get logger
-        
-        if llm_client == None:
-            self.llm_client = LLMClient()
-        
+
+        self.llm_client = llm_client or LLMGateway(config)
+
         self.alternatives_count = config.get("alternatives_count", 3)
         self.evaluation_criteria = config.get("evaluation_criteria", [
             "risks", "coherence", "completeness", "clarity"
         ])
         self.enabled = config.get("enabled", True) # Control if reasoning tree logic is active
+        self.batch_evaluation = config.get("batch_evaluation", True) # Score all alternatives/criteria in one call
         
         # Store decomposition limits from the merged config
         self.max_phases = config.get("max_phases", 7)
@@ -85,7 +87,7 @@ class ReasoningTree:
 
             prompt = self.prompt_manager.format_prompt(prompt_name, **prompt_args)
 
-            response = await self._call_llm(prompt)
+            response = await self._call_llm(prompt, prompt_name)
 
             # Parse the response to extract alternatives
             alternatives = self._parse_alternatives(response, node_type)
@@ -122,7 +124,7 @@ class ReasoningTree:
 
             prompt = self.prompt_manager.format_prompt(prompt_name, **prompt_args)
 
-            response = await self._call_llm(prompt)
+            response = await self._call_llm(prompt, prompt_name)
 
             # Parse the response to extract the alternative list (even if just one)
             # Use the same parsing logic as the main generator
@@ -150,19 +152,31 @@ class ReasoningTree:
 
         try:
             self.logger.info("Evaluating %d alternative sets for %s node using criteria: %s", len(alternatives), node_type, self.evaluation_criteria)
-            evaluation_tasks = []
-
-            for alt_idx, alternative in enumerate(alternatives):
-                self.logger.debug("Setting up evaluation tasks for alternative %d", alt_idx)
-                for criterion in self.evaluation_criteria:
-                    task = self._evaluate_alternative_criterion(
-                        goal, alternative, node_type, alt_idx, criterion
-                    )
-                    evaluation_tasks.append(task)
-
-            # Run all evaluation tasks concurrently
-            self.logger.info("Running %d evaluation tasks concurrently...", len(evaluation_tasks))
-            evaluation_results = await asyncio.gather(*evaluation_tasks, return_exceptions=True)
+            evaluation_results = []
+            pending_pairs = [
+                (alt_idx, criterion)
+                for alt_idx in range(len(alternatives))
+                for criterion in self.evaluation_criteria
+            ]
+
+            if self.batch_evaluation:
+                # One call scores the whole alternatives x criteria matrix
+                evaluation_results = await self._evaluate_alternatives_batch(goal, alternatives, node_type)
+                scored = {(r["alternative_idx"], r["criterion"]) for r in evaluation_results}
+                pending_pairs = [pair for pair in pending_pairs if pair not in scored]
+                if pending_pairs:
+                    self.logger.warning("Batched evaluation for %s node left %d pairs unscored; falling back to per-pair calls.", node_type, len(pending_pairs))
+                    METRICS.increment("reasoning.batch_evaluation_fallbacks", node_type=node_type)
+
+            if pending_pairs:
+                evaluation_tasks = [
+                    self._evaluate_alternative_criterion(goal, alternatives[alt_idx], node_type, alt_idx, criterion)
+                    for alt_idx, criterion in pending_pairs
+                ]
+
+                # Run all evaluation tasks concurrently
+                self.logger.info("Running %d evaluation tasks concurrently...", len(evaluation_tasks))
+                evaluation_results += await asyncio.gather(*evaluation_tasks, return_exceptions=True)
             self.logger.info("Evaluation tasks completed.")
 
             # Process and aggregate evaluation results
@@ -178,6 +192,65 @@ class ReasoningTree:
             self.logger.error("Failed to evaluate %s alternatives: %s", node_type, str(e), exc_info=True)
             raise ReasoningTreeError(f"Failed to evaluate {node_type} alternatives: {str(e)}")
 
+    async def _evaluate_alternatives_batch(self, goal, alternatives, node_type):
+        """
+        Score all alternatives against all criteria in a single LLM call.
+
+        Returns:
+            list: Per-pair results in the same shape as ``_evaluate_alternative_criterion``.
+                Pairs missing from (or malformed in) the response are omitted, so the
+                caller can evaluate them individually. Empty if the call or parse failed.
+        """
+        prompt_name = "evaluate_alternatives_batch"
+        try:
+            self.logger.debug("Evaluating %d alternatives for %s node in one batched call.", len(alternatives), node_type)
+            prompt = self.prompt_manager.format_prompt(
+                prompt_name,
+                goal=goal,
+                node_type=node_type,
+                alternatives=json.dumps(alternatives, indent=2),
+                criteria=json.dumps(self.evaluation_criteria)
+            )
+
+            response = await self._call_llm(prompt, prompt_name)
+            return self._parse_evaluation_matrix(response, len(alternatives))
+        except Exception as e:
+            self.logger.error("Batched evaluation failed for %s node: %s", node_type, str(e), exc_info=True)
+            return []
+
+    def _parse_evaluation_matrix(self, response, num_alternatives):
+        """
+        Parse a batched evaluation response into per-pair results, skipping invalid entries.
+        """
+        matrix = self._parse_json_response(response, "evaluations")
+        if not isinstance(matrix, list):
+            raise ReasoningTreeError("Batched evaluation 'evaluations' is not a list.")
+
+        results = []
+        for entry in matrix:
+            if not isinstance(entry, dict):
+                continue
+            alt_idx = entry.get("alternative_idx")
+            criteria = entry.get("criteria")
+            if not isinstance(alt_idx, int) or not 0 <= alt_idx < num_alternatives or not isinstance(criteria, dict):
+                self.logger.warning("Skipping malformed batched evaluation entry: %s", entry)
+                continue
+            for criterion in self.evaluation_criteria:
+                evaluation = criteria.get(criterion)
+                if not isinstance(evaluation, dict):
+                    continue
+                try:
+                    score = float(evaluation.get("score"))
+                except (TypeError, ValueError):
+                    continue
+                results.append({
+                    "alternative_idx": alt_idx,
+                    "criterion": criterion,
+                    "score": score,
+                    "justification": evaluation.get("justification", "")
+                })
+        return results
+
     async def _evaluate_alternative_criterion(self, goal, alternative, node_type, alt_idx, criterion):
         """
         Evaluate a single alternative using a specific criterion.
@@ -191,7 +264,7 @@ class ReasoningTree:
                 alternative=json.dumps(alternative, indent=2)
             )
 
-            response = await self._call_llm(prompt)
+            response = await self._call_llm(prompt, prompt_name)
 
             # Parse the response to extract the evaluation
             evaluation = self._parse_evaluation(response, criterion)
@@ -316,7 +389,7 @@ class ReasoningTree:
                 best_idx=best_idx
             )
 
-            response = await self._call_llm(prompt)
+            response = await self._call_llm(prompt, prompt_name)
 
             # Extract the justification from the response
             justification = response.strip()
@@ -327,11 +400,11 @@ class ReasoningTree:
             # Return a simple justification if generation fails
             return f"Selected based on highest overall score ({evaluations[best_idx].get('total_score', 'N/A'):.2f}) across evaluation criteria. (Justification generation error: {str(e)})"
 
-    async def _call_llm(self, prompt):
+    async def _call_llm(self, prompt, call_site=None):
         """
         Call the LLM with the given prompt using the class's model instance.
         """
-        return await self.llm_client.generate(prompt)
+        return await self.llm_client.generate(prompt, call_site=call_site)
     
     def _parse_alternatives(self, response, node_type):
         """
@@ -421,18 +494,8 @@ class ReasoningTree:
             ReasoningTreeError: If parsing fails or the key is missing.
         """
         try:
-            # Clean potential markdown fences
-            if "```json" in response:
-                json_str = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_str = response.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = response.strip()
-
-            # Handle potential escape sequences if needed (basic handling)
-            json_str = json_str.replace('\\n', '\n').replace('\\"', '"')
-
-            parsed_json = json.loads(json_str)
+            # Fenced or prose-wrapped JSON is located without rewriting string escapes
+            parsed_json = extract_json(response)
 
             if expected_key not in parsed_json:
                 # Log available keys for debugging
@@ -6,11 +6,12 @@ import asyncio
 import json
 import logging # Import logging
 from typing import List, Dict, Any
-from llm_client import LLMClient
 
 # Adjust import paths
 from exceptions import CouncilCritiqueError, LLMError
 from utils.prompt_manager import PromptManager
+from llm.gateway import LLMGateway
+from llm.structured_output import extract_json
 
 
 class CouncilCritiqueModule:
@@ -25,7 +26,7 @@ class CouncilCritiqueModule:
         Args:
             config (dict): Council critique configuration (should include LLM settings).
             prompt_manager (PromptManager): Prompt manager instance.
-            llm_client: LLM client instance (Note: Redundant if client configured globally).
+            llm_client (LLMGateway, optional): Shared LLM gateway. A private one is created if omitted.
             logger (logging.Logger, optional): Logger instance.
         """
         self.config = config
@@ -40,17 +41,17 @@ class CouncilCritiqueModule:
              self.logger.warning("Council critique is enabled, but no personas are enabled in the configuration.")
              self.enabled = False # Disable if no personas are active
 
-        # Initialize LLM model - Use model name from config
-        if llm_client == None:
-            self.llm_client = LLMClient()
+        # Initialize LLM client (prefer the shared gateway so rate limits apply process-wide)
+        self.llm_client = llm_client or LLMGateway(config)
 
-    async def review_and_refine(self, steps, context):
+    async def review_and_refine(self, steps, context, on_delta=None):
         """
         Review and refine checklist steps using the council critique framework.
 
         Args:
             steps (list): List of checklist steps (dictionaries) to refine.
             context (dict): Context information (goal, phase, task details).
+            on_delta (callable, optional): Receives text deltas of the revision as they stream in.
 
         Returns:
             list: Refined checklist steps (dictionaries).
@@ -66,12 +67,15 @@ class CouncilCritiqueModule:
             self.logger.info("Starting council critique for task: %s", context.get('task_name', 'N/A'))
             # Generate critiques from each enabled persona
             self.logger.debug("Generating critiques from personas: %s", self.enabled_personas)
-            critiques = await self._generate_critiques(steps, context)
+            # Every prompt of the review embeds the same steps and context; serialize them once
+            steps_json = json.dumps(steps, indent=2)
+            context_json = json.dumps(context, indent=2)
+            critiques = await self._generate_critiques(steps_json, context_json)
             self.logger.debug("Critiques generated.")
 
             # Synthesize critiques and revise steps
             self.logger.debug("Revising steps based on critiques...")
-            revised_steps = await self._revise_steps(steps, critiques, context)
+            revised_steps = await self._revise_steps(steps_json, critiques, context, context_json, on_delta=on_delta)
             self.logger.debug("Steps revised.")
 
             # Validate revised steps structure (basic validation)
@@ -86,15 +90,19 @@ class CouncilCritiqueModule:
             self.logger.error("Council critique failed: %s. Returning original steps.", str(e), exc_info=True)
             return steps
 
-    async def _generate_critiques(self, steps, context):
+    async def _generate_critiques(self, steps_json, context_json):
         """
         Generate critiques from each enabled persona concurrently.
+
+        Args:
+            steps_json (str): The steps, serialized for the prompt.
+            context_json (str): The context, serialized for the prompt.
         """
         try:
             critique_tasks = []
             for persona in self.enabled_personas:
                 self.logger.debug("Setting up critique task for persona: %s", persona)
-                task = self._generate_persona_critique(steps, context, persona)
+                task = self._generate_persona_critique(steps_json, context_json, persona)
                 critique_tasks.append(task)
 
             # Run all critique tasks concurrently
@@ -119,20 +127,25 @@ class CouncilCritiqueModule:
             # Raise error here as it's a fundamental failure of this step
             raise CouncilCritiqueError(f"Failed to gather critiques: {str(e)}")
 
-    async def _generate_persona_critique(self, steps, context, persona):
+    async def _generate_persona_critique(self, steps_json, context_json, persona):
         """
         Generate a critique from a specific persona using LLM.
+
+        Args:
+            steps_json (str): The steps, serialized for the prompt.
+            context_json (str): The context, serialized for the prompt.
+            persona (str): Persona name.
         """
         try:
             self.logger.debug("Generating critique from persona: %s", persona)
             prompt_name = f"critique_{persona}" # Assumes prompts like critique_Kant.txt exist
             prompt = self.prompt_manager.format_prompt(
                 prompt_name,
-                steps=json.dumps(steps, indent=2),
-                context=json.dumps(context, indent=2)
+                steps=steps_json,
+                context=context_json
             )
 
-            response = await self._call_llm(prompt)
+            response = await self._call_llm(prompt, prompt_name)
             self.logger.debug("Critique generated successfully by %s.", persona)
             # Return the raw text critique
             return response.strip()
@@ -141,21 +154,32 @@ class CouncilCritiqueModule:
             # Re-raise to be caught by gather
             raise CouncilCritiqueError(f"Failed to generate {persona} critique: {str(e)}")
 
-    async def _revise_steps(self, steps, critiques, context):
+    async def _revise_steps(self, steps_json, critiques, context, context_json, on_delta=None):
         """
         Synthesize critiques and revise steps using LLM.
+
+        Args:
+            steps_json (str): The steps, serialized for the prompt.
+            critiques (dict): Critique text by persona.
+            context (dict): Context information (goal, phase, task details).
+            context_json (str): The context, serialized for the prompt.
+            on_delta (callable, optional): Receives text deltas of the revision as they stream in.
         """
         try:
             self.logger.debug("Formatting prompt to revise steps based on critiques.")
             prompt = self.prompt_manager.format_prompt(
                 "revise_steps", # Assumes revise_steps.txt prompt exists
-                steps=json.dumps(steps, indent=2),
+                goal=context.get("goal", "N/A") if isinstance(context, dict) else "N/A",
+                steps=steps_json,
                 critiques=json.dumps(critiques, indent=2),
-                context=json.dumps(context, indent=2)
+                context=context_json
             )
 
             self.logger.debug("Calling LLM to revise steps...")
-            response = await self._call_llm(prompt)
+            if on_delta:
+                response = await self._stream_llm(prompt, on_delta, "revise_steps")
+            else:
+                response = await self._call_llm(prompt, "revise_steps")
             self.logger.debug("LLM response received for step revision.")
 
             # Parse the response to extract revised steps list
@@ -207,11 +231,21 @@ class CouncilCritiqueModule:
             self.logger.error("Error during revised steps validation: %s", str(e), exc_info=True)
             return False
 
-    async def _call_llm(self, prompt):
+    async def _call_llm(self, prompt, call_site=None):
         """
         Call the LLM with the given prompt using the class's model instance.
         """
-        return await self.llm_client.generate(prompt)
+        return await self.llm_client.generate(prompt, call_site=call_site)
+
+    async def _stream_llm(self, prompt, on_delta, call_site=None):
+        """
+        Stream the LLM completion, passing each text delta to on_delta, and return the full text.
+        """
+        chunks = []
+        async for delta in self.llm_client.stream(prompt, call_site=call_site):
+            on_delta(delta)
+            chunks.append(delta)
+        return "".join(chunks)
 
     def _parse_revised_steps(self, response):
         """
@@ -240,18 +274,8 @@ class CouncilCritiqueModule:
         Parse the LLM response expecting JSON, potentially wrapped in markdown.
         """
         try:
-            # Clean potential markdown fences
-            if "```json" in response:
-                json_str = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_str = response.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = response.strip()
-
-            # Handle potential escape sequences
-            json_str = json_str.replace('\\n', '\n').replace('\\"', '"')
-
-            parsed_json = json.loads(json_str)
+            # Fenced or prose-wrapped JSON is located without rewriting string escapes
+            parsed_json = extract_json(response)
 
             if expected_key not in parsed_json:
                 available_keys = list(parsed_json.keys()) if isinstance(parsed_json, dict) else "N/A (not a dict)"
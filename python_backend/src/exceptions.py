@@ -12,6 +12,16 @@ class LLMError(ChecklistGeneratorError):
     pass
 
 
+class LLMCircuitOpenError(LLMError):
+    """Exception raised when a provider's circuit breaker is open and calls fail fast."""
+    pass
+
+
+class LLMResponseFormatError(LLMError):
+    """Exception raised when an LLM response is not valid JSON or does not match the expected schema."""
+    pass
+
+
 class PromptError(ChecklistGeneratorError):
     """Exception raised for errors in prompt loading or formatting."""
     pass
@@ -3,7 +3,7 @@ import os
 import asyncio
 import logging
 import traceback # For detailed error logging
-from typing import Any, Dict, Optional, cast
+from typing import Any, Callable, Dict, Optional, cast
 
 # Import JSON-RPC components (assuming stdio loop is handled in main.py)
 # from jsonrpc.manager import JSONRPCResponseManager # Might not be needed directly here
@@ -17,7 +17,11 @@ from protocol_types import ExecuteTaskParams, ExecuteTaskResult, EditorContext
 from utils.config_loader import ConfigLoader
 from utils.prompt_manager import PromptManager
 from core.checklist_generator import ChecklistGenerator
-from llm_client import LLMClient
+from core import checklist_events
+from llm.gateway import LLMGateway
+from llm.structured_output import extract_json
+from llm.usage import USAGE
+from utils.metrics import METRICS
 from council.council_critique import CouncilCritiqueModule
 from knowledge_manager import KnowledgeManager # Added KnowledgeManager import
 from exceptions import ChecklistGeneratorError, LLMError, ConfigError, PromptError, QAValidationError, CouncilCritiqueError # Import relevant exceptions
@@ -39,6 +43,7 @@ REASONING_COMPONENTS: Dict[str, Any] = {
     "checklist_generator": None,
     "council_module": None,
     "knowledge_manager": None, # Added knowledge_manager entry
+    "llm_gateway": None, # Shared LLM gateway (rate limits apply across all requests)
     "initialized": False
 }
 
@@ -66,6 +71,23 @@ def initialize_reasoning_components():
         prompt_manager = PromptManager() # Assumes prompts dir in python_backend root
         REASONING_COMPONENTS["prompt_manager"] = prompt_manager
 
+        # One gateway for every component so rate limits and concurrency caps are global
+        llm_gateway = LLMGateway(config=llm_config, logger=logging.getLogger("LLMGateway"))
+        USAGE.configure(llm_config.get("pricing", {})) # Per-model prices for request cost accounting
+        REASONING_COMPONENTS["llm_gateway"] = llm_gateway
+
+        # Initialize Council Module (also used by the generator when council_refinement is enabled)
+        council_config = config_loader.get_council_config()
+        # Ensure council config also gets LLM settings if needed (e.g., model name)
+        merged_council_config = {**council_config, **llm_config}
+        council_module = CouncilCritiqueModule(
+            config=merged_council_config,
+            prompt_manager=prompt_manager,
+            llm_client=llm_gateway,
+            logger=logging.getLogger("CouncilCritiqueModule")
+        )
+        REASONING_COMPONENTS["council_module"] = council_module
+
         # Initialize Checklist Generator (ReasoningTree is internal to it)
         # Pass relevant config sections
         decomposition_config = config_loader.get_decomposition_config()
@@ -78,21 +100,12 @@ def initialize_reasoning_components():
             prompt_manager=prompt_manager,
             checkpoint_manager=None, # Checkpointing disabled for now
             # ReasoningTree is initialized internally by ChecklistGenerator if enabled in config
+            llm_client=llm_gateway,
+            council_module=council_module,
             logger=logging.getLogger("ChecklistGenerator")
         )
         REASONING_COMPONENTS["checklist_generator"] = checklist_generator
 
-        # Initialize Council Module
-        council_config = config_loader.get_council_config()
-        # Ensure council config also gets LLM settings if needed (e.g., model name)
-        merged_council_config = {**council_config, **llm_config}
-        council_module = CouncilCritiqueModule(
-            config=merged_council_config,
-            prompt_manager=prompt_manager,
-            logger=logging.getLogger("CouncilCritiqueModule")
-        )
-        REASONING_COMPONENTS["council_module"] = council_module
-
         # Initialize Knowledge Manager with error handling
         try:
             # It needs the config and potentially the workspace root
@@ -135,6 +148,33 @@ def initialize_reasoning_components():
 # Consider lazy initialization or initialization via a dedicated RPC call if preferred.
 initialize_reasoning_components()
 
+# --- Host Notifications ---
+# main.py registers a sender once the stdout writer exists; until then notifications are dropped.
+_NOTIFICATION_SENDER: Optional[Callable[[str, Dict[str, Any]], None]] = None
+
+def set_notification_sender(sender: Optional[Callable[[str, Dict[str, Any]], None]]):
+    """Registers the callable used to push JSON-RPC notifications to the host."""
+    global _NOTIFICATION_SENDER
+    _NOTIFICATION_SENDER = sender
+
+def send_notification(method: str, params: Dict[str, Any]):
+    """Sends a JSON-RPC notification to the host, if a sender is registered."""
+    if _NOTIFICATION_SENDER is None:
+        logger.debug(f"No notification sender registered; dropping {method} notification.")
+        return
+    try:
+        _NOTIFICATION_SENDER(method, params)
+    except Exception as e:
+        logger.error(f"Failed to send {method} notification: {e}", exc_info=True)
+
+def _partial_result_forwarder(task_id: Optional[str], content_type: str = "text") -> Optional[Callable[[str], None]]:
+    """Returns a callback forwarding LLM text deltas as '$/partialResult' notifications, or None if no taskId."""
+    if not task_id:
+        return None
+    def forward(delta: str):
+        send_notification("$/partialResult", {"taskId": task_id, "content": delta, "type": content_type})
+    return forward
+
 # --- Helper to format error responses ---
 def create_error_response(code: str, message: str) -> Dict[str, Any]:
     """Creates a structured error dictionary for JSON-RPC."""
@@ -223,6 +263,11 @@ async def handle_generate_plan(params: Dict[str, Any]) -> Dict[str, Any]:
     try:
         goal = params.get("goal")
         context = params.get("context")
+        depth = params.get("depth", "steps") # "phases" or "tasks" for a lazy plan, see reasoning/expandNode
+        plan_id = params.get("planId") # Retrying with the planId of a failed plan resumes it
+        include_reasoning = params.get("includeReasoning") # False omits alternatives/evaluations metadata
+        if include_reasoning is not None and not isinstance(include_reasoning, bool):
+            raise ValueError("'includeReasoning' must be a boolean")
         if not goal:
             raise ValueError("Missing 'goal' in reasoning/generatePlan params")
 
@@ -230,8 +275,18 @@ async def handle_generate_plan(params: Dict[str, Any]) -> Dict[str, Any]:
         if not generator:
              raise RuntimeError("ChecklistGenerator not initialized.")
 
-        # Call the async method
-        checklist_result = await generator.generate_checklist(goal=goal, context=context)
+        # With a taskId, stream each part of the plan as soon as it is final
+        task_id = params.get("taskId")
+        if task_id:
+            checklist_result = None
+            async for event in generator.iter_checklist(goal=goal, context=context, depth=depth, plan_id=plan_id,
+                                                        include_reasoning=include_reasoning):
+                send_notification("$/planProgress", {"taskId": task_id, **event.to_dict()})
+                if event.type == checklist_events.DONE:
+                    checklist_result = event.data
+        else:
+            checklist_result = await generator.generate_checklist(goal=goal, context=context, depth=depth, plan_id=plan_id,
+                                                                  include_reasoning=include_reasoning)
 
         logger.info("Plan generated successfully.")
         # Return success data (checklist itself)
@@ -248,6 +303,93 @@ async def handle_generate_plan(params: Dict[str, Any]) -> Dict[str, Any]:
         return create_error_response("INTERNAL_ERROR", f"An unexpected error occurred: {e}")
 
 
+async def handle_regenerate_node(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Handles the 'reasoning/regenerateNode' request: regenerates one phase or task of an existing plan."""
+    global REASONING_COMPONENTS
+    if not REASONING_COMPONENTS["initialized"]:
+        logger.error("Reasoning components not initialized. Cannot regenerate plan node.")
+        return create_error_response("SERVICE_UNINITIALIZED", "Reasoning components are not ready.")
+
+    logger.info("Handling reasoning/regenerateNode request.")
+    try:
+        checklist = params.get("checklist")
+        phase_index = params.get("phaseIndex")
+        task_index = params.get("taskIndex")
+        if not isinstance(checklist, dict) or phase_index is None:
+            raise ValueError("Missing 'checklist' or 'phaseIndex' in reasoning/regenerateNode params")
+
+        generator = REASONING_COMPONENTS["checklist_generator"]
+        if not generator:
+             raise RuntimeError("ChecklistGenerator not initialized.")
+
+        # With a taskId, stream the regenerated parts as they become final
+        task_id = params.get("taskId")
+        emit = (lambda event: send_notification("$/planProgress", {"taskId": task_id, **event.to_dict()})) if task_id else None
+        node = await generator.regenerate_node(checklist, phase_index, task_index, emit=emit)
+
+        logger.info(f"Plan node regenerated (phase {phase_index}, task {task_index}).")
+        result = {"phaseIndex": phase_index}
+        if task_index is None:
+            result["phase"] = node
+        else:
+            result["taskIndex"] = task_index
+            result["task"] = node
+        return result
+
+    except (ValueError, KeyError) as e:
+         logger.warning(f"Invalid params for reasoning/regenerateNode: {e}")
+         return create_error_response("INVALID_PARAMS", str(e))
+    except (ChecklistGeneratorError, LLMError) as e:
+         logger.error(f"Error during plan node regeneration: {e}", exc_info=True)
+         return create_error_response("PLAN_GENERATION_FAILED", str(e))
+    except Exception as e:
+        logger.exception(f"Unexpected error in handle_regenerate_node: {e}")
+        return create_error_response("INTERNAL_ERROR", f"An unexpected error occurred: {e}")
+
+
+async def handle_expand_node(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Handles the 'reasoning/expandNode' request: generates tasks or steps of a lazy plan on demand."""
+    global REASONING_COMPONENTS
+    if not REASONING_COMPONENTS["initialized"]:
+        logger.error("Reasoning components not initialized. Cannot expand plan node.")
+        return create_error_response("SERVICE_UNINITIALIZED", "Reasoning components are not ready.")
+
+    logger.info("Handling reasoning/expandNode request.")
+    try:
+        plan_id = params.get("planId")
+        phase_index = params.get("phaseIndex")
+        task_index = params.get("taskIndex")
+        if not plan_id or phase_index is None:
+            raise ValueError("Missing 'planId' or 'phaseIndex' in reasoning/expandNode params")
+
+        generator = REASONING_COMPONENTS["checklist_generator"]
+        if not generator:
+             raise RuntimeError("ChecklistGenerator not initialized.")
+
+        task_id = params.get("taskId")
+        emit = (lambda event: send_notification("$/planProgress", {"taskId": task_id, **event.to_dict()})) if task_id else None
+        node = await generator.expand_node(plan_id, phase_index, task_index, emit=emit)
+
+        logger.info(f"Plan {plan_id} expanded at phase {phase_index}, task {task_index}.")
+        result = {"planId": plan_id, "phaseIndex": phase_index}
+        if task_index is None:
+            result["tasks"] = node["tasks"]
+        else:
+            result["taskIndex"] = task_index
+            result["steps"] = node["steps"]
+        return result
+
+    except (ValueError, KeyError) as e:
+         logger.warning(f"Invalid params for reasoning/expandNode: {e}")
+         return create_error_response("INVALID_PARAMS", str(e))
+    except (ChecklistGeneratorError, LLMError) as e:
+         logger.error(f"Error during plan node expansion: {e}", exc_info=True)
+         return create_error_response("PLAN_GENERATION_FAILED", str(e))
+    except Exception as e:
+        logger.exception(f"Unexpected error in handle_expand_node: {e}")
+        return create_error_response("INTERNAL_ERROR", f"An unexpected error occurred: {e}")
+
+
 async def handle_refine_steps(params: Dict[str, Any]) -> Dict[str, Any]:
     """Handles the 'reasoning/refineSteps' request."""
     global REASONING_COMPONENTS
@@ -268,8 +410,9 @@ async def handle_refine_steps(params: Dict[str, Any]) -> Dict[str, Any]:
         if not council:
              raise RuntimeError("CouncilCritiqueModule not initialized.")
 
-        # Call the async method
-        refined_steps_result = await council.review_and_refine(steps=steps, context=context)
+        # Call the async method (stream the revision to the host if a taskId was supplied)
+        on_delta = _partial_result_forwarder(params.get("taskId"))
+        refined_steps_result = await council.review_and_refine(steps=steps, context=context, on_delta=on_delta)
 
         logger.info("Steps refined successfully.")
         # Return success data
@@ -366,11 +509,11 @@ async def handle_replanning(params: Dict[str, Any]) -> Dict[str, Any]:
 
         # Call LLM for analysis and replanning suggestion
         # Consider using a more capable model if needed for complex replanning
-        llm_response_text = await _call_llm_for_analysis(prompt) # Use existing helper
+        llm_response_text = await _call_llm_for_analysis(prompt, call_site="replanning", on_delta=_partial_result_forwarder(params.get("taskId"))) # Use existing helper
 
         # Parse the expected JSON response from the LLM
         try:
-            replanning_result = json.loads(llm_response_text)
+            replanning_result = extract_json(llm_response_text)
             # Basic validation (can be more robust using Pydantic models)
             if not isinstance(replanning_result, dict) or "analysis" not in replanning_result:
                  raise ValueError("LLM response for replanning is not valid JSON or missing 'analysis' key.")
@@ -437,51 +580,48 @@ async def handle_knowledge_search(params: Dict[str, Any]) -> Dict[str, Any]:
 
 async def _call_llm_for_persona(prompt: str) -> str:
     """Helper function to call LLM specifically for persona selection."""
-    # This assumes the LLM client is configured globally
-    # and uses a potentially simpler/faster model if configured.
-    # TODO: Consider using a dedicated model/config for this simple selection task.
+    # The model comes from the 'select_persona' entry of llm.routing (a fast model by default).
     global REASONING_COMPONENTS
-    config_loader = REASONING_COMPONENTS.get("config_loader")
-    if not config_loader:
-        raise RuntimeError("ConfigLoader not initialized.")
-
-    llm_config = config_loader.get_llm_config() # Use main LLM config for now
-    model_name = llm_config.get("model", "gemini-1.5-flash-latest") # Default to flash
-    logger.debug(f"Using model {model_name} for persona selection.")
-
     try:
-        client = LLMClient()
-        response = await client.generate(prompt)
-        if not response.text:
-             block_reason = response.prompt_feedback.block_reason if response.prompt_feedback else 'Unknown'
-             logger.warning(f"LLM response for persona selection was empty/blocked: {block_reason}")
-             raise LLMError(f"LLM response for persona selection was empty/blocked (Reason: {block_reason})")
-        return response.text.strip()
+        client = REASONING_COMPONENTS.get("llm_gateway")
+        if not client:
+            raise RuntimeError("LLMGateway not initialized.")
+        logger.debug(f"Using {client.router.resolve('select_persona').label} for persona selection.")
+        # The gateway normalizes provider responses and raises LLMError on empty/blocked output
+        response_text = await client.generate(prompt, call_site="select_persona")
+        if not response_text:
+             logger.warning("LLM response for persona selection was empty.")
+             raise LLMError("LLM response for persona selection was empty.")
+        return response_text.strip()
     except Exception as e:
         logger.error(f"LLM call failed during persona selection: {e}", exc_info=True)
         raise LLMError(f"LLM call failed during persona selection: {e}")
 
-async def _call_llm_for_analysis(prompt: str, model_name: Optional[str] = None) -> str:
-    """Helper function to call LLM for analysis/reasoning tasks."""
-    global REASONING_COMPONENTS
-    config_loader = REASONING_COMPONENTS.get("config_loader")
-    if not config_loader:
-        raise RuntimeError("ConfigLoader not initialized.")
-
-    llm_config = config_loader.get_llm_config()
-    # Use provided model name or default from config
-    effective_model_name = model_name or llm_config.get("model", "gemini-1.5-flash-latest")
-    logger.debug(f"Using model {effective_model_name} for analysis.")
+async def _call_llm_for_analysis(prompt: str, call_site: str = "analyze_and_recover", on_delta: Optional[Callable[[str], None]] = None) -> str:
+    """Helper function to call LLM for analysis/reasoning tasks.
 
+    The model is chosen by the call_site entry of llm.routing (defaults to the main llm.model).
+    If on_delta is given the completion is streamed and each text delta is passed to it.
+    """
+    global REASONING_COMPONENTS
     try:
-        client = LLMClient()
+        client = REASONING_COMPONENTS.get("llm_gateway")
+        if not client:
+            raise RuntimeError("LLMGateway not initialized.")
+        logger.debug(f"Using {client.router.resolve(call_site).label} for {call_site}.")
         # Consider adding safety settings if needed for analysis prompts
-        response = await client.generate(prompt)
-        if not response.text:
-             block_reason = response.prompt_feedback.block_reason if response.prompt_feedback else 'Unknown'
-             logger.warning(f"LLM response for analysis was empty/blocked: {block_reason}")
-             raise LLMError(f"LLM response for analysis was empty/blocked (Reason: {block_reason})")
-        return response.text.strip()
+        if on_delta:
+            chunks = []
+            async for delta in client.stream(prompt, call_site=call_site):
+                on_delta(delta)
+                chunks.append(delta)
+            response_text = "".join(chunks)
+        else:
+            response_text = await client.generate(prompt, call_site=call_site)
+        if not response_text:
+             logger.warning("LLM response for analysis was empty.")
+             raise LLMError("LLM response for analysis was empty.")
+        return response_text.strip()
     except Exception as e:
         logger.error(f"LLM call failed during analysis: {e}", exc_info=True)
         raise LLMError(f"LLM call failed during analysis: {e}")
@@ -599,13 +739,12 @@ async def handle_analyze_and_recover(params: Dict[str, Any]) -> Dict[str, Any]:
             plan_state=json.dumps(plan_state, indent=2) if isinstance(plan_state, (dict, list)) else str(plan_state or "N/A")
         )
 
-        # Call LLM for analysis (potentially use a more powerful model if configured)
-        # TODO: Allow specifying model in config for recovery?
-        llm_response_text = await _call_llm_for_analysis(prompt) # Use helper
+        # Call LLM for analysis (model configurable via llm.routing.call_sites.analyze_and_recover)
+        llm_response_text = await _call_llm_for_analysis(prompt, on_delta=_partial_result_forwarder(params.get("taskId"))) # Use helper
 
         # Parse the expected JSON response from the LLM
         try:
-            recovery_plan = json.loads(llm_response_text)
+            recovery_plan = extract_json(llm_response_text)
             # Basic validation of the structure (can be more robust)
             if not isinstance(recovery_plan, dict) or "analysis" not in recovery_plan or "next_actions" not in recovery_plan:
                  raise ValueError("LLM response for recovery is not valid JSON or missing required keys.")
@@ -631,6 +770,18 @@ async def handle_analyze_and_recover(params: Dict[str, Any]) -> Dict[str, Any]:
         return create_error_response("INTERNAL_ERROR", f"An unexpected error occurred: {e}")
 
 
+# --- Metrics Handler ---
+
+async def handle_get_metrics(params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Handles the 'metrics/get' request (LLM queue waits, in-flight calls, per-method token usage, etc.)."""
+    logger.info("Handling metrics/get request.")
+    try:
+        return {**METRICS.snapshot(), "usage": USAGE.snapshot()}
+    except Exception as e:
+        logger.exception(f"Unexpected error in handle_get_metrics: {e}")
+        return create_error_response("INTERNAL_ERROR", f"An unexpected error occurred: {e}")
+
+
 # --- Final Method Map Definition ---
 METHOD_MAP = {
     # Existing Methods
@@ -642,6 +793,8 @@ METHOD_MAP = {
 
     # New Reasoning Methods (namespaced for clarity)
     "reasoning/generatePlan": handle_generate_plan,
+    "reasoning/regenerateNode": handle_regenerate_node,
+    "reasoning/expandNode": handle_expand_node,
     "reasoning/refineSteps": handle_refine_steps,
     "reasoning/selectPersona": handle_select_persona,
     "reasoning/analyzeAndRecover": handle_analyze_and_recover,
@@ -650,4 +803,7 @@ METHOD_MAP = {
 
     # New Knowledge Method
     "knowledge/search": handle_knowledge_search,
+
+    # Diagnostics
+    "metrics/get": handle_get_metrics,
 }
@@ -0,0 +1,129 @@
+"""
+AIMD (additive increase, multiplicative decrease) tuning of per-provider concurrency.
+"""
+
+import math
+import statistics
+import time
+from collections import deque
+
+
+class AIMDController:
+    """
+    Concurrency window for one provider/model pair, adjusted from call outcomes.
+
+    The window grows by ``increase_step`` per window's worth of healthy calls
+    while the lane is saturated, and is multiplied by ``decrease_factor`` on a
+    429/503/529, a timeout, or sustained latency inflation.
+
+    Latency is judged per call site and normalized by output length, as
+    seconds per ``output_tokens + latency_token_offset`` (the offset stands
+    in for the fixed part of a call's latency). Single slow calls are normal
+    variance and never count: the window is decreased only when the median
+    of the last ``latency_window`` calls exceeds the median of the
+    ``baseline_samples`` calls before them by ``latency_inflation_ratio``,
+    and by at least ``min_inflation_seconds`` for a call of this length. A
+    shift of the whole latency distribution like that is the signature of
+    calls queueing at the provider. After a decrease, the recent window
+    refills before latency can trigger another one, and calls that started
+    before the last decrease cannot trigger one either, so a burst of
+    failures from one overloaded window only halves it once.
+    """
+
+    DEFAULTS = {
+        "min_concurrency": 1,
+        "increase_step": 1.0,
+        "decrease_factor": 0.5,
+        "latency_window": 20,
+        "baseline_samples": 200,
+        "min_latency_samples": 80,
+        "latency_inflation_ratio": 2.0,
+        "min_inflation_seconds": 1.0,
+        "latency_token_offset": 100,
+    }
+
+    def __init__(self, config, initial_limit, clock=time.monotonic):
+        """
+        Initialize the AIMDController.
+
+        Args:
+            config (dict): The ``llm.rate_limits.adaptive`` configuration section.
+            initial_limit (int): Starting window (the lane's ``max_concurrency``).
+            clock (callable, optional): Monotonic clock, injectable for benchmarks.
+        """
+        settings = {**self.DEFAULTS, **(config or {})}
+        self.min_limit = max(1, int(settings["min_concurrency"]))
+        self.max_limit = max(self.min_limit, int(settings.get("max_concurrency") or initial_limit * 4))
+        self.increase_step = float(settings["increase_step"])
+        self.decrease_factor = float(settings["decrease_factor"])
+        self.latency_window = max(1, int(settings["latency_window"]))
+        self.baseline_samples = max(1, int(settings["baseline_samples"]))
+        self.min_latency_samples = max(self.latency_window + 1, int(settings["min_latency_samples"]))
+        self.latency_inflation_ratio = float(settings["latency_inflation_ratio"])
+        self.min_inflation_seconds = float(settings["min_inflation_seconds"])
+        self.latency_token_offset = max(1, int(settings["latency_token_offset"]))
+        self._clock = clock
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self._last_decrease = -math.inf
+        self._latency = {}  # call_site -> deque of normalized latencies, oldest first
+
+    @property
+    def window(self):
+        return int(self._limit)
+
+    def on_success(self, call_site, latency, started_at, in_flight, output_tokens=None):
+        """
+        Record a completed call.
+
+        Args:
+            call_site (str): Call site, used for its latency baseline.
+            latency (float): Seconds the call held its slot.
+            started_at (float): Clock time the call was admitted.
+            in_flight (int): Calls holding a slot when this one completed (including it).
+            output_tokens (int, optional): Estimated completion tokens, if known.
+
+        Returns:
+            str or None: "latency" if the window was decreased, "increase" if it grew.
+        """
+        scale = (output_tokens or 0) + self.latency_token_offset
+        samples = self._latency.get(call_site)
+        if samples is None:
+            samples = self._latency[call_site] = deque(maxlen=self.baseline_samples + self.latency_window)
+        samples.append(latency / scale)
+
+        if len(samples) >= self.min_latency_samples and self._inflated(samples, scale):
+            # Judge the next decrease on fresh calls only
+            for _ in range(self.latency_window):
+                samples.pop()
+            if self._decrease(started_at):
+                return "latency"
+            return None
+
+        # Only grow while the window is actually in use
+        if in_flight >= self.window and self._limit < self.max_limit:
+            self._limit = min(self.max_limit, self._limit + self.increase_step / self._limit)
+            return "increase"
+        return None
+
+    def _inflated(self, samples, scale):
+        values = list(samples)
+        recent = statistics.median(values[-self.latency_window:])
+        baseline = statistics.median(values[:-self.latency_window])
+        return (recent > baseline * self.latency_inflation_ratio
+                and (recent - baseline) * scale >= self.min_inflation_seconds)
+
+    def on_overload(self, started_at):
+        """
+        Record a rate-limited, overloaded or timed-out call.
+
+        Returns:
+            bool: True if the window was decreased.
+        """
+        return self._decrease(started_at)
+
+    def _decrease(self, started_at):
+        if started_at < self._last_decrease:
+            return False
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        self._last_decrease = self._clock()
+        return True
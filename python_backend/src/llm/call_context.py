@@ -0,0 +1,77 @@
+"""
+Per-call context shared between the LLM gateway and provider clients.
+"""
+
+import contextvars
+from contextlib import contextmanager
+
+# Call site (prompt family, e.g. "generate_steps") of the provider call in progress.
+CURRENT_CALL_SITE = contextvars.ContextVar("llm_call_site", default=None)
+
+
+@contextmanager
+def call_site_scope(call_site):
+    """
+    Expose ``call_site`` to provider clients for the duration of a call.
+    """
+    token = CURRENT_CALL_SITE.set(call_site)
+    try:
+        yield
+    finally:
+        CURRENT_CALL_SITE.reset(token)
+
+
+def current_call_site():
+    """
+    Call site of the provider call in progress, or None outside the gateway.
+    """
+    return CURRENT_CALL_SITE.get()
+
+
+# Explicit priority lane (e.g., "interactive") for LLM calls made in this context.
+CURRENT_PRIORITY = contextvars.ContextVar("llm_priority", default=None)
+
+# JSON-RPC method whose handler made the LLM calls; its configured lane applies
+# when no explicit priority is set.
+CURRENT_RPC_METHOD = contextvars.ContextVar("llm_rpc_method", default=None)
+
+
+@contextmanager
+def priority_scope(priority):
+    """
+    Run LLM calls made in this block in the given priority lane (None keeps the inherited one).
+    """
+    if priority is None:
+        yield
+        return
+    token = CURRENT_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        CURRENT_PRIORITY.reset(token)
+
+
+@contextmanager
+def rpc_method_scope(method):
+    """
+    Attribute LLM calls made in this block to a JSON-RPC method (for its default priority lane).
+    """
+    token = CURRENT_RPC_METHOD.set(method)
+    try:
+        yield
+    finally:
+        CURRENT_RPC_METHOD.reset(token)
+
+
+def current_priority():
+    """
+    Explicit priority lane in effect, or None.
+    """
+    return CURRENT_PRIORITY.get()
+
+
+def current_rpc_method():
+    """
+    JSON-RPC method in progress, or None outside a request.
+    """
+    return CURRENT_RPC_METHOD.get()
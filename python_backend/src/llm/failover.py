@@ -0,0 +1,153 @@
+"""
+Ordered provider failover with health-based recovery probing.
+"""
+
+import logging
+import time
+
+from utils.metrics import METRICS
+
+
+class _EntryHealth:
+    """
+    Health of one provider/model entry.
+    """
+
+    __slots__ = ("failures", "healthy", "next_probe_at", "probing")
+
+    def __init__(self):
+        self.failures = 0
+        self.healthy = True
+        self.next_probe_at = 0.0
+        self.probing = False
+
+
+class FailoverChain:
+    """
+    Orders the provider/model entries a call may use.
+
+    The routed provider/model for a call site comes first, followed by the
+    configured ``chain`` entries. An entry is marked unhealthy after
+    ``unhealthy_after_failures`` consecutive failover-worthy errors (timeouts,
+    5xx) and is skipped until ``probe_interval_seconds`` have passed; then a
+    single call is let through as a probe, and its success restores the entry
+    (typically the primary) for all traffic.
+    """
+
+    def __init__(self, config=None, router=None, clock=time.monotonic, logger=None):
+        """
+        Initialize the FailoverChain.
+
+        Args:
+            config (dict, optional): The ``llm.failover`` configuration section.
+            router (ModelRouter, optional): Router used to build fallback routes.
+            clock (callable, optional): Monotonic clock (injectable for tests).
+            logger (logging.Logger, optional): Logger instance.
+        """
+        config = config or {}
+        self.entries = [entry for entry in (config.get("chain", []) or []) if entry]
+        self.enabled = config.get("enabled", True) and bool(self.entries) and router is not None
+        self.probe_interval = config.get("probe_interval_seconds", 30.0)
+        self.unhealthy_after = max(1, config.get("unhealthy_after_failures", 1))
+        self.router = router
+        self.clock = clock
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._health = {}
+        self._candidates = {}
+
+    def candidates(self, primary):
+        """
+        The primary route followed by the fallback routes, without duplicates.
+        """
+        if not self.enabled:
+            return [primary]
+        key = (primary.provider, primary.model, primary.max_output_tokens)
+        routes = self._candidates.get(key)
+        if routes is None:
+            routes = [primary]
+            for entry in self.entries:
+                route = self.router.derive(primary, entry)
+                if all(route.label != existing.label for existing in routes):
+                    routes.append(route)
+            self._candidates[key] = routes
+        return routes
+
+    def _entry(self, route):
+        health = self._health.get(route.label)
+        if health is None:
+            health = _EntryHealth()
+            self._health[route.label] = health
+        return health
+
+    def select(self, primary, tried=()):
+        """
+        Pick the route for the next call.
+
+        Healthy entries are preferred in chain order; an unhealthy entry is used
+        when its probe is due. If every untried entry is unhealthy, the first
+        untried one is used anyway rather than failing without a call.
+
+        Args:
+            primary (Route): The routed provider/model for the call site.
+            tried (set, optional): Labels already tried in this attempt.
+
+        Returns:
+            Route or None: The route to use, or None if every entry was tried.
+        """
+        untried = [route for route in self.candidates(primary) if route.label not in tried]
+        if not untried:
+            return None
+        if not self.enabled:
+            return untried[0]
+
+        now = self.clock()
+        for route in untried:
+            health = self._entry(route)
+            if health.healthy:
+                return route
+            if not health.probing and now >= health.next_probe_at:
+                health.probing = True
+                METRICS.increment("llm.failover_probes", route=route.label)
+                self.logger.info("Probing unhealthy LLM route %s.", route.label)
+                return route
+        return untried[0]
+
+    def has_next(self, primary, tried):
+        """
+        Whether any entry remains untried.
+        """
+        return any(route.label not in tried for route in self.candidates(primary))
+
+    def record_success(self, route):
+        if not self.enabled:
+            return
+        health = self._entry(route)
+        if not health.healthy:
+            self.logger.info("LLM route %s recovered.", route.label)
+        health.failures = 0
+        health.healthy = True
+        health.probing = False
+        METRICS.set_gauge("llm.route_healthy", 1, route=route.label)
+
+    def record_failure(self, route):
+        """
+        Count a failover-worthy failure against a route.
+        """
+        if not self.enabled:
+            return
+        health = self._entry(route)
+        health.failures += 1
+        health.probing = False
+        if health.failures >= self.unhealthy_after:
+            if health.healthy:
+                self.logger.warning("LLM route %s marked unhealthy after %d failures.", route.label, health.failures)
+            health.healthy = False
+            health.next_probe_at = self.clock() + self.probe_interval
+            METRICS.set_gauge("llm.route_healthy", 0, route=route.label)
+
+    def release(self, route):
+        """
+        Release a probe slot without a verdict (cancelled or non-provider failure).
+        """
+        if self.enabled:
+            self._entry(route).probing = False
@@ -0,0 +1,468 @@
+"""
+Shared entry point for all LLM calls made by the Python backend.
+"""
+
+import asyncio
+import logging
+import time
+
+from exceptions import LLMCircuitOpenError, LLMError, LLMResponseFormatError
+from llm.call_context import call_site_scope
+from llm.failover import FailoverChain
+from llm.hedging import HedgePolicy
+from llm.prompt_cache import CacheablePrompt, cache_prefix
+from llm.providers import create_client
+from llm.rate_limiter import LLMRateLimiter
+from llm.resilience import CircuitBreaker, RetryPolicy, classify_error, is_failover_error
+from llm.routing import ModelRouter
+from llm.single_flight import SingleFlight, request_key
+from llm.structured_output import parse_structured, schema_for
+from llm.tokens import estimate_tokens
+from llm.usage import USAGE
+from utils.metrics import METRICS
+
+
+class LLMGateway:
+    """
+    Wraps the provider clients and applies cross-cutting call policies.
+
+    Components keep calling ``await llm_client.generate(prompt, call_site=...)``;
+    sharing one gateway instance across ChecklistGenerator, ReasoningTree, the
+    council and the handlers makes those policies process-wide.
+    """
+
+    def __init__(self, config=None, client=None, clients=None, rate_limiter=None, logger=None):
+        """
+        Initialize the LLMGateway.
+
+        Args:
+            config (dict, optional): The ``llm`` configuration section.
+            client (optional): Client for the configured top-level provider, exposing
+                ``async generate(prompt, **options)`` and, optionally,
+                ``generate_stream(prompt, **options)`` returning an async iterator of
+                text chunks. Routed ``model``/``max_output_tokens`` overrides are
+                passed as options, plus ``response_schema`` and ``cache_prefix``
+                for clients declaring ``supports_response_schema`` /
+                ``supports_prompt_cache``; the call site is available to the client through
+                ``llm.call_context.current_call_site()``. Defaults to
+                the registered client for ``config["provider"]``, created on first use.
+            clients (dict, optional): Clients for other providers, keyed by provider name.
+                Missing providers are created through the provider registry.
+            rate_limiter (LLMRateLimiter, optional): Limiter instance. Built from
+                ``config["rate_limits"]`` if not provided.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.config = config or {}
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.router = ModelRouter(self.config)
+        self._clients = dict(clients or {})
+        if client is not None:
+            self._clients[self.router.base["provider"]] = client
+        self.rate_limiter = rate_limiter or LLMRateLimiter(
+            self.config.get("rate_limits", {}),
+            logger=logging.getLogger("LLMRateLimiter")
+        )
+        self.retry_policy = RetryPolicy(self.config.get("retry", {}))
+        self.hedge_policy = HedgePolicy(self.config.get("hedging", {}))
+        self.failover = FailoverChain(
+            self.config.get("failover", {}),
+            router=self.router,
+            logger=logging.getLogger("FailoverChain")
+        )
+        structured_output = self.config.get("structured_output", {}) or {}
+        self.structured_output_enabled = structured_output.get("enabled", True)
+        self.max_format_retries = structured_output.get("max_format_retries", 1)
+        self.single_flight_enabled = (self.config.get("single_flight", {}) or {}).get("enabled", True)
+        self.single_flight = SingleFlight()
+        prompt_cache = self.config.get("prompt_cache", {}) or {}
+        self.prompt_cache_enabled = prompt_cache.get("enabled", True)
+        self.min_cache_prefix_tokens = prompt_cache.get("min_prefix_tokens", 0)
+        self._breakers = {}
+
+    def client_for(self, provider):
+        """
+        Get (or lazily create) the client for a provider.
+        """
+        client = self._clients.get(provider)
+        if client is None:
+            client = create_client(provider, self.config)
+            self._clients[provider] = client
+        return client
+
+    def circuit_breaker(self, provider):
+        """
+        Get (or create) the circuit breaker for a provider.
+        """
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                provider,
+                self.config.get("circuit_breaker", {}),
+                logger=logging.getLogger("CircuitBreaker")
+            )
+            self._breakers[provider] = breaker
+        return breaker
+
+    async def generate(self, prompt, call_site=None):
+        """
+        Generate a completion for the prompt, retrying transient provider errors.
+
+        Timeouts and 5xx errors move the call straight to the next entry of
+        ``llm.failover.chain`` (if configured); backoff retries start once every
+        entry has failed.
+
+        Call sites with a JSON schema (``llm.structured_output``) request the
+        provider's structured output mode where the client supports it and are
+        validated locally; malformed responses are re-asked up to
+        ``max_format_retries`` times. If every response is malformed the last
+        one is returned and the caller's parser reports the error.
+
+        Identical concurrent calls (same call site, route, prompt and priority
+        lane) share a single provider call (``llm.single_flight``); cancelling
+        one caller does not affect the others. The provider call's usage is
+        recorded for the request that started it, and every joiner records a
+        cost-free shared call.
+
+        Args:
+            prompt (str): Fully formatted prompt.
+            call_site (str, optional): Name of the calling prompt family (e.g.,
+                "generate_steps"), used for model routing, per-call-site latency
+                tracking and hedging.
+
+        Returns:
+            str: Completion text.
+
+        Raises:
+            LLMCircuitOpenError: If the circuit of every candidate provider is open.
+            LLMError: If the call failed with a non-retryable error, exhausted its
+                retries, or the provider returned an empty/blocked response.
+        """
+        call_site = call_site or "default"
+        if not self.single_flight_enabled:
+            return await self._generate_validated(prompt, call_site)
+
+        route = self.router.resolve(call_site)
+        # The shared call queues in its starter's lane, so only callers of the same lane may join it
+        lane = self.rate_limiter.priorities.lane()
+        key = request_key(call_site, route.label, route.client_options, prompt, lane)
+        text, shared = await self.single_flight.run(key, lambda: self._generate_validated(prompt, call_site))
+        if shared:
+            METRICS.increment("llm.single_flight_shared", call_site=call_site)
+            USAGE.record_shared_call(call_site, route.provider, route.model)
+        return text
+
+    async def _generate_validated(self, prompt, call_site):
+        """
+        Generate a completion and re-ask while it does not match the call site's schema.
+        """
+        schema = self._response_schema(call_site)
+        text = await self._generate_text(prompt, call_site)
+        format_retries = 0
+        while schema is not None:
+            try:
+                parse_structured(text, schema)
+                break
+            except LLMResponseFormatError as e:
+                METRICS.increment("llm.malformed_responses", call_site=call_site)
+                if format_retries >= self.max_format_retries:
+                    self.logger.warning("Malformed %s response after %d re-asks: %s", call_site, format_retries, e)
+                    break
+                format_retries += 1
+                METRICS.increment("llm.format_retries", call_site=call_site)
+                self.logger.info("Malformed %s response (%s); re-asking.", call_site, e)
+                text = await self._generate_text(self._reask_prompt(prompt, e), call_site)
+        return text
+
+    async def _generate_text(self, prompt, call_site):
+        """
+        Run one completion through failover, circuit breaking and retries.
+        """
+        primary = self.router.resolve(call_site)
+        attempt = 1
+        tried = set()
+        while True:
+            route, breaker = self._select_route(primary, tried)
+            try:
+                text = await self._attempt(prompt, call_site, route)
+            except asyncio.CancelledError:
+                breaker.release_probe()
+                self.failover.release(route)
+                raise
+            except Exception as e:
+                if self._try_failover(e, breaker, route, primary, tried):
+                    continue
+                await asyncio.sleep(self._handle_failure(e, attempt, breaker, route))
+                attempt += 1
+                tried.clear()
+                continue
+
+            breaker.record_success()
+            self.failover.record_success(route)
+            return text
+
+    async def stream(self, prompt, call_site=None):
+        """
+        Stream a completion for the prompt as text deltas.
+
+        Failures before the first delta are retried like ``generate``; once text
+        has been yielded a failure is raised, since the caller already consumed
+        part of the output. Failover applies before the first delta only.
+        Providers without streaming support yield the full completion as a
+        single delta. Streams are never hedged, and the response schema is
+        passed to the provider but not re-asked on malformed output.
+
+        Args:
+            prompt (str): Fully formatted prompt.
+            call_site (str, optional): Name of the calling prompt family.
+
+        Yields:
+            str: Successive pieces of the completion text.
+
+        Raises:
+            LLMCircuitOpenError: If the provider's circuit is open.
+            LLMError: If the call failed (see ``generate``).
+        """
+        call_site = call_site or "default"
+        primary = self.router.resolve(call_site)
+        attempt = 1
+        tried = set()
+        while True:
+            route, breaker = self._select_route(primary, tried)
+            emitted = False
+            try:
+                async for delta in self._stream_attempt(prompt, call_site, route):
+                    emitted = True
+                    yield delta
+            except (asyncio.CancelledError, GeneratorExit):
+                breaker.release_probe()
+                self.failover.release(route)
+                raise
+            except Exception as e:
+                if not emitted and self._try_failover(e, breaker, route, primary, tried):
+                    continue
+                await asyncio.sleep(self._handle_failure(e, attempt, breaker, route, can_retry=not emitted))
+                attempt += 1
+                tried.clear()
+                continue
+
+            breaker.record_success()
+            self.failover.record_success(route)
+            return
+
+    def _response_schema(self, call_site):
+        return schema_for(call_site) if self.structured_output_enabled else None
+
+    def _reask_prompt(self, prompt, error):
+        note = (
+            f"\n\nYour previous response could not be used: {error}\n"
+            "Respond again with only the JSON object in the required format."
+        )
+        if isinstance(prompt, CacheablePrompt):
+            return CacheablePrompt(prompt.prefix, prompt.suffix + note)
+        return prompt + note
+
+    def _client_options(self, client, prompt, call_site, route):
+        """
+        Routed options for a client, plus the response schema and the cacheable
+        prompt prefix for clients that support structured output / prompt caching.
+        """
+        options = dict(route.client_options)
+        schema = self._response_schema(call_site)
+        if schema is not None and getattr(client, "supports_response_schema", False):
+            options["response_schema"] = schema
+
+        prefix = cache_prefix(prompt) if self.prompt_cache_enabled else None
+        if prefix and getattr(client, "supports_prompt_cache", False):
+            prefix_tokens = estimate_tokens(prefix)
+            if prefix_tokens >= self.min_cache_prefix_tokens:
+                options["cache_prefix"] = prefix
+                METRICS.increment("llm.prompt_cache_prefix_tokens", prefix_tokens, call_site=call_site, provider=route.provider)
+        return options
+
+    def _select_route(self, primary, tried):
+        """
+        Pick the route for the next provider call and admit it through its circuit breaker.
+
+        Routes whose circuit is open are skipped while failover entries remain.
+
+        Returns:
+            tuple: (Route, CircuitBreaker).
+
+        Raises:
+            LLMCircuitOpenError: If every remaining route's circuit is open.
+        """
+        while True:
+            route = self.failover.select(primary, tried)
+            breaker = self.circuit_breaker(route.provider)
+            try:
+                breaker.before_call()
+                return route, breaker
+            except LLMCircuitOpenError:
+                self.failover.release(route)
+                tried.add(route.label)
+                if not self.failover.has_next(primary, tried):
+                    raise
+
+    def _try_failover(self, error, breaker, route, primary, tried):
+        """
+        Record a failed call against its route and decide whether to move to the next route now.
+
+        Returns:
+            bool: True if the caller should immediately retry on the next failover entry.
+        """
+        tried.add(route.label)
+        if not is_failover_error(error):
+            self.failover.release(route)
+            return False
+        self.failover.record_failure(route)
+        if not (self.failover.enabled and self.failover.has_next(primary, tried)):
+            return False
+
+        breaker.record_failure()
+        METRICS.increment("llm.failovers", route=route.label)
+        self.logger.warning("LLM call to %s failed (%s); failing over to the next provider.", route.label, error)
+        return True
+
+    def _handle_failure(self, error, attempt, breaker, route, can_retry=True):
+        """
+        Classify a failed attempt and return the backoff delay, or raise if it must not be retried.
+        """
+        labels = {"provider": route.provider, "model": route.model}
+        retryable, retry_after = classify_error(error)
+        if not retryable:
+            breaker.release_probe()
+            if isinstance(error, LLMError):
+                raise error
+            raise LLMError(f"LLM call to {route.label} failed: {error}") from error
+
+        breaker.record_failure()
+        METRICS.increment("llm.transient_errors", **labels)
+        if not can_retry or attempt >= self.retry_policy.max_attempts:
+            raise LLMError(f"LLM call to {route.label} failed after {attempt} attempts: {error}") from error
+
+        delay = self.retry_policy.backoff(attempt, retry_after)
+        METRICS.increment("llm.retries", **labels)
+        self.logger.warning(
+            "Transient LLM error from %s (attempt %d/%d): %s. Retrying in %.2fs.",
+            route.label, attempt, self.retry_policy.max_attempts, error, delay
+        )
+        return delay
+
+    async def _with_timeout(self, awaitable):
+        if self.retry_policy.request_timeout:
+            return await asyncio.wait_for(awaitable, timeout=self.retry_policy.request_timeout)
+        return await awaitable
+
+    async def _attempt(self, prompt, call_site, route):
+        """
+        One logical attempt, hedged with a duplicate call if it runs unusually long.
+        """
+        delay = self.hedge_policy.hedge_delay(call_site)
+        if delay is None:
+            return await self._provider_call(prompt, call_site, route)
+
+        primary = asyncio.ensure_future(self._provider_call(prompt, call_site, route))
+        calls = {primary}
+        try:
+            done, _ = await asyncio.wait(calls, timeout=delay)
+            if not done and self.hedge_policy.try_acquire_hedge():
+                self.logger.debug("Hedging %s call after %.2fs.", call_site, delay)
+                METRICS.increment("llm.hedges_sent", call_site=call_site)
+                calls.add(asyncio.ensure_future(self._provider_call(prompt, call_site, route)))
+
+            # First success wins; only fail once every outstanding call has failed.
+            first_error = None
+            pending = calls
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            METRICS.increment("llm.hedge_wins", call_site=call_site)
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in calls:
+                if not task.done():
+                    task.cancel()
+
+    async def _provider_call(self, prompt, call_site, route):
+        """
+        A single rate-limited provider call.
+        """
+        client = self.client_for(route.provider)
+        prompt_tokens = estimate_tokens(prompt)
+        async with self.rate_limiter.slot(route.provider, route.model, prompt_tokens, call_site=call_site) as ticket:
+            started = time.monotonic()
+            with call_site_scope(call_site):
+                response = await self._with_timeout(
+                    client.generate(prompt, **self._client_options(client, prompt, call_site, route))
+                )
+            latency = time.monotonic() - started
+            text = self._extract_text(response)
+            completion_tokens = ticket.output_tokens = estimate_tokens(text)
+
+        self.hedge_policy.record_latency(call_site, latency)
+        METRICS.observe("llm.latency_seconds", latency, call_site=call_site, provider=route.provider, model=route.model)
+        self.rate_limiter.record_tokens(route.provider, route.model, completion_tokens)
+        USAGE.record_call(call_site, route.provider, route.model, prompt_tokens, completion_tokens, latency)
+        return text
+
+    async def _stream_attempt(self, prompt, call_site, route):
+        """
+        A single rate-limited streaming provider call.
+        """
+        labels = {"call_site": call_site, "provider": route.provider, "model": route.model}
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = 0
+        started = time.monotonic()
+        async with self.rate_limiter.slot(route.provider, route.model, prompt_tokens, call_site=call_site) as ticket:
+            async for delta in self._provider_chunks(prompt, call_site, route):
+                if not delta:
+                    continue
+                if not completion_tokens:
+                    METRICS.observe("llm.time_to_first_token_seconds", time.monotonic() - started, **labels)
+                completion_tokens += estimate_tokens(delta)
+                ticket.output_tokens = completion_tokens
+                yield delta
+
+        self.rate_limiter.record_tokens(route.provider, route.model, completion_tokens)
+        USAGE.record_call(call_site, route.provider, route.model, prompt_tokens, completion_tokens, time.monotonic() - started)
+
+    async def _provider_chunks(self, prompt, call_site, route):
+        """
+        Iterate the provider's stream, or its full completion if it cannot stream.
+
+        The request timeout applies to the gap between chunks rather than the whole stream.
+        """
+        client = self.client_for(route.provider)
+        options = self._client_options(client, prompt, call_site, route)
+        stream_fn = getattr(client, "generate_stream", None)
+        if stream_fn is None:
+            with call_site_scope(call_site):
+                response = await self._with_timeout(client.generate(prompt, **options))
+            yield self._extract_text(response)
+            return
+
+        iterator = stream_fn(prompt, **options).__aiter__()
+        while True:
+            try:
+                with call_site_scope(call_site):
+                    chunk = await self._with_timeout(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+            yield chunk if isinstance(chunk, str) else (getattr(chunk, "text", None) or "")
+
+    def _extract_text(self, response):
+        """
+        Normalize provider responses (plain strings or SDK objects with ``.text``).
+        """
+        if isinstance(response, str):
+            return response
+        text = getattr(response, "text", None)
+        if text:
+            return text
+        feedback = getattr(response, "prompt_feedback", None)
+        block_reason = getattr(feedback, "block_reason", None) or "Unknown"
+        raise LLMError(f"LLM response was empty/blocked (Reason: {block_reason})")
@@ -0,0 +1,114 @@
+"""
+Request hedging policy for cutting LLM tail latency.
+"""
+
+import threading
+from collections import deque
+
+
+class LatencyTracker:
+    """
+    Keeps a bounded window of recent successful call latencies per call site.
+    """
+
+    def __init__(self, window_size=200):
+        """
+        Initialize the LatencyTracker.
+
+        Args:
+            window_size (int, optional): Samples kept per call site.
+        """
+        self.window_size = window_size
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, call_site, seconds):
+        with self._lock:
+            samples = self._samples.get(call_site)
+            if samples is None:
+                samples = deque(maxlen=self.window_size)
+                self._samples[call_site] = samples
+            samples.append(seconds)
+
+    def count(self, call_site):
+        with self._lock:
+            return len(self._samples.get(call_site, ()))
+
+    def percentile(self, call_site, fraction):
+        """
+        Nearest-rank percentile of the recorded latencies, or None if there are none.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(call_site, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(fraction * len(samples))) - 1))
+        return samples[index]
+
+
+class HedgePolicy:
+    """
+    Decides when a duplicate ("hedge") request should be sent.
+
+    A hedge is sent once a call has been outstanding longer than the configured
+    percentile of observed latency for its call site. Hedges draw from a budget
+    that earns ``max_hedge_fraction`` credit per call, so the hedge rate can
+    never exceed that fraction of traffic over time.
+    """
+
+    # Upper bound on saved-up hedge credit so an idle period cannot fund a burst.
+    MAX_CREDIT = 10.0
+
+    def __init__(self, config=None, tracker=None):
+        """
+        Initialize the HedgePolicy.
+
+        Args:
+            config (dict, optional): The ``llm.hedging`` configuration section.
+            tracker (LatencyTracker, optional): Latency tracker. Created if omitted.
+        """
+        config = config or {}
+        self.enabled = config.get("enabled", False)
+        self.percentile = float(config.get("percentile", 0.95))
+        self.min_samples = int(config.get("min_samples", 20))
+        self.max_hedge_fraction = float(config.get("max_hedge_fraction", 0.05))
+        self.min_delay = float(config.get("min_delay_seconds", 0.0))
+        call_sites = config.get("call_sites")
+        self.call_sites = set(call_sites) if call_sites else None
+        self.tracker = tracker or LatencyTracker()
+        self._credit = 0.0
+        self._lock = threading.Lock()
+
+    def applies_to(self, call_site):
+        return self.enabled and (self.call_sites is None or call_site in self.call_sites)
+
+    def hedge_delay(self, call_site):
+        """
+        Seconds to wait before hedging a call, or None if it should not be hedged.
+
+        Every call asking for a delay earns hedge credit, which keeps the budget
+        proportional to traffic.
+        """
+        if not self.applies_to(call_site):
+            return None
+        with self._lock:
+            self._credit = min(self.MAX_CREDIT, self._credit + self.max_hedge_fraction)
+        if self.tracker.count(call_site) < self.min_samples:
+            return None
+        return max(self.min_delay, self.tracker.percentile(call_site, self.percentile))
+
+    def try_acquire_hedge(self):
+        """
+        Spend one hedge credit if available.
+
+        Returns:
+            bool: True if a hedge may be sent.
+        """
+        with self._lock:
+            if self._credit >= 1.0:
+                self._credit -= 1.0
+                return True
+            return False
+
+    def record_latency(self, call_site, seconds):
+        self.tracker.record(call_site, seconds)
@@ -0,0 +1,416 @@
+"""
+Deterministic local ``mock`` LLM provider for offline benchmarks and tests.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import time
+from fnmatch import fnmatchcase
+
+from llm.call_context import current_call_site
+from llm.tokens import estimate_tokens
+
+
+class MockProviderError(Exception):
+    """
+    Injected provider failure. Carries an HTTP-style ``status_code`` so the
+    gateway classifies it like a real provider error (e.g., 503 is retryable).
+    """
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# Output key each prompt template asks for -> prompt family, used when the
+# call site is not available (e.g., requests arriving through the Ollama stand-in).
+_OUTPUT_KEY_CALL_SITES = {
+    "phases": "generate_phases",
+    "tasks": "generate_tasks",
+    "steps": "generate_steps",
+    "steps_by_task": "generate_steps_batch",
+    "revised_steps": "revise_steps",
+    "evaluations": "evaluate_alternatives_batch",
+    "evaluation": "evaluate_criterion",
+    "validation_results": "qa_validate_checklist",
+}
+_OUTPUT_KEY_PATTERN = re.compile(r'single key "(\w+)"')
+_CRITIQUE_PATTERN = re.compile(r"You are acting as an? ([\w ]+?)\.")
+
+
+def infer_call_site(prompt):
+    """
+    Best-effort prompt family for a prompt from this backend's templates.
+    """
+    match = _OUTPUT_KEY_PATTERN.search(prompt)
+    if match and match.group(1) in _OUTPUT_KEY_CALL_SITES:
+        return _OUTPUT_KEY_CALL_SITES[match.group(1)]
+    match = _CRITIQUE_PATTERN.search(prompt)
+    if match:
+        return "critique_" + match.group(1).strip().replace(" ", "_")
+    if "**Selected Persona Name:**" in prompt:
+        return "select_persona"
+    return "default"
+
+
+def _section_json(prompt, header):
+    """
+    Decode the first JSON value following ``header`` in a prompt, or None.
+    """
+    start = prompt.find(header)
+    if start < 0:
+        return None
+    for idx in range(start + len(header), len(prompt)):
+        if prompt[idx] in "[{":
+            try:
+                return json.JSONDecoder().raw_decode(prompt, idx)[0]
+            except ValueError:
+                return None
+    return None
+
+
+def _section_text(prompt, header):
+    """
+    First non-empty line following ``header`` in a prompt, or None.
+    """
+    start = prompt.find(header)
+    if start < 0:
+        return None
+    for line in prompt[start + len(header):].splitlines():
+        if line.strip():
+            return line.strip()
+    return None
+
+
+class MockLLMClient:
+    """
+    Plays back canned or template-generated responses for each prompt family.
+
+    Responses are chosen by call site (``generate_phases``, ``critique_*``,
+    ``evaluate_*`` ...), so every component that parses LLM output gets
+    well-formed JSON. Latency, injected errors and scores are drawn from a
+    random stream seeded by the config seed, the prompt and how many times
+    that prompt has been seen, so runs are reproducible regardless of task
+    scheduling while retries of the same prompt still see fresh outcomes.
+
+    Calls passing ``cache_prefix`` simulate provider prompt caching: the first
+    call with a prefix writes it to a local cache (kept ``prompt_cache_ttl_seconds``
+    after its last use) and later calls skip the prefill time
+    (``seconds_per_prompt_token``) of the cached tokens, reported as
+    ``cached_prompt_tokens`` in the usage snapshot.
+
+    ``malformed_rate`` truncates that share of JSON responses to simulate
+    malformed output; calls passing ``response_schema`` (structured output)
+    are never malformed.
+    ``batch_omission_rate`` leaves that share of tasks out of batched step
+    responses (``generate_steps_batch``), exercising per-task fallbacks.
+    ``atomic_rate`` marks that share of generated tasks ``"atomic": true``.
+    """
+
+    DEFAULT_LATENCY = {"distribution": "fixed", "seconds": 0.0}
+    supports_response_schema = True
+    supports_prompt_cache = True
+
+    def __init__(self, config=None, logger=None):
+        """
+        Initialize the MockLLMClient.
+
+        Args:
+            config (dict, optional): The ``llm.mock`` configuration section.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        config = config or {}
+        self.seed = config.get("seed", 0)
+        self.latency = config.get("latency", {}) or {}
+        self.seconds_per_output_token = config.get("seconds_per_output_token", 0.0)
+        self.seconds_per_prompt_token = config.get("seconds_per_prompt_token", 0.0)
+        self.prompt_cache_ttl_seconds = config.get("prompt_cache_ttl_seconds", 300)
+        self.items_per_list = config.get("items_per_list", 3)
+        self.stream_chunk_chars = config.get("stream_chunk_chars", 64)
+        self.responses = config.get("responses", {}) or {}
+        self.malformed_rate = config.get("malformed_rate", 0.0)
+        self.batch_omission_rate = config.get("batch_omission_rate", 0.0)
+        self.atomic_rate = config.get("atomic_rate", 0.0)
+
+        errors = config.get("errors", {}) or {}
+        self.error_rate = errors.get("rate", 0.0)
+        self.error_status_codes = errors.get("status_codes", [503])
+        self.timeout_rate = errors.get("timeout_rate", 0.0)
+        self.error_call_sites = errors.get("call_sites")
+
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._seen = {}
+        self._prefix_cache = {}
+        self.usage = {}
+        self._templates = [
+            ("generate_phases", self._phases),
+            ("generate_tasks", self._tasks),
+            ("generate_steps", self._steps),
+            ("generate_steps_batch", self._steps_batch),
+            ("generate_*_alternatives", self._alternatives),
+            ("revise_steps", self._revised_steps),
+            ("critique_*", self._critique),
+            ("evaluate_alternatives_batch", self._evaluation_matrix),
+            ("evaluate_*", self._evaluation),
+            ("justify_*", self._justification),
+            ("select_persona", self._persona),
+            ("qa_validate_checklist", self._validation),
+            ("analyze_and_recover", self._recovery_plan),
+            ("replanning", self._recovery_plan),
+        ]
+
+    async def generate(self, prompt, **options):
+        """
+        Return the mock completion for a prompt after the simulated latency.
+
+        Raises:
+            MockProviderError: If an error is injected for this call.
+            TimeoutError: If a timeout is injected for this call.
+        """
+        call_site, rng = self._begin(prompt)
+        text = self._respond(call_site, prompt, rng, options.get("response_schema"))
+        cached_tokens = self._cached_prefix_tokens(prompt, options.get("cache_prefix"))
+        await asyncio.sleep(
+            self._latency(call_site, rng) + self._prefill_seconds(prompt, cached_tokens) + self._decode_seconds(text)
+        )
+        self._record(call_site, prompt, text, cached_tokens)
+        return text
+
+    async def generate_stream(self, prompt, **options):
+        """
+        Stream the mock completion in fixed-size chunks.
+
+        The first chunk arrives after the base latency and prefill time; later
+        chunks are paced by ``seconds_per_output_token``.
+        """
+        call_site, rng = self._begin(prompt)
+        text = self._respond(call_site, prompt, rng, options.get("response_schema"))
+        cached_tokens = self._cached_prefix_tokens(prompt, options.get("cache_prefix"))
+        await asyncio.sleep(self._latency(call_site, rng) + self._prefill_seconds(prompt, cached_tokens))
+        for offset in range(0, len(text), self.stream_chunk_chars):
+            chunk = text[offset:offset + self.stream_chunk_chars]
+            await asyncio.sleep(self._decode_seconds(chunk))
+            yield chunk
+        self._record(call_site, prompt, text, cached_tokens)
+
+    def usage_snapshot(self):
+        """
+        Token accounting per call site plus totals.
+
+        Returns:
+            dict: ``{"total": {...}, "call_sites": {call_site: {...}}}`` with
+                calls, errors, prompt_tokens, cached_prompt_tokens, cache_hits
+                and completion_tokens.
+        """
+        total = self._empty_usage()
+        for entry in self.usage.values():
+            for key in total:
+                total[key] += entry[key]
+        return {"total": total, "call_sites": {k: dict(v) for k, v in self.usage.items()}}
+
+    @staticmethod
+    def _empty_usage():
+        return {"calls": 0, "errors": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "cache_hits": 0, "completion_tokens": 0}
+
+    def _usage_entry(self, call_site):
+        entry = self.usage.get(call_site)
+        if entry is None:
+            entry = self._empty_usage()
+            self.usage[call_site] = entry
+        return entry
+
+    def _begin(self, prompt):
+        """
+        Resolve the call site and per-call random stream, and apply error injection.
+        """
+        call_site = current_call_site() or infer_call_site(prompt)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        occurrence = self._seen.get(digest, 0)
+        self._seen[digest] = occurrence + 1
+        rng = random.Random(f"{self.seed}:{call_site}:{digest}:{occurrence}")
+
+        if self.error_call_sites is None or any(fnmatchcase(call_site, p) for p in self.error_call_sites):
+            roll = rng.random()
+            if roll < self.timeout_rate:
+                self._usage_entry(call_site)["errors"] += 1
+                raise TimeoutError(f"Mock provider timed out ({call_site})")
+            if roll < self.timeout_rate + self.error_rate:
+                self._usage_entry(call_site)["errors"] += 1
+                status = rng.choice(self.error_status_codes)
+                raise MockProviderError(f"Mock provider error {status} ({call_site})", status)
+        return call_site, rng
+
+    def _record(self, call_site, prompt, text, cached_tokens=0):
+        entry = self._usage_entry(call_site)
+        entry["calls"] += 1
+        entry["prompt_tokens"] += estimate_tokens(prompt)
+        entry["cached_prompt_tokens"] += cached_tokens
+        entry["cache_hits"] += 1 if cached_tokens else 0
+        entry["completion_tokens"] += estimate_tokens(text)
+
+    def _cached_prefix_tokens(self, prompt, prefix):
+        """
+        Look up (and write) a prompt prefix in the simulated cache.
+
+        Returns:
+            int: Prompt tokens served from the cache; 0 on a miss.
+        """
+        if not prefix or not prompt.startswith(prefix):
+            return 0
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        expires_at = self._prefix_cache.get(key)
+        self._prefix_cache[key] = now + self.prompt_cache_ttl_seconds
+        if expires_at is None or expires_at < now:
+            return 0
+        return estimate_tokens(prefix)
+
+    def _prefill_seconds(self, prompt, cached_tokens):
+        return max(0, estimate_tokens(prompt) - cached_tokens) * self.seconds_per_prompt_token
+
+    def _latency(self, call_site, rng):
+        """
+        Draw the base latency for a call from its configured distribution.
+        """
+        spec = self.latency.get(call_site)
+        if spec is None:
+            spec = next(
+                (entry for pattern, entry in self.latency.items() if pattern != "default" and fnmatchcase(call_site, pattern)),
+                self.latency.get("default", self.DEFAULT_LATENCY)
+            )
+
+        distribution = spec.get("distribution", "fixed")
+        if distribution == "fixed":
+            seconds = spec.get("seconds", 0.0)
+        elif distribution == "uniform":
+            seconds = rng.uniform(spec.get("min_seconds", 0.0), spec.get("max_seconds", 1.0))
+        elif distribution == "normal":
+            seconds = rng.gauss(spec.get("mean_seconds", 1.0), spec.get("stddev_seconds", 0.1))
+        elif distribution == "lognormal":
+            seconds = rng.lognormvariate(math.log(spec.get("median_seconds", 1.0)), spec.get("sigma", 0.5))
+        elif distribution == "exponential":
+            seconds = rng.expovariate(1.0 / spec.get("mean_seconds", 1.0))
+        else:
+            self.logger.warning("Unknown mock latency distribution '%s'; using 0s.", distribution)
+            seconds = 0.0
+        return max(0.0, seconds)
+
+    def _decode_seconds(self, text):
+        return estimate_tokens(text) * self.seconds_per_output_token
+
+    def _respond(self, call_site, prompt, rng, response_schema=None):
+        """
+        Canned response for the call site if configured, otherwise its template.
+        """
+        text = self._render(call_site, prompt, rng)
+        if (
+            self.malformed_rate and response_schema is None
+            and text.startswith(("{", "[")) and rng.random() < self.malformed_rate
+        ):
+            return "Here is the requested JSON:\n```json\n" + text[: len(text) * 2 // 3] + "\n```"
+        return text
+
+    def _render(self, call_site, prompt, rng):
+        canned = self.responses.get(call_site)
+        if canned is None:
+            canned = next((v for p, v in self.responses.items() if fnmatchcase(call_site, p)), None)
+        if canned is not None:
+            return canned if isinstance(canned, str) else json.dumps(canned)
+
+        for pattern, template in self._templates:
+            if fnmatchcase(call_site, pattern):
+                result = template(call_site, prompt, rng)
+                return result if isinstance(result, str) else json.dumps(result, indent=2)
+        return "Mock response."
+
+    # --- Templates ---
+
+    def _items(self, kind, count=None):
+        return [
+            {"name": f"Mock {kind} {i + 1}", "description": f"Description of mock {kind.lower()} {i + 1}."}
+            for i in range(count or self.items_per_list)
+        ]
+
+    def _phases(self, call_site, prompt, rng):
+        return {"phases": self._items("Phase")}
+
+    def _tasks(self, call_site, prompt, rng):
+        tasks = self._items("Task")
+        if self.atomic_rate:
+            for task in tasks:
+                task["atomic"] = rng.random() < self.atomic_rate
+        return {"tasks": tasks}
+
+    def _steps(self, call_site, prompt, rng):
+        steps = []
+        for i in range(self.items_per_list):
+            text = f"Carry out mock step {i + 1}."
+            steps.append({"step_id": f"step_{i + 1}", "prompt": text, "description": text})
+        return {"steps": steps}
+
+    def _steps_batch(self, call_site, prompt, rng):
+        tasks = _section_json(prompt, "**Tasks:**") or {}
+        return {"steps_by_task": {
+            key: self._steps(call_site, prompt, rng)["steps"]
+            for key in tasks
+            if not (self.batch_omission_rate and rng.random() < self.batch_omission_rate)
+        }}
+
+    def _alternatives(self, call_site, prompt, rng):
+        # e.g. "generate_phase_alternatives" -> "Phase"
+        kind = call_site[len("generate_"):-len("_alternatives")].capitalize()
+        return {"alternatives": [self._items(f"{kind} (alt {a + 1})") for a in range(2)]}
+
+    def _revised_steps(self, call_site, prompt, rng):
+        steps = _section_json(prompt, "**Original Steps:**")
+        if not isinstance(steps, list):
+            steps = self._steps(call_site, prompt, rng)["steps"]
+        return {"revised_steps": steps}
+
+    def _critique(self, call_site, prompt, rng):
+        return f"Mock critique from {call_site[len('critique_'):]}: the steps are reasonable; no major issues identified."
+
+    def _score(self, rng):
+        return round(rng.uniform(0.5, 1.0), 2)
+
+    def _evaluation_matrix(self, call_site, prompt, rng):
+        alternatives = _section_json(prompt, "**Alternatives:**") or []
+        criteria = _section_json(prompt, "**Evaluation Criteria:**") or []
+        return {"evaluations": [
+            {
+                "alternative_idx": idx,
+                "criteria": {c: {"score": self._score(rng), "justification": f"Mock {c} assessment."} for c in criteria}
+            }
+            for idx in range(len(alternatives))
+        ]}
+
+    def _evaluation(self, call_site, prompt, rng):
+        return {"evaluation": {"score": self._score(rng), "justification": f"Mock assessment for {call_site}."}}
+
+    def _justification(self, call_site, prompt, rng):
+        return "Mock justification: the selected alternative scored highest across the evaluation criteria."
+
+    def _persona(self, call_site, prompt, rng):
+        names = _section_text(prompt, "**Available Personas (Names Only):**") or "Default"
+        return names.lstrip("-* ").split(",")[0].strip()
+
+    def _validation(self, call_site, prompt, rng):
+        return {"validation_results": {
+            "score": self._score(rng),
+            "feedback": "Mock validation feedback.",
+            "issues": [],
+            "suggestions": []
+        }}
+
+    def _recovery_plan(self, call_site, prompt, rng):
+        return {
+            "analysis": "Mock analysis of the failure.",
+            "recovery_strategy": "Retry the failed step with corrected inputs.",
+            "next_actions": [{"type": "instruction", "details": {"instruction": "Retry the failed step."}}],
+            "confidence_score": self._score(rng)
+        }
@@ -0,0 +1,164 @@
+"""
+Local Ollama-compatible HTTP stand-in backed by the mock provider.
+
+Serves the subset of the Ollama API used by ``OllamaClient`` (``POST
+/api/generate``, streaming or not, plus ``GET /api/tags`` and ``GET /``), so a
+failover chain ending in ``provider: ollama`` can be exercised without a real
+Ollama install or model download.
+
+Usage::
+
+    async with OllamaStandIn({"seed": 1}) as standin:
+        config["ollama"] = {"host": standin.url}
+        ...
+
+or from python_backend/src: ``python -m llm.ollama_standin --port 11434``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+
+from llm.mock_provider import MockLLMClient
+from llm.tokens import estimate_tokens
+
+
+class OllamaStandIn:
+    """
+    Minimal asyncio HTTP/1.1 server speaking the Ollama generate API.
+    """
+
+    def __init__(self, mock_config=None, host="127.0.0.1", port=0, logger=None):
+        """
+        Initialize the OllamaStandIn.
+
+        Args:
+            mock_config (dict, optional): ``llm.mock``-style settings for the backing mock.
+            host (str, optional): Interface to bind.
+            port (int, optional): Port to bind; 0 picks a free port.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.mock = MockLLMClient(mock_config)
+        self.host = host
+        self.port = port
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.logger.info("Ollama stand-in listening on %s", self.url)
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            if not request_line:
+                return
+            method, path = request_line.split(" ")[:2]
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+
+            if method == "GET" and path == "/":
+                await self._respond(writer, 200, "Ollama is running", content_type="text/plain")
+            elif method == "GET" and path == "/api/tags":
+                await self._respond(writer, 200, {"models": [{"name": "mock", "model": "mock"}]})
+            elif method == "POST" and path == "/api/generate":
+                await self._generate(writer, json.loads(body or b"{}"))
+            else:
+                await self._respond(writer, 404, {"error": f"{method} {path} not found"})
+        except Exception as e:
+            self.logger.error("Ollama stand-in request failed: %s", e, exc_info=True)
+            status = getattr(e, "status_code", 500)
+            try:
+                await self._respond(writer, status, {"error": str(e)})
+            except Exception:
+                pass
+        finally:
+            writer.close()
+
+    async def _generate(self, writer, request):
+        model = request.get("model", "mock")
+        prompt = request.get("prompt", "")
+        schema = request.get("format") if isinstance(request.get("format"), dict) else None
+        base = {"model": model, "created_at": datetime.now(timezone.utc).isoformat()}
+
+        if not request.get("stream", True):
+            text = await self.mock.generate(prompt, response_schema=schema)
+            await self._respond(writer, 200, {
+                **base, "response": text, "done": True, "done_reason": "stop",
+                "prompt_eval_count": estimate_tokens(prompt), "eval_count": estimate_tokens(text),
+            })
+            return
+
+        # Streaming: newline-delimited JSON objects, body delimited by connection close.
+        # Pull the first chunk before sending headers so injected errors still get an error status.
+        stream = self.mock.generate_stream(prompt, response_schema=schema).__aiter__()
+        try:
+            chunks = [await stream.__anext__()]
+        except StopAsyncIteration:
+            chunks = []
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+        completion_tokens = 0
+        while chunks:
+            chunk = chunks.pop()
+            completion_tokens += estimate_tokens(chunk)
+            writer.write((json.dumps({**base, "response": chunk, "done": False}) + "\n").encode("utf-8"))
+            await writer.drain()
+            try:
+                chunks.append(await stream.__anext__())
+            except StopAsyncIteration:
+                pass
+        writer.write((json.dumps({
+            **base, "response": "", "done": True, "done_reason": "stop",
+            "prompt_eval_count": estimate_tokens(prompt), "eval_count": completion_tokens,
+        }) + "\n").encode("utf-8"))
+        await writer.drain()
+
+    async def _respond(self, writer, status, payload, content_type="application/json"):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        body = body.encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+            + body
+        )
+        await writer.drain()
+
+
+async def _serve(args):
+    async with OllamaStandIn({"seed": args.seed}, host=args.host, port=args.port):
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Ollama-compatible mock stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--seed", type=int, default=0)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve(parser.parse_args()))
@@ -0,0 +1,143 @@
+"""
+Priority lanes for queued LLM calls.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+
+from llm.call_context import current_priority, current_rpc_method
+
+# Highest priority first
+PRIORITY_LANES = ("interactive", "normal", "background")
+
+# Lane per JSON-RPC method when the configuration does not say otherwise: calls
+# a user is actively waiting on go first, whole-plan generation goes last.
+DEFAULT_METHOD_PRIORITIES = {
+    "reasoning/selectPersona": "interactive",
+    "reasoning/getPersonaContentByName": "interactive",
+    "reasoning/analyzeAndRecover": "interactive",
+    "reasoning/replanning": "interactive",
+    "reasoning/expandNode": "interactive",
+    "knowledge/search": "interactive",
+    "reasoning/refineSteps": "normal",
+    "reasoning/regenerateNode": "normal",
+    "executeTask": "normal",
+    "reasoning/generatePlan": "background",
+}
+
+
+class PriorityPolicy:
+    """
+    Resolves the priority lane of an LLM call.
+
+    An explicit lane (``llm.call_context.priority_scope`` or the ``priority``
+    RPC parameter) wins; otherwise the lane configured for the RPC method that
+    made the call, then ``default``.
+    """
+
+    def __init__(self, config=None, logger=None):
+        """
+        Initialize the PriorityPolicy.
+
+        Args:
+            config (dict, optional): The ``llm.rate_limits.priorities`` configuration section.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        config = config or {}
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.aging_seconds = config.get("aging_seconds", 5.0)
+        self.default = config.get("default", "normal")
+        self.methods = {**DEFAULT_METHOD_PRIORITIES, **(config.get("methods", {}) or {})}
+
+    def lane(self):
+        """
+        Lane name for a call made in the current context.
+        """
+        name = current_priority() or self.methods.get(current_rpc_method()) or self.default
+        if name not in PRIORITY_LANES:
+            self.logger.warning("Unknown LLM priority '%s'; using '%s'.", name, self.default)
+            name = self.default if self.default in PRIORITY_LANES else "normal"
+        return name
+
+    def rank(self, lane):
+        return PRIORITY_LANES.index(lane)
+
+
+class PriorityTurnstile:
+    """
+    Mutex whose waiters are woken by priority rather than arrival order.
+
+    Among waiters, the lowest effective rank wins, then the earliest arrival.
+    A waiter's effective rank improves by one lane per ``aging_seconds`` spent
+    waiting, so lower lanes cannot be starved by a steady stream of
+    higher-priority calls.
+    """
+
+    def __init__(self, aging_seconds=5.0, clock=time.monotonic):
+        """
+        Initialize the PriorityTurnstile.
+
+        Args:
+            aging_seconds (float, optional): Wait that promotes a waiter by one lane; 0 disables aging.
+            clock (callable, optional): Monotonic clock, injectable for benchmarks.
+        """
+        self.aging_seconds = aging_seconds
+        self._clock = clock
+        self._locked = False
+        self._waiters = []  # [rank, seq, enqueued_at, future]
+        self._seq = itertools.count()
+
+    def locked(self):
+        return self._locked
+
+    async def acquire(self, rank):
+        if not self._locked and not self._waiters:
+            self._locked = True
+            return
+        waiter = [rank, next(self._seq), self._clock(), asyncio.get_running_loop().create_future()]
+        self._waiters.append(waiter)
+        try:
+            await waiter[3]
+        except asyncio.CancelledError:
+            if waiter[3].done() and not waiter[3].cancelled():
+                # Granted just as we were cancelled: hand the turnstile on
+                self.release()
+            else:
+                # Dropped here, or already by release() once its future was cancelled
+                self._waiters = [w for w in self._waiters if w is not waiter]
+            raise
+
+    def release(self):
+        # A cancelled waiter keeps its entry until its task runs again; never hand ownership to it
+        self._waiters = [w for w in self._waiters if not w[3].done()]
+        if not self._waiters:
+            self._locked = False
+            return
+        now = self._clock()
+        waiter = min(self._waiters, key=lambda w: (self._effective_rank(w, now), w[1]))
+        self._waiters.remove(waiter)
+        waiter[3].set_result(True)  # Ownership passes directly to the woken waiter
+
+    def _effective_rank(self, waiter, now):
+        if not self.aging_seconds:
+            return waiter[0]
+        return max(0, waiter[0] - int((now - waiter[2]) / self.aging_seconds))
+
+    def slot(self, rank):
+        return _TurnstileSlot(self, rank)
+
+
+class _TurnstileSlot:
+    __slots__ = ("turnstile", "rank")
+
+    def __init__(self, turnstile, rank):
+        self.turnstile = turnstile
+        self.rank = rank
+
+    async def __aenter__(self):
+        await self.turnstile.acquire(self.rank)
+
+    async def __aexit__(self, *exc_info):
+        self.turnstile.release()
@@ -0,0 +1,141 @@
+"""
+Token-aware prompt budgeting and context compaction.
+"""
+
+import json
+import logging
+
+from llm.tokens import CHARS_PER_TOKEN, estimate_tokens
+from utils.metrics import METRICS
+
+# Context keys holding the sibling phase/task lists that grow with the plan.
+SIBLING_KEYS = ("phases", "tasks")
+
+
+def compact_json(value):
+    """
+    Serialize without indentation or padding whitespace.
+    """
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class PromptBudget:
+    """
+    Builds prompts whose embedded context stays within a per-call-site token budget.
+
+    Contexts are compacted before serialization: sibling phases/tasks are
+    reduced to their names (their full bodies, including nested steps, are
+    what makes prompt size grow quadratically over a plan) and JSON is
+    emitted without indentation. If a prompt still exceeds its budget, the
+    sibling lists are dropped and then long string values are truncated.
+    Estimated prompt tokens before and after compaction are exported as
+    metrics. The "before" figure is estimated from how much longer the full
+    context's compact JSON is than the context actually sent, so the
+    uncompacted prompt is never rendered (and indentation is not counted).
+    """
+
+    # Longest string value kept when truncating an over-budget context.
+    TRUNCATED_VALUE_CHARS = 400
+
+    def __init__(self, config=None, logger=None):
+        """
+        Initialize the PromptBudget.
+
+        Args:
+            config (dict, optional): The ``llm.prompt_budget`` configuration section.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        config = config or {}
+        self.enabled = config.get("enabled", True)
+        self.max_prompt_tokens = config.get("max_prompt_tokens", {}) or {}
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+
+    def budget_for(self, call_site):
+        """
+        Token budget for a call site, or None if unlimited.
+        """
+        return self.max_prompt_tokens.get(call_site, self.max_prompt_tokens.get("default"))
+
+    def build_prompt(self, call_site, context, render):
+        """
+        Render a prompt with a compacted, budgeted context.
+
+        Args:
+            call_site (str): Call site name (e.g., "generate_steps").
+            context (dict): Context to embed in the prompt.
+            render (callable): Takes the serialized context string, returns the full prompt.
+
+        Returns:
+            str: The prompt to send.
+        """
+        if not self.enabled:
+            return render(json.dumps(context, indent=2))
+
+        budget = self.budget_for(call_site)
+
+        prompt = serialized = None
+        for candidate in self._reductions(context):
+            serialized = compact_json(candidate)
+            prompt = render(serialized)
+            if budget is None or estimate_tokens(prompt) <= budget:
+                break
+        after_tokens = estimate_tokens(prompt)
+        removed_chars = max(0, len(compact_json(context)) - len(serialized))
+        before_tokens = after_tokens + (removed_chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+        if budget is not None and after_tokens > budget:
+            self.logger.warning(
+                "Prompt for %s is ~%d tokens after compaction, over its budget of %d.",
+                call_site, after_tokens, budget
+            )
+            METRICS.increment("llm.prompt_budget_exceeded", call_site=call_site)
+        METRICS.observe("llm.prompt_tokens_before", before_tokens, call_site=call_site)
+        METRICS.observe("llm.prompt_tokens_after", after_tokens, call_site=call_site)
+        return prompt
+
+    def _reductions(self, context):
+        """
+        Yield progressively smaller versions of the context.
+        """
+        compacted = self.compact_context(context)
+        yield compacted
+        without_siblings = {k: v for k, v in compacted.items() if k not in SIBLING_KEYS}
+        if len(without_siblings) != len(compacted):
+            yield without_siblings
+        yield self._truncate_strings(without_siblings)
+
+    def compact_context(self, context):
+        """
+        Reduce sibling phase/task lists to names and drop empty values.
+
+        Args:
+            context (dict): Original context.
+
+        Returns:
+            dict: Compacted copy of the context.
+        """
+        if not isinstance(context, dict):
+            return context
+        compacted = {}
+        for key, value in context.items():
+            if value is None:
+                continue
+            if key in SIBLING_KEYS and isinstance(value, list):
+                compacted[key] = [
+                    item.get("name", f"{key[:-1]} {idx + 1}") if isinstance(item, dict) else item
+                    for idx, item in enumerate(value)
+                ]
+            else:
+                compacted[key] = value
+        return compacted
+
+    def _truncate_strings(self, value):
+        if isinstance(value, str):
+            if len(value) > self.TRUNCATED_VALUE_CHARS:
+                return value[:self.TRUNCATED_VALUE_CHARS] + "..."
+            return value
+        if isinstance(value, dict):
+            return {k: self._truncate_strings(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._truncate_strings(v) for v in value]
+        return value
@@ -0,0 +1,55 @@
+"""
+Static-prefix / dynamic-suffix prompt layout used for provider prompt caching.
+
+Templates in ``prompts/`` that put their instructions first may separate them
+from the per-call sections (goal, context, steps ...) with a line holding only
+``DYNAMIC_MARKER``. ``PromptManager.format_prompt`` removes the marker and
+returns a ``CacheablePrompt``: a plain string that also remembers where the
+static prefix ends, so the gateway can ask caching-capable providers to reuse
+it across calls.
+"""
+
+DYNAMIC_MARKER = "<<<DYNAMIC>>>"
+
+
+class CacheablePrompt(str):
+    """
+    Prompt text whose first ``prefix_length`` characters are identical across calls.
+
+    Behaves as ``str`` everywhere; concatenation or formatting yields a plain
+    ``str`` and drops the caching hint.
+    """
+
+    def __new__(cls, prefix, suffix):
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix_length = len(prefix)
+        return prompt
+
+    @property
+    def prefix(self):
+        return str.__str__(self)[:self.prefix_length]
+
+    @property
+    def suffix(self):
+        return str.__str__(self)[self.prefix_length:]
+
+
+def split_template(template):
+    """
+    Split a template at its dynamic marker line.
+
+    Returns:
+        tuple: (static template, dynamic template), or (None, template) if the
+            template has no marker.
+    """
+    head, marker, tail = template.partition(DYNAMIC_MARKER)
+    if not marker:
+        return None, template
+    return head.rstrip() + "\n\n", tail.lstrip("\n")
+
+
+def cache_prefix(prompt):
+    """
+    Static prefix of a prompt, or None if it carries no caching hint.
+    """
+    return prompt.prefix if isinstance(prompt, CacheablePrompt) and prompt.prefix_length else None
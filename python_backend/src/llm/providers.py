@@ -0,0 +1,61 @@
+"""
+Registry of provider client factories used by the LLM gateway.
+"""
+
+from exceptions import ConfigError
+
+# provider name -> factory(llm_config) returning a client with ``async generate(prompt, **options)``
+_PROVIDER_FACTORIES = {}
+
+
+def register_provider(name, factory):
+    """
+    Register a client factory for a provider name.
+
+    Args:
+        name (str): Provider name as used in config (e.g., "mock").
+        factory (callable): Called with the ``llm`` config section; returns a client.
+    """
+    _PROVIDER_FACTORIES[name] = factory
+
+
+def _create_mock_client(llm_config):
+    from llm.mock_provider import MockLLMClient
+    return MockLLMClient(llm_config.get("mock", {}))
+
+
+def _sdk_client_factory(class_name):
+    def factory(llm_config):
+        from llm import sdk_clients
+        return getattr(sdk_clients, class_name)(llm_config)
+    return factory
+
+
+register_provider("mock", _create_mock_client)
+register_provider("google", _sdk_client_factory("GoogleClient"))
+register_provider("openai", _sdk_client_factory("OpenAIClient"))
+register_provider("anthropic", _sdk_client_factory("AnthropicClient"))
+register_provider("ollama", _sdk_client_factory("OllamaClient"))
+
+
+def create_client(provider, llm_config):
+    """
+    Create a client for a provider.
+
+    Every registered client honours the routed ``model`` and
+    ``max_output_tokens`` options, so any of them can serve per-call-site routes.
+
+    Args:
+        provider (str): Provider name.
+        llm_config (dict): The ``llm`` configuration section.
+
+    Returns:
+        A provider client.
+
+    Raises:
+        ConfigError: If no client can be created for the provider.
+    """
+    factory = _PROVIDER_FACTORIES.get(provider)
+    if factory is not None:
+        return factory(llm_config)
+    raise ConfigError(f"No LLM client available for provider '{provider}'.")
@@ -0,0 +1,299 @@
+"""
+Provider-aware rate limiting and concurrency control for LLM calls.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from llm.adaptive_concurrency import AIMDController
+from llm.priority import PriorityPolicy, PriorityTurnstile
+from llm.resilience import is_overload_error
+from utils.metrics import METRICS
+
+
+class TokenBucket:
+    """
+    Continuously refilling token bucket.
+    """
+
+    def __init__(self, capacity, refill_per_second, clock=time.monotonic):
+        """
+        Initialize the TokenBucket.
+
+        Args:
+            capacity (float): Maximum number of tokens the bucket can hold.
+            refill_per_second (float): Tokens added per second.
+            clock (callable, optional): Monotonic clock, injectable for benchmarks.
+        """
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def time_until_available(self, amount):
+        """
+        Seconds until `amount` tokens can be consumed (0.0 if available now).
+
+        Requests larger than the bucket only wait for a full bucket, otherwise
+        they could never be admitted.
+        """
+        self._refill()
+        needed = min(float(amount), self.capacity)
+        if self._tokens >= needed:
+            return 0.0
+        return (needed - self._tokens) / self.refill_per_second
+
+    def consume(self, amount):
+        """
+        Remove `amount` tokens. The balance may go negative, which delays later callers.
+        """
+        self._refill()
+        self._tokens -= float(amount)
+
+
+class ConcurrencyGate:
+    """
+    Counting gate (like a semaphore) whose limit can be changed at runtime.
+    """
+
+    def __init__(self, limit):
+        """
+        Initialize the ConcurrencyGate.
+
+        Args:
+            limit (int): Maximum number of concurrent holders.
+        """
+        self.limit = max(1, int(limit))
+        self.active = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self):
+        async with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+    async def set_limit(self, limit):
+        """
+        Change the limit; waiters are re-evaluated immediately.
+        """
+        async with self._condition:
+            self.limit = max(1, int(limit))
+            self._condition.notify_all()
+
+
+class SlotTicket:
+    """
+    Yielded by ``LLMRateLimiter.slot``; the caller may record the call's output
+    size on it, which normalizes the latency seen by adaptive concurrency.
+    """
+
+    __slots__ = ("output_tokens",)
+
+    def __init__(self):
+        self.output_tokens = None
+
+
+class _ProviderLane:
+    """
+    Limits for a single (provider, model) pair.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, max_concurrency, adaptive=None, aging_seconds=5.0):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0) if tokens_per_minute else None
+        self.gate = ConcurrencyGate(max_concurrency)
+        self.controller = AIMDController(adaptive, max_concurrency) if adaptive is not None else None
+        # Wakes waiters by priority lane, FIFO within a lane, with aging against starvation.
+        self.turnstile = PriorityTurnstile(aging_seconds)
+        self.waiting = 0
+
+    def time_until_admitted(self, token_estimate):
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.time_until_available(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.time_until_available(token_estimate))
+        return wait
+
+
+class LLMRateLimiter:
+    """
+    Token-bucket limiter (requests and tokens per minute) plus a concurrency
+    cap for every provider/model pair.
+
+    Callers are admitted by priority lane (``interactive``, ``normal``,
+    ``background``; see ``PriorityPolicy``), in arrival order within a lane,
+    per provider/model. The time spent queued is exported as the
+    ``llm.queue_wait_seconds`` metric, labelled with the lane.
+
+    With ``adaptive.enabled`` the concurrency cap becomes the starting point of
+    an AIMD window (see ``AIMDController``), exported as the
+    ``llm.concurrency_limit`` gauge.
+    """
+
+    DEFAULT_LIMITS = {
+        "requests_per_minute": 60,
+        "tokens_per_minute": 1000000,
+        "max_concurrency": 8,
+    }
+
+    def __init__(self, config=None, metrics=None, logger=None):
+        """
+        Initialize the LLMRateLimiter.
+
+        Args:
+            config (dict, optional): The ``llm.rate_limits`` configuration section.
+                Top-level keys are defaults; ``overrides`` maps "provider/model"
+                (or just "provider") to per-pair limits.
+            metrics (MetricsRegistry, optional): Metrics registry. Defaults to the shared one.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.config = config or {}
+        self.metrics = metrics or METRICS
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.enabled = self.config.get("enabled", True)
+        adaptive = self.config.get("adaptive", {}) or {}
+        self.adaptive = adaptive if adaptive.get("enabled", False) else None
+        self.priorities = PriorityPolicy(self.config.get("priorities", {}), logger=self.logger)
+        self._lanes = {}
+
+    def limits_for(self, provider, model):
+        """
+        Resolve the effective limits for a provider/model pair.
+
+        Returns:
+            dict: requests_per_minute, tokens_per_minute and max_concurrency.
+        """
+        limits = dict(self.DEFAULT_LIMITS)
+        limits.update({k: v for k, v in self.config.items() if k in self.DEFAULT_LIMITS})
+        overrides = self.config.get("overrides", {}) or {}
+        limits.update(overrides.get(provider, {}) or {})
+        limits.update(overrides.get(f"{provider}/{model}", {}) or {})
+        return limits
+
+    def _lane(self, provider, model):
+        key = (provider, model)
+        lane = self._lanes.get(key)
+        if lane is None:
+            limits = self.limits_for(provider, model)
+            lane = _ProviderLane(
+                limits["requests_per_minute"],
+                limits["tokens_per_minute"],
+                limits["max_concurrency"],
+                adaptive=self.adaptive,
+                aging_seconds=self.priorities.aging_seconds,
+            )
+            self._lanes[key] = lane
+            self.metrics.set_gauge("llm.concurrency_limit", lane.gate.limit, provider=provider, model=model)
+            self.logger.debug("Created rate limit lane for %s/%s: %s", provider, model, limits)
+        return lane
+
+    @asynccontextmanager
+    async def slot(self, provider, model, token_estimate=0, call_site=None):
+        """
+        Wait for capacity, then hold a concurrency slot for the duration of the block.
+
+        Yields a ``SlotTicket``; set its ``output_tokens`` before leaving the block.
+
+        Args:
+            provider (str): Provider name (e.g., "google").
+            model (str): Model name.
+            token_estimate (int, optional): Estimated prompt tokens to debit from the TPM bucket.
+            call_site (str, optional): Call site, for per-call-site latency baselines
+                of adaptive concurrency.
+        """
+        ticket = SlotTicket()
+        if not self.enabled:
+            yield ticket
+            return
+
+        lane = self._lane(provider, model)
+        labels = {"provider": provider, "model": model}
+        priority = self.priorities.lane()
+        queued_at = time.monotonic()
+        lane.waiting += 1
+        self.metrics.set_gauge("llm.queue_depth", lane.waiting, **labels)
+        try:
+            async with lane.turnstile.slot(self.priorities.rank(priority)):
+                # Hold a concurrency slot before debiting the buckets, so RPM/TPM
+                # budget is only spent on calls that can be sent right away
+                await lane.gate.acquire()
+                try:
+                    wait = lane.time_until_admitted(token_estimate)
+                    while wait > 0:
+                        await asyncio.sleep(wait)
+                        wait = lane.time_until_admitted(token_estimate)
+                except BaseException:
+                    await lane.gate.release()
+                    raise
+                if lane.requests:
+                    lane.requests.consume(1)
+                if lane.tokens:
+                    lane.tokens.consume(token_estimate)
+        finally:
+            lane.waiting -= 1
+            self.metrics.set_gauge("llm.queue_depth", lane.waiting, **labels)
+
+        queue_wait = time.monotonic() - queued_at
+        self.metrics.observe("llm.queue_wait_seconds", queue_wait, priority=priority, **labels)
+        self.metrics.set_gauge("llm.in_flight", lane.gate.active, **labels)
+        if queue_wait > 1.0:
+            self.logger.info(
+                "LLM call to %s/%s (%s) waited %.2fs for rate limit capacity.", provider, model, priority, queue_wait
+            )
+        admitted_at = time.monotonic()
+        try:
+            yield ticket
+        except Exception as e:
+            if lane.controller and is_overload_error(e) and lane.controller.on_overload(admitted_at):
+                await self._apply_window(lane, labels, f"overload ({type(e).__name__})")
+            raise
+        else:
+            if lane.controller:
+                change = lane.controller.on_success(
+                    call_site or "default", time.monotonic() - admitted_at, admitted_at, lane.gate.active,
+                    output_tokens=ticket.output_tokens,
+                )
+                if change:
+                    await self._apply_window(lane, labels, change)
+        finally:
+            await lane.gate.release()
+            self.metrics.set_gauge("llm.in_flight", lane.gate.active, **labels)
+
+    async def _apply_window(self, lane, labels, reason):
+        """
+        Push the controller's window to the lane's gate and export it.
+        """
+        window = lane.controller.window
+        if window == lane.gate.limit:
+            return
+        if window < lane.gate.limit:
+            self.metrics.increment("llm.concurrency_decreases", **labels)
+            self.logger.info(
+                "Concurrency for %s/%s reduced to %d after %s.", labels["provider"], labels["model"], window, reason
+            )
+        await lane.gate.set_limit(window)
+        self.metrics.set_gauge("llm.concurrency_limit", window, **labels)
+
+    def record_tokens(self, provider, model, tokens):
+        """
+        Debit additional tokens (e.g., the completion) after a call finished.
+        """
+        if not self.enabled or not tokens:
+            return
+        lane = self._lane(provider, model)
+        if lane.tokens:
+            lane.tokens.consume(tokens)
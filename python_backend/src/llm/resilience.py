@@ -0,0 +1,257 @@
+"""
+Retry and circuit-breaker policies for LLM provider calls.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from exceptions import LLMCircuitOpenError, LLMError
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors
+# and Anthropic's 529 "overloaded".
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+# Fragments found in exception class names or messages of transient errors
+# across the google-genai, openai, anthropic and ollama SDKs.
+RETRYABLE_MARKERS = (
+    "timeout", "timed out", "connection", "ratelimit", "rate limit", "overloaded",
+    "resource_exhausted", "unavailable", "deadline_exceeded", "internalserver",
+    "serviceunavailable", "try again",
+)
+
+
+def _status_code(exc):
+    """
+    Extract an HTTP status code from SDK exceptions, if present.
+    """
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def _retry_after(exc):
+    """
+    Extract a Retry-After hint (in seconds) from an exception, if present.
+    """
+    value = getattr(exc, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+        if headers is not None:
+            try:
+                value = headers.get("retry-after") or headers.get("Retry-After")
+            except Exception:
+                value = None
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(str(value))
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(exc):
+    """
+    Decide whether an LLM call failure is transient.
+
+    Args:
+        exc (Exception): The exception raised by the provider call.
+
+    Returns:
+        tuple: (retryable (bool), retry_after_seconds (float or None)).
+    """
+    if isinstance(exc, LLMCircuitOpenError):
+        return False, None
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True, None
+
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES, _retry_after(exc)
+
+    # Errors raised by our own layer (empty/blocked responses) are not transient.
+    if isinstance(exc, LLMError):
+        return False, None
+
+    haystack = f"{type(exc).__name__} {exc}".lower()
+    if " 429" in haystack or any(marker in haystack for marker in RETRYABLE_MARKERS):
+        return True, _retry_after(exc)
+    return False, None
+
+
+def is_failover_error(exc):
+    """
+    Decide whether a failure should move the call to the next provider in the failover chain.
+
+    Timeouts, connection failures, 5xx statuses and open circuits fail over; rate
+    limits (429) and client errors are left to the retry policy.
+
+    Args:
+        exc (Exception): The exception raised by the provider call.
+
+    Returns:
+        bool: True if another provider should be tried.
+    """
+    if isinstance(exc, (LLMCircuitOpenError, asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = _status_code(exc)
+    if status is not None:
+        return status >= 500 or status == 408
+    if isinstance(exc, LLMError):
+        return False
+    haystack = f"{type(exc).__name__} {exc}".lower()
+    return any(marker in haystack for marker in ("timeout", "timed out", "connection", "unavailable", "internalserver"))
+
+
+def is_overload_error(exc):
+    """
+    Decide whether a failure signals provider overload (rate limit, overloaded or timed out).
+
+    Used by adaptive concurrency to shrink the in-flight window.
+
+    Args:
+        exc (Exception): The exception raised by the provider call.
+
+    Returns:
+        bool: True for timeouts and 429/503/529 responses.
+    """
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+        return True
+    status = _status_code(exc)
+    if status is not None:
+        return status in (429, 503, 529)
+    if isinstance(exc, LLMError):
+        return False
+    haystack = f"{type(exc).__name__} {exc}".lower()
+    return " 429" in haystack or any(
+        marker in haystack for marker in ("timeout", "timed out", "ratelimit", "rate limit", "overloaded", "resource_exhausted")
+    )
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+    """
+
+    def __init__(self, config=None):
+        """
+        Initialize the RetryPolicy.
+
+        Args:
+            config (dict, optional): The ``llm.retry`` configuration section.
+        """
+        config = config or {}
+        self.max_attempts = max(1, int(config.get("max_attempts", 3)))
+        self.base_delay = float(config.get("base_delay_seconds", 1.0))
+        self.max_delay = float(config.get("max_delay_seconds", 30.0))
+        timeout = config.get("request_timeout_seconds", 120)
+        self.request_timeout = float(timeout) if timeout else None
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Delay before the next attempt.
+
+        Args:
+            attempt (int): Number of the attempt that just failed (1-based).
+            retry_after (float, optional): Provider-supplied minimum delay.
+
+        Returns:
+            float: Seconds to sleep.
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    After ``failure_threshold`` consecutive transient failures the circuit
+    opens and calls fail immediately. Once ``reset_timeout_seconds`` elapse a
+    single probe call is let through (half-open); its outcome closes or
+    re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, config=None, clock=time.monotonic, logger=None):
+        """
+        Initialize the CircuitBreaker.
+
+        Args:
+            name (str): Provider name, used in errors and logs.
+            config (dict, optional): The ``llm.circuit_breaker`` configuration section.
+            clock (callable, optional): Monotonic clock, injectable for benchmarks.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        config = config or {}
+        self.name = name
+        self.failure_threshold = max(1, int(config.get("failure_threshold", 5)))
+        self.reset_timeout = float(config.get("reset_timeout_seconds", 30.0))
+        self.enabled = config.get("enabled", True)
+        self._clock = clock
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self):
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            LLMCircuitOpenError: If the circuit is open (or a half-open probe is already running).
+        """
+        if not self.enabled or self.state == self.CLOSED:
+            return
+        if self.state == self.OPEN:
+            remaining = self.reset_timeout - (self._clock() - self._opened_at)
+            if remaining > 0:
+                raise LLMCircuitOpenError(
+                    f"Circuit for provider '{self.name}' is open; failing fast (retry in {remaining:.1f}s)."
+                )
+            self.state = self.HALF_OPEN
+            self.logger.info("Circuit for provider '%s' is half-open; sending probe call.", self.name)
+        if self._probe_in_flight:
+            raise LLMCircuitOpenError(f"Circuit for provider '{self.name}' is half-open; probe already in flight.")
+        self._probe_in_flight = True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            self.logger.info("Circuit for provider '%s' closed after successful call.", self.name)
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.logger.warning("Circuit for provider '%s' opened after %d consecutive failures.", self.name, self.failures)
+            self.state = self.OPEN
+            self._opened_at = self._clock()
+
+    def release_probe(self):
+        """
+        Release a half-open probe slot without judging the provider (e.g., non-retryable or cancelled call).
+        """
+        self._probe_in_flight = False
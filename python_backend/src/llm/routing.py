@@ -0,0 +1,116 @@
+"""
+Per-call-site model routing for LLM calls.
+"""
+
+from collections import namedtuple
+from fnmatch import fnmatchcase
+
+# Route fields that may be set per call site.
+ROUTE_FIELDS = ("provider", "model", "max_output_tokens")
+
+
+class Route(namedtuple("Route", ROUTE_FIELDS + ("overrides",))):
+    """
+    Resolved provider, model and output budget for one call.
+
+    ``overrides`` holds only the fields set by the routing table, so clients
+    only receive options that differ from the top-level ``llm`` settings.
+    """
+
+    __slots__ = ()
+
+    @property
+    def label(self):
+        return f"{self.provider}/{self.model}"
+
+    @property
+    def client_options(self):
+        """
+        Keyword options for the client call: routed model/max_output_tokens overrides only.
+        """
+        return {k: v for k, v in self.overrides.items() if k != "provider"}
+
+
+class ModelRouter:
+    """
+    Maps call sites (e.g., "select_persona", "critique_Risk_Assessor") to a route.
+
+    Resolution order, later entries overriding earlier ones field by field:
+    top-level ``llm`` settings, ``routing.default``, the first matching glob
+    pattern (e.g., "critique_*"), then an exact call-site entry.
+    """
+
+    def __init__(self, llm_config=None):
+        """
+        Initialize the ModelRouter.
+
+        Args:
+            llm_config (dict, optional): The ``llm`` configuration section.
+        """
+        llm_config = llm_config or {}
+        routing = llm_config.get("routing", {}) or {}
+        self.base = {
+            "provider": llm_config.get("provider", "google"),
+            "model": llm_config.get("model", "default"),
+            "max_output_tokens": llm_config.get("max_output_tokens"),
+        }
+        self.default = self._clean(routing.get("default"))
+        self.exact = {}
+        self.patterns = []
+        for call_site, entry in (routing.get("call_sites", {}) or {}).items():
+            if any(ch in call_site for ch in "*?["):
+                self.patterns.append((call_site, self._clean(entry)))
+            else:
+                self.exact[call_site] = self._clean(entry)
+        self._cache = {}
+
+    @staticmethod
+    def _clean(entry):
+        return {k: v for k, v in (entry or {}).items() if k in ROUTE_FIELDS and v is not None}
+
+    def resolve(self, call_site=None):
+        """
+        Resolve the route for a call site.
+
+        Args:
+            call_site (str, optional): Call site name. None uses the defaults.
+
+        Returns:
+            Route: The effective provider, model and max_output_tokens.
+        """
+        route = self._cache.get(call_site)
+        if route is not None:
+            return route
+
+        overrides = dict(self.default)
+        if call_site is not None:
+            for pattern, entry in self.patterns:
+                if fnmatchcase(call_site, pattern):
+                    overrides.update(entry)
+                    break
+            overrides.update(self.exact.get(call_site, {}))
+
+        route = self._make_route(overrides)
+        self._cache[call_site] = route
+        return route
+
+    def derive(self, route, entry):
+        """
+        Route for ``entry`` (e.g., a failover chain entry), inheriting unset fields from ``route``.
+
+        Args:
+            route (Route): Route to start from.
+            entry (dict): provider/model/max_output_tokens fields to replace.
+
+        Returns:
+            Route: The derived route.
+        """
+        fields = {field: getattr(route, field) for field in ROUTE_FIELDS}
+        fields.update(self._clean(entry))
+        return self._make_route(fields)
+
+    def _make_route(self, overrides):
+        # Only report fields that actually differ from the top-level settings.
+        overrides = {k: v for k, v in overrides.items() if v != self.base[k]}
+        fields = {**self.base, **overrides}
+        return Route(fields["provider"], fields["model"], fields["max_output_tokens"], overrides)
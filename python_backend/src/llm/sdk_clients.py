@@ -0,0 +1,211 @@
+"""
+Provider clients for the Google GenAI, OpenAI, Anthropic and Ollama SDKs listed in requirements.txt.
+
+Each client exposes ``async generate(prompt, **options)`` and
+``generate_stream(prompt, **options)`` as expected by the LLM gateway. SDKs
+are imported on construction so a missing optional SDK only affects the
+provider that needs it. Per-provider settings live under ``llm.<provider>``
+(e.g., ``llm.ollama.host``); API keys are read by the SDKs from their usual
+environment variables unless set there.
+
+Clients with ``supports_response_schema = True`` receive the call site's JSON
+schema as the ``response_schema`` option and request the provider's native
+structured output mode with it (for Gemini, JSON output without the schema). Clients with ``supports_prompt_cache = True``
+receive the static prompt prefix as ``cache_prefix`` and mark it for explicit
+prompt caching; OpenAI and Ollama reuse identical prompt prefixes
+automatically, so they need no hint.
+"""
+
+DEFAULT_MAX_OUTPUT_TOKENS = 4096
+
+
+class _SDKClient:
+    """
+    Shared option handling.
+    """
+
+    provider = None
+    supports_response_schema = False
+    supports_prompt_cache = False
+
+    def __init__(self, llm_config):
+        self.settings = llm_config.get(self.provider, {}) or {}
+        # Fallback model if the call does not pass one (i.e., this provider is the top-level provider)
+        self.model = self.settings.get("model", llm_config.get("model"))
+        self.temperature = llm_config.get("temperature")
+        self.max_output_tokens = llm_config.get("max_output_tokens") or DEFAULT_MAX_OUTPUT_TOKENS
+
+    def _model(self, options):
+        return options.get("model") or self.model
+
+    def _max_tokens(self, options):
+        return options.get("max_output_tokens") or self.max_output_tokens
+
+
+class OpenAIClient(_SDKClient):
+    """
+    Chat completions via the ``openai`` SDK.
+    """
+
+    provider = "openai"
+    supports_response_schema = True
+
+    def __init__(self, llm_config):
+        super().__init__(llm_config)
+        from openai import AsyncOpenAI
+        self._client = AsyncOpenAI(api_key=self.settings.get("api_key"), base_url=self.settings.get("base_url"))
+
+    def _request(self, prompt, options):
+        request = {
+            "model": self._model(options),
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": self._max_tokens(options),
+        }
+        if self.temperature is not None:
+            request["temperature"] = self.temperature
+        if options.get("response_schema"):
+            # Non-strict: strict mode requires additionalProperties=false on every object.
+            request["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "response", "schema": options["response_schema"], "strict": False},
+            }
+        return request
+
+    async def generate(self, prompt, **options):
+        response = await self._client.chat.completions.create(**self._request(prompt, options))
+        return response.choices[0].message.content or ""
+
+    async def generate_stream(self, prompt, **options):
+        stream = await self._client.chat.completions.create(stream=True, **self._request(prompt, options))
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class AnthropicClient(_SDKClient):
+    """
+    Messages API via the ``anthropic`` SDK.
+    """
+
+    provider = "anthropic"
+    supports_prompt_cache = True
+
+    def __init__(self, llm_config):
+        super().__init__(llm_config)
+        from anthropic import AsyncAnthropic
+        self._client = AsyncAnthropic(api_key=self.settings.get("api_key"))
+
+    def _content(self, prompt, options):
+        prefix = options.get("cache_prefix")
+        if not prefix or not prompt.startswith(prefix):
+            return prompt
+        # The cache breakpoint covers everything up to and including the prefix block
+        return [
+            {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt[len(prefix):]},
+        ]
+
+    def _request(self, prompt, options):
+        request = {
+            "model": self._model(options),
+            "messages": [{"role": "user", "content": self._content(prompt, options)}],
+            "max_tokens": self._max_tokens(options),
+        }
+        if self.temperature is not None:
+            request["temperature"] = self.temperature
+        return request
+
+    async def generate(self, prompt, **options):
+        response = await self._client.messages.create(**self._request(prompt, options))
+        return "".join(block.text for block in response.content if getattr(block, "type", None) == "text")
+
+    async def generate_stream(self, prompt, **options):
+        async with self._client.messages.stream(**self._request(prompt, options)) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+
+class OllamaClient(_SDKClient):
+    """
+    Local models via the ``ollama`` SDK (``/api/generate``).
+    """
+
+    provider = "ollama"
+    supports_response_schema = True
+    DEFAULT_HOST = "http://127.0.0.1:11434"
+
+    def __init__(self, llm_config):
+        super().__init__(llm_config)
+        from ollama import AsyncClient
+        self.host = self.settings.get("host") or self.DEFAULT_HOST
+        self._client = AsyncClient(host=self.host)
+
+    def _options(self, options):
+        ollama_options = {"num_predict": self._max_tokens(options)}
+        if self.temperature is not None:
+            ollama_options["temperature"] = self.temperature
+        return ollama_options
+
+    async def generate(self, prompt, **options):
+        response = await self._client.generate(
+            model=self._model(options), prompt=prompt, options=self._options(options),
+            format=options.get("response_schema")
+        )
+        return response["response"]
+
+    async def generate_stream(self, prompt, **options):
+        stream = await self._client.generate(
+            model=self._model(options), prompt=prompt, options=self._options(options),
+            format=options.get("response_schema"), stream=True
+        )
+        async for part in stream:
+            if part["response"]:
+                yield part["response"]
+
+
+class GoogleClient(_SDKClient):
+    """
+    Gemini models via the ``google-genai`` SDK.
+
+    The API key is read from ``llm.google.api_key``, then ``llm.api_key``, then
+    the SDK's ``GOOGLE_API_KEY``/``GEMINI_API_KEY`` environment variables.
+    Calls with a response schema request JSON output
+    (``response_mime_type="application/json"``). The schema itself is not
+    sent, since Gemini's response schemas do not cover the JSON Schema used by
+    the call sites; the gateway still validates the response locally.
+    """
+
+    provider = "google"
+    supports_response_schema = True
+
+    def __init__(self, llm_config):
+        super().__init__(llm_config)
+        from google import genai
+        from google.genai import types
+        self._types = types
+        self.top_p = llm_config.get("top_p")
+        self.top_k = llm_config.get("top_k")
+        self._client = genai.Client(api_key=self.settings.get("api_key") or llm_config.get("api_key"))
+
+    def _config(self, options):
+        return self._types.GenerateContentConfig(
+            max_output_tokens=self._max_tokens(options),
+            temperature=self.temperature,
+            top_p=self.top_p,
+            top_k=self.top_k,
+            response_mime_type="application/json" if options.get("response_schema") else None,
+        )
+
+    async def generate(self, prompt, **options):
+        response = await self._client.aio.models.generate_content(
+            model=self._model(options), contents=prompt, config=self._config(options)
+        )
+        return response.text or ""
+
+    async def generate_stream(self, prompt, **options):
+        stream = await self._client.aio.models.generate_content_stream(
+            model=self._model(options), contents=prompt, config=self._config(options)
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
@@ -0,0 +1,79 @@
+"""
+Coalescing of identical in-flight LLM calls onto one shared provider call.
+"""
+
+import asyncio
+import hashlib
+import json
+
+
+def request_key(*parts):
+    """
+    Stable hash of everything that determines a completion (call site, route, prompt ...).
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers with the same
+    key await the same result.
+
+    Every waiter gets the same completion or the same exception. Cancelling a
+    waiter only cancels that waiter; the shared call is cancelled once every
+    waiter has been cancelled, exactly as a single un-shared call would be.
+    Nothing is kept after the call finishes, so this is not a cache.
+    """
+
+    def __init__(self):
+        self._flights = {}
+
+    def in_flight(self):
+        return len(self._flights)
+
+    async def run(self, key, factory):
+        """
+        Await the call for ``key``, starting it with ``factory()`` if none is in flight.
+
+        Args:
+            key (str): Request hash (see ``request_key``).
+            factory (callable): Returns the coroutine performing the call.
+
+        Returns:
+            tuple: (result, shared) where ``shared`` is True if this caller joined
+                a call started by another caller.
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if not shared:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._finish(key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Last waiter left (cancelled): stop the call and let the next caller start afresh
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _finish(self, key, flight):
+        self._forget(key, flight)
+        if not flight.task.cancelled():
+            flight.task.exception()  # Mark retrieved; waiters already received it
@@ -0,0 +1,235 @@
+"""
+JSON schemas per call site, tolerant JSON extraction and local schema validation.
+"""
+
+import json
+import re
+from fnmatch import fnmatchcase
+
+from exceptions import LLMResponseFormatError
+
+_STEP = {
+    "type": "object",
+    "properties": {
+        "step_id": {"type": "string"},
+        "prompt": {"type": "string"},
+        "description": {"type": "string"},
+    },
+    "required": ["prompt"],
+}
+
+_NAMED_ITEM = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "description": {"type": "string"},
+    },
+    "required": ["name", "description"],
+}
+
+# A task may flag itself as a single action that needs no step decomposition
+_TASK = {
+    "type": "object",
+    "properties": {**_NAMED_ITEM["properties"], "atomic": {"type": "boolean"}},
+    "required": ["name", "description"],
+}
+
+_SCORE = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number"},
+        "justification": {"type": "string"},
+    },
+    "required": ["score", "justification"],
+}
+
+
+def _wrapper(key, value_schema):
+    return {"type": "object", "properties": {key: value_schema}, "required": [key]}
+
+
+# Response schema per call site; exact names win over glob patterns (first match).
+CALL_SITE_SCHEMAS = {
+    "generate_phases": _wrapper("phases", {"type": "array", "items": _NAMED_ITEM}),
+    "generate_tasks": _wrapper("tasks", {"type": "array", "items": _TASK}),
+    "generate_steps": _wrapper("steps", {"type": "array", "items": _STEP}),
+    # Only the map itself is enforced; the generator validates each task's list so a
+    # malformed entry falls back to its own call instead of failing the whole batch.
+    "generate_steps_batch": _wrapper("steps_by_task", {"type": "object"}),
+    "revise_steps": _wrapper("revised_steps", {"type": "array", "items": _STEP}),
+    "generate_*_alternatives": _wrapper(
+        "alternatives", {"type": "array", "items": {"type": "array", "items": _NAMED_ITEM}}
+    ),
+    "evaluate_alternatives_batch": _wrapper("evaluations", {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "alternative_idx": {"type": "integer"},
+                "criteria": {"type": "object", "additionalProperties": _SCORE},
+            },
+            "required": ["alternative_idx", "criteria"],
+        },
+    }),
+    "evaluate_*": _wrapper("evaluation", _SCORE),
+    "qa_validate_checklist": _wrapper("validation_results", {
+        "type": "object",
+        "properties": {
+            "score": {"type": "number"},
+            "feedback": {"type": "string"},
+            "issues": {"type": "array"},
+            "suggestions": {"type": "array"},
+        },
+        "required": ["score", "feedback", "issues", "suggestions"],
+    }),
+    "analyze_and_recover": {
+        "type": "object",
+        "properties": {
+            "analysis": {"type": "string"},
+            "recovery_strategy": {"type": "string"},
+            "next_actions": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {"type": {"type": "string"}, "details": {"type": "object"}},
+                    "required": ["type", "details"],
+                },
+            },
+            "confidence_score": {"type": "number"},
+        },
+        "required": ["analysis", "next_actions"],
+    },
+    "replanning": {
+        "type": "object",
+        "properties": {
+            "analysis": {"type": "string"},
+            "revised_plan": {"type": ["object", "null"]},
+            "suggested_next_step": {"type": ["string", "null"]},
+            "confidence_score": {"type": "number"},
+        },
+        "required": ["analysis"],
+    },
+}
+
+_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)```", re.DOTALL)
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+def schema_for(call_site):
+    """
+    Response schema for a call site, or None if its output is free text.
+    """
+    if call_site in CALL_SITE_SCHEMAS:
+        return CALL_SITE_SCHEMAS[call_site]
+    for pattern, schema in CALL_SITE_SCHEMAS.items():
+        if any(ch in pattern for ch in "*?[") and fnmatchcase(call_site or "", pattern):
+            return schema
+    return None
+
+
+def extract_json(text):
+    """
+    Decode the JSON value in an LLM response.
+
+    Accepts bare JSON, JSON inside a Markdown code fence, or JSON surrounded
+    by prose. String contents (including escape sequences) are never rewritten.
+
+    Args:
+        text (str): Response text.
+
+    Returns:
+        The decoded JSON value.
+
+    Raises:
+        json.JSONDecodeError: If no JSON value can be decoded.
+    """
+    stripped = text.strip()
+    try:
+        return json.loads(stripped)
+    except json.JSONDecodeError as e:
+        error = e
+
+    for match in _FENCE_PATTERN.finditer(stripped):
+        try:
+            return json.loads(match.group(1).strip())
+        except json.JSONDecodeError:
+            continue
+
+    # Fall back to the first decodable object/array in the text.
+    decoder = json.JSONDecoder()
+    for idx, ch in enumerate(stripped):
+        if ch in "{[":
+            try:
+                return decoder.raw_decode(stripped, idx)[0]
+            except json.JSONDecodeError:
+                continue
+    raise error
+
+
+def validate(value, schema, path="$"):
+    """
+    Validate a value against the subset of JSON Schema used in CALL_SITE_SCHEMAS.
+
+    Supports ``type`` (single or list), ``properties``, ``required``,
+    ``additionalProperties`` (schema form), ``items`` and ``enum``.
+
+    Returns:
+        list: Human-readable problems; empty if the value is valid.
+    """
+    problems = []
+    expected = schema.get("type")
+    if expected is not None:
+        types = expected if isinstance(expected, list) else [expected]
+        if not any(_TYPE_CHECKS[t](value) for t in types):
+            return [f"{path}: expected {'/'.join(types)}, got {type(value).__name__}"]
+    if "enum" in schema and value not in schema["enum"]:
+        problems.append(f"{path}: {value!r} is not one of {schema['enum']}")
+
+    if isinstance(value, dict):
+        for key in schema.get("required", []):
+            if key not in value:
+                problems.append(f"{path}: missing required key '{key}'")
+        properties = schema.get("properties", {})
+        extra = schema.get("additionalProperties")
+        for key, item in value.items():
+            if key in properties:
+                problems.extend(validate(item, properties[key], f"{path}.{key}"))
+            elif isinstance(extra, dict):
+                problems.extend(validate(item, extra, f"{path}.{key}"))
+    elif isinstance(value, list) and isinstance(schema.get("items"), dict):
+        for idx, item in enumerate(value):
+            problems.extend(validate(item, schema["items"], f"{path}[{idx}]"))
+    return problems
+
+
+def parse_structured(text, schema):
+    """
+    Extract and validate the JSON value in a response.
+
+    Args:
+        text (str): Response text.
+        schema (dict): Expected JSON schema.
+
+    Returns:
+        The decoded, valid JSON value.
+
+    Raises:
+        LLMResponseFormatError: If the response holds no JSON or fails validation.
+    """
+    try:
+        value = extract_json(text)
+    except json.JSONDecodeError as e:
+        raise LLMResponseFormatError(f"Response is not valid JSON: {e}") from e
+    problems = validate(value, schema)
+    if problems:
+        raise LLMResponseFormatError("Response does not match the expected schema: " + "; ".join(problems[:5]))
+    return value
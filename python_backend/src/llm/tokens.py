@@ -0,0 +1,24 @@
+"""
+Token estimation helpers shared by the LLM layer.
+"""
+
+# Rough average for English prose and JSON across the providers we use.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens in a piece of text.
+
+    The estimate is intentionally provider-agnostic; it is used for rate
+    limiting and budgeting, not for billing.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Estimated token count (at least 1 for non-empty text).
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
@@ -0,0 +1,193 @@
+"""
+Per-request LLM token, latency and cost accounting.
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+
+# Usage accumulator of the RPC request being handled (shared by the tasks it spawns).
+CURRENT_USAGE = contextvars.ContextVar("llm_request_usage", default=None)
+
+
+def _empty_totals():
+    return {
+        "llm_calls": 0,
+        "shared_calls": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "latency_seconds": 0.0,
+        "cost_usd": 0.0,
+    }
+
+
+def _add(totals, prompt_tokens, completion_tokens, latency, cost):
+    totals["llm_calls"] += 1
+    totals["prompt_tokens"] += prompt_tokens
+    totals["completion_tokens"] += completion_tokens
+    totals["total_tokens"] += prompt_tokens + completion_tokens
+    totals["latency_seconds"] += latency
+    totals["cost_usd"] += cost
+
+
+class PriceTable:
+    """
+    USD prices per million prompt/completion tokens, keyed by "provider/model"
+    (glob patterns allowed, e.g. "google/gemini-1.5-flash*"). Unpriced models cost 0.
+    """
+
+    def __init__(self, pricing=None):
+        self.pricing = pricing or {}
+        self._cache = {}
+
+    def price_for(self, provider, model):
+        label = f"{provider}/{model}"
+        if label not in self._cache:
+            entry = self.pricing.get(label)
+            if entry is None:
+                entry = next((v for k, v in self.pricing.items() if fnmatchcase(label, k)), {})
+            self._cache[label] = (
+                entry.get("input_per_million_tokens", 0.0),
+                entry.get("output_per_million_tokens", 0.0),
+            )
+        return self._cache[label]
+
+    def cost(self, provider, model, prompt_tokens, completion_tokens):
+        input_price, output_price = self.price_for(provider, model)
+        return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+class RequestUsage:
+    """
+    LLM usage attributed to one RPC request.
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self.totals = _empty_totals()
+        self.call_sites = {}
+
+    def add(self, call_site, provider, model, prompt_tokens, completion_tokens, latency, cost):
+        _add(self.totals, prompt_tokens, completion_tokens, latency, cost)
+        _add(self._call_site(call_site, provider, model), prompt_tokens, completion_tokens, latency, cost)
+
+    def add_shared(self, call_site, provider, model):
+        self.totals["shared_calls"] += 1
+        self._call_site(call_site, provider, model)["shared_calls"] += 1
+
+    def _call_site(self, call_site, provider, model):
+        entry = self.call_sites.get(call_site)
+        if entry is None:
+            entry = {**_empty_totals(), "models": []}
+            self.call_sites[call_site] = entry
+        label = f"{provider}/{model}"
+        if label not in entry["models"]:
+            entry["models"].append(label)
+        return entry
+
+    def to_dict(self):
+        """
+        The ``usage`` block returned with a response.
+        """
+        return {
+            **self.totals,
+            "latency_seconds": round(self.totals["latency_seconds"], 3),
+            "cost_usd": round(self.totals["cost_usd"], 6),
+            "by_call_site": {
+                call_site: {
+                    **entry,
+                    "latency_seconds": round(entry["latency_seconds"], 3),
+                    "cost_usd": round(entry["cost_usd"], 6),
+                }
+                for call_site, entry in self.call_sites.items()
+            },
+        }
+
+
+class UsageLedger:
+    """
+    Cumulative LLM usage per RPC method, plus calls made outside any request.
+    """
+
+    def __init__(self, pricing=None):
+        self.prices = PriceTable(pricing)
+        self._methods = {}
+        self._unattributed = _empty_totals()
+        self._lock = threading.Lock()
+
+    def configure(self, pricing):
+        """
+        Replace the price table (``llm.pricing``).
+        """
+        self.prices = PriceTable(pricing)
+
+    def record_call(self, call_site, provider, model, prompt_tokens, completion_tokens, latency):
+        """
+        Record one completed provider call against the current request, if any.
+        """
+        cost = self.prices.cost(provider, model, prompt_tokens, completion_tokens)
+        usage = CURRENT_USAGE.get()
+        if usage is not None:
+            usage.add(call_site, provider, model, prompt_tokens, completion_tokens, latency, cost)
+            return
+        with self._lock:
+            _add(self._unattributed, prompt_tokens, completion_tokens, latency, cost)
+
+    def record_shared_call(self, call_site, provider, model):
+        """
+        Record a call answered by another caller's in-flight provider call (single-flight).
+
+        The provider call, with its tokens, latency and cost, is recorded once
+        against the request that started it; joiners count a ``shared_calls``
+        entry at no cost, so every request's usage shows all its LLM calls.
+        """
+        usage = CURRENT_USAGE.get()
+        if usage is not None:
+            usage.add_shared(call_site, provider, model)
+            return
+        with self._lock:
+            self._unattributed["shared_calls"] += 1
+
+    @contextmanager
+    def request_scope(self, method):
+        """
+        Attribute LLM calls made while handling an RPC request to it.
+
+        Yields:
+            RequestUsage: The request's accumulator; folded into the per-method
+                totals when the scope exits.
+        """
+        usage = RequestUsage(method)
+        token = CURRENT_USAGE.set(usage)
+        try:
+            yield usage
+        finally:
+            CURRENT_USAGE.reset(token)
+            with self._lock:
+                totals = self._methods.setdefault(method, {"requests": 0, **_empty_totals()})
+                totals["requests"] += 1
+                for key, value in usage.totals.items():
+                    totals[key] += value
+
+    def snapshot(self):
+        """
+        Cumulative totals per method.
+
+        Returns:
+            dict: ``{"methods": {method: {...}}, "unattributed": {...}}``.
+        """
+        with self._lock:
+            return {
+                "methods": {method: dict(totals) for method, totals in self._methods.items()},
+                "unattributed": dict(self._unattributed),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+            self._unattributed = _empty_totals()
+
+
+USAGE = UsageLedger()
@@ -6,10 +6,11 @@ NOTE: This might be less relevant in the integrated backend context.
 import json
 import logging # Import logging
 from typing import Dict
-from llm_client import LLMClient
 
 # Adjust import paths
 from exceptions import QAValidationError, LLMError
+from llm.gateway import LLMGateway
+from llm.structured_output import extract_json
 
 
 class QAValidator:
@@ -25,7 +26,7 @@ class QAValidator:
         Args:
             config (dict): QA validation configuration (should include LLM settings).
             prompt_manager (PromptManager): Prompt manager instance.
-            llm_client: LLM client instance (Note: Redundant if client configured globally).
+            llm_client (LLMGateway, optional): Shared LLM gateway. A private one is created if omitted.
             logger (logging.Logger, optional): Logger instance.
         """
         self.config = config
@@ -39,8 +40,7 @@ class QAValidator:
 
         if self.enabled:
             self.logger.info("Initializing QAValidator")
-            if llm_client is None:
-                self.llm_client = LLMClient()
+            self.llm_client = llm_client or LLMGateway(config)
         else:
              self.model = None
              self.logger.info("QA validation is disabled by configuration.")
@@ -84,7 +84,7 @@ class QAValidator:
 
             # Call LLM for validation
             self.logger.debug("Calling LLM for QA validation...")
-            response = await self._call_llm(prompt)
+            response = await self._call_llm(prompt, "qa_validate_checklist")
             self.logger.debug("LLM response received for QA validation.")
 
             # Parse validation results
@@ -109,13 +109,13 @@ class QAValidator:
             self.logger.error("Failed to format checklist for validation: %s", e, exc_info=True)
             raise QAValidationError(f"Failed to format checklist for validation: {str(e)}")
 
-    async def _call_llm(self, prompt):
+    async def _call_llm(self, prompt, call_site=None):
         """
         Call the LLM with the given prompt using the class's model instance.
         """
         if not self.llm_client:
              raise LLMError("QAValidator LLM model is not initialized.")
-        return await self.llm_client.generate(prompt)
+        return await self.llm_client.generate(prompt, call_site=call_site)
 
     def _parse_validation_results(self, response):
         """
@@ -163,18 +163,8 @@ class QAValidator:
         Parse the LLM response expecting JSON, potentially wrapped in markdown.
         """
         try:
-            # Clean potential markdown fences
-            if "```json" in response:
-                json_str = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_str = response.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = response.strip()
-
-            # Handle potential escape sequences
-            json_str = json_str.replace('\\n', '\n').replace('\\"', '"')
-
-            parsed_json = json.loads(json_str)
+            # Fenced or prose-wrapped JSON is located without rewriting string escapes
+            parsed_json = extract_json(response)
 
             if expected_key not in parsed_json:
                 available_keys = list(parsed_json.keys()) if isinstance(parsed_json, dict) else "N/A (not a dict)"
@@ -0,0 +1,207 @@
+"""
+JSON-RPC message framing and dispatch over the backend's stdio streams.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, Optional
+
+from llm.call_context import priority_scope, rpc_method_scope
+from llm.usage import USAGE
+
+logger = logging.getLogger("PythonBackend")
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """Reads a JSON-RPC message based on Content-Length header."""
+    try:
+        line = await reader.readline()
+        if not line:
+            logger.info("Received EOF from stdin reader.")
+            return None # End of stream
+        header = line.decode('utf-8').strip()
+        logger.debug(f"Received header line: {header}")
+
+        if header.startswith("Content-Length:"):
+            try:
+                length = int(header.split(":")[1].strip())
+                logger.debug(f"Expecting message body of length: {length}")
+            except (ValueError, IndexError):
+                logger.error(f"Invalid Content-Length header format: {header}")
+                return None # Treat as error, maybe read until next valid header?
+
+            # Read the blank line separating header and content
+            separator_line = await reader.readline()
+            if separator_line.strip(): # Should be empty
+                 logger.warning(f"Expected blank line after header, got: {separator_line.decode('utf-8').strip()}")
+                 # Continue anyway, maybe the client doesn't send it strictly
+
+            # Read the message content
+            logger.debug("Reading message body...")
+            body = await reader.readexactly(length)
+            logger.debug(f"Successfully read {len(body)} bytes for message body.")
+            return body
+        else:
+            logger.warning(f"Received unexpected line (expecting Content-Length): {header}")
+            # Keep reading until a valid header or EOF. Returning None might break the loop.
+            # Let's assume for now that only valid headers will eventually come.
+            # In a robust implementation, might need better recovery here.
+            return await read_message(reader) # Recursively try reading the next line
+
+    except asyncio.IncompleteReadError:
+         logger.info("Stdin closed unexpectedly while reading message (IncompleteReadError).")
+         return None
+    except Exception as e:
+        logger.error(f"Error reading message header/body: {e}", exc_info=True)
+        return None
+
+
+def write_message(writer: asyncio.StreamWriter, message: Dict):
+    """Writes a JSON-RPC message with Content-Length header."""
+    try:
+        logger.debug(f"Preparing to write message: {str(message)[:200]}...") # Log truncated message
+        body = json.dumps(message).encode('utf-8')
+        header = f"Content-Length: {len(body)}\r\n\r\n".encode('utf-8')
+        logger.debug(f"Writing header: Content-Length: {len(body)}")
+        writer.write(header)
+        logger.debug(f"Writing body ({len(body)} bytes)")
+        writer.write(body)
+        # Drain is handled in the main loop after this call
+    except Exception as e:
+         logger.error(f"Error encoding or writing message: {e}", exc_info=True)
+
+
+async def process_request(request_bytes: bytes, writer: asyncio.StreamWriter, method_map: Dict[str, Callable]):
+    """
+    Dispatch one JSON-RPC message to its handler in ``method_map`` and write its response.
+    """
+    request_id = None # Keep track for error reporting
+    method_name = None # Keep track for error reporting
+    request_str = request_bytes.decode('utf-8') # For logging and parsing
+    logger.info(f"Received request: {request_str[:500]}{'...' if len(request_str) > 500 else ''}") # Log truncated request
+
+    response_dict = None
+    try:
+        request_dict = json.loads(request_str)
+        method_name = request_dict.get("method")
+        params = request_dict.get("params")
+        request_id = request_dict.get("id") # Can be None for notifications
+
+        if not method_name:
+             raise ValueError("Request object missing 'method' field.")
+
+        if method_name in method_map:
+            handler = method_map[method_name]
+
+            # --- Handle Sync/Async Dispatch ---
+            if asyncio.iscoroutinefunction(handler):
+                logger.debug(f"Dispatching ID:{request_id} to ASYNC handler: {method_name}")
+                # Await the async handler directly, attributing its LLM calls to this request.
+                # LLM calls queue in the lane of this method unless params.priority overrides it.
+                explicit_priority = params.get("priority") if isinstance(params, dict) else None
+                with USAGE.request_scope(method_name) as request_usage, \
+                        rpc_method_scope(method_name), priority_scope(explicit_priority):
+                    result_data = await handler(params) # Pass params
+                logger.debug(f"Handler {method_name} (ID:{request_id}) returned.")
+
+                # Construct response if it's not a notification
+                if request_id is not None:
+                    # Check if handler returned an error structure (simple check)
+                    if isinstance(result_data, dict) and result_data.get("code") is not None and result_data.get("message") is not None:
+                        logger.warning(f"Handler {method_name} (ID:{request_id}) returned an error structure: {result_data}")
+                        response_dict = {"jsonrpc": "2.0", "id": request_id, "error": result_data}
+                    else:
+                        logger.debug(f"Handler {method_name} (ID:{request_id}) returned success result.")
+                        # Optional per-request LLM usage block
+                        if isinstance(params, dict) and params.get("includeUsage") and isinstance(result_data, dict):
+                            result_data["usage"] = request_usage.to_dict()
+                        response_dict = {"jsonrpc": "2.0", "id": request_id, "result": result_data}
+                else:
+                     logger.debug(f"Request was a notification (method: {method_name}), no response sent.")
+
+            else: # Synchronous handler
+                logger.debug(f"Dispatching ID:{request_id} to SYNC handler: {method_name}")
+                # Use the synchronous manager for sync handlers (assumes it doesn't block excessively!)
+                # Filter the method map just for this call to avoid unintended dispatches
+                from jsonrpc.manager import JSONRPCResponseManager
+                sync_response = JSONRPCResponseManager.handle(request_bytes, {method_name: handler})
+                logger.debug(f"Sync handler {method_name} (ID:{request_id}) returned via manager.")
+                if sync_response:
+                    response_dict = sync_response.data # Contains full response dict
+                # If it was a sync notification, sync_response is None, response_dict remains None
+        else:
+            # Method not found
+            logger.warning(f"Method not found: {method_name} (ID:{request_id})")
+            if request_id is not None:
+                response_dict = {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "error": {"code": -32601, "message": f"Method not found: {method_name}"}
+                }
+
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to decode JSON request: {request_str[:500]}... Error: {e}", exc_info=True)
+        # Try to respond with parse error, ID might be unknown
+        response_dict = {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": f"Parse error: {e}"}}
+    except Exception as e:
+        # Catch errors during handler lookup or dispatch
+        logger.exception(f"Error processing request for method '{method_name}' (ID:{request_id}): {e}")
+        if request_id is not None:
+            response_dict = {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32603, "message": f"Internal server error: {e}"}}
+
+    # --- Write Response ---
+    if response_dict:
+        logger.info(f"Sending response (ID: {response_dict.get('id')}): {str(response_dict)[:500]}{'...' if len(str(response_dict)) > 500 else ''}")
+        write_message(writer, response_dict)
+        try:
+            await writer.drain() # Ensure message is flushed
+            logger.debug(f"Writer drained for response ID: {response_dict.get('id')}")
+        except ConnectionResetError:
+             logger.warning(f"Connection reset while draining writer for response ID: {response_dict.get('id')}. Client may have disconnected.")
+        except Exception as e:
+             logger.error(f"Error draining writer for response ID: {response_dict.get('id')}: {e}", exc_info=True)
+
+
+async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method_map: Dict[str, Callable]):
+    """
+    Read messages until the input stream ends, dispatching each as its own task.
+
+    A slow request (e.g., plan generation) no longer holds up the requests
+    behind it: each response is written when its request completes and is
+    matched to it by id, so responses may arrive out of order. Tasks start
+    in arrival order and synchronous handlers finish in their first step, so
+    those (``initialize``, ``shutdown``, ...) still take effect in order.
+    ``write_message`` writes header and body without awaiting in between,
+    so responses and notifications only interleave as whole messages.
+    Requests still in flight when the stream ends are awaited.
+    """
+    in_flight = set()
+    while True:
+        try:
+            logger.debug("Waiting for next message...")
+            request_bytes = await read_message(reader)
+
+            if request_bytes is None:
+                logger.info("Received None from read_message, likely EOF or read error. Exiting main loop.")
+                break # Exit loop if stdin closes or read fails critically
+
+            task = asyncio.ensure_future(process_request(request_bytes, writer, method_map))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        # --- Handle Loop-Level Exceptions ---
+        except asyncio.IncompleteReadError:
+            logger.info("Client closed connection (IncompleteReadError in main loop).")
+            break
+        except ConnectionResetError:
+            logger.info("Client connection reset (ConnectionResetError in main loop).")
+            break
+        except Exception as e:
+            logger.exception(f"Critical unexpected error in main loop: {e}")
+            # Maybe try to send one last error message if possible? Risky.
+            break # Exit loop on critical errors
+
+    if in_flight:
+        logger.info(f"Waiting for {len(in_flight)} in-flight request(s) to finish...")
+        await asyncio.gather(*in_flight, return_exceptions=True)
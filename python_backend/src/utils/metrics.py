@@ -0,0 +1,117 @@
+"""
+Lightweight in-process metrics registry for the Python backend.
+"""
+
+import threading
+from collections import defaultdict, deque
+
+
+class MetricsRegistry:
+    """
+    Collects counters, gauges and timing observations keyed by name and labels.
+
+    Observations keep a bounded window of recent samples so percentiles can be
+    reported without unbounded memory growth.
+    """
+
+    def __init__(self, window_size=512):
+        """
+        Initialize the MetricsRegistry.
+
+        Args:
+            window_size (int, optional): Number of recent samples kept per observation series.
+        """
+        self.window_size = window_size
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._gauges = {}
+        self._observations = {}
+
+    @staticmethod
+    def _key(name, labels):
+        """
+        Build a stable series key such as ``llm.queue_wait_seconds{model=x,provider=y}``.
+        """
+        if not labels:
+            return name
+        label_str = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+        return f"{name}{{{label_str}}}"
+
+    def increment(self, name, value=1, **labels):
+        """
+        Increment a counter.
+        """
+        with self._lock:
+            self._counters[self._key(name, labels)] += value
+
+    def set_gauge(self, name, value, **labels):
+        """
+        Set a gauge to an absolute value.
+        """
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        """
+        Record a single observation (e.g., a duration in seconds).
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            series = self._observations.get(key)
+            if series is None:
+                series = {"count": 0, "sum": 0.0, "min": value, "max": value, "samples": deque(maxlen=self.window_size)}
+                self._observations[key] = series
+            series["count"] += 1
+            series["sum"] += value
+            series["min"] = min(series["min"], value)
+            series["max"] = max(series["max"], value)
+            series["samples"].append(value)
+
+    def snapshot(self):
+        """
+        Return a JSON-serializable view of all metrics.
+
+        Returns:
+            dict: Counters, gauges and observation summaries (count, sum, avg, min, max, p50, p95).
+        """
+        with self._lock:
+            observations = {}
+            for key, series in self._observations.items():
+                samples = sorted(series["samples"])
+                observations[key] = {
+                    "count": series["count"],
+                    "sum": series["sum"],
+                    "avg": series["sum"] / series["count"] if series["count"] else 0.0,
+                    "min": series["min"],
+                    "max": series["max"],
+                    "p50": _percentile(samples, 0.50),
+                    "p95": _percentile(samples, 0.95),
+                }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "observations": observations,
+            }
+
+    def reset(self):
+        """
+        Clear all recorded metrics.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._observations.clear()
+
+
+def _percentile(sorted_samples, fraction):
+    """
+    Nearest-rank percentile of an already sorted sample list.
+    """
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(fraction * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+# Process-wide registry shared by all components.
+METRICS = MetricsRegistry()
@@ -5,6 +5,7 @@ Utility for loading and managing prompts.
 import os
 # Adjust import path for the new location
 from exceptions import PromptError
+from llm.prompt_cache import CacheablePrompt, split_template
 
 
 class PromptManager:
@@ -67,13 +68,17 @@ class PromptManager:
             **kwargs: Keyword arguments to format the prompt.
 
         Returns:
-            str: Formatted prompt.
+            str: Formatted prompt. Templates split by a ``<<<DYNAMIC>>>`` line
+                return a ``CacheablePrompt`` (a ``str``) marking the static prefix.
 
         Raises:
             PromptError: If the prompt file cannot be loaded or formatted.
         """
         try:
             prompt = self.get_prompt(prompt_name)
+            static, dynamic = split_template(prompt)
+            if static is not None:
+                return CacheablePrompt(static.format(**kwargs), dynamic.format(**kwargs))
             return prompt.format(**kwargs)
         except KeyError as e:
             raise PromptError(f"Missing required parameter for prompt '{prompt_name}': {str(e)}")
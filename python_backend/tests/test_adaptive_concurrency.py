@@ -0,0 +1,60 @@
+"""
+Tests for the AIMD concurrency controller.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from llm.adaptive_concurrency import AIMDController
+
+
+def run_calls(calls, sigma, seed=0, slowdown_from=None, slowdown=3.0):
+    """
+    Feed ``calls`` saturated, successful calls with lognormal latency
+    proportional to a base plus their output length; returns (decreases, window).
+    """
+    rng = random.Random(seed)
+    now = [0.0]
+    controller = AIMDController({"max_concurrency": 32}, 8, clock=lambda: now[0])
+    decreases = 0
+    for i in range(calls):
+        tokens = rng.randint(10, 800)
+        latency = (2.0 + 0.02 * tokens) * rng.lognormvariate(0, sigma)
+        if slowdown_from is not None and i >= slowdown_from:
+            latency *= slowdown
+        started = now[0]
+        now[0] += 0.01
+        if controller.on_success("generate_steps", latency, started, controller.window, output_tokens=tokens) == "latency":
+            decreases += 1
+    return decreases, controller.window
+
+
+class TestAIMDController(unittest.TestCase):
+
+    def test_constant_latency_grows_to_ceiling(self):
+        self.assertEqual(run_calls(5000, sigma=0.0), (0, 32))
+
+    def test_healthy_variance_is_not_overload(self):
+        for sigma in (0.3, 0.6):
+            for seed in range(3):
+                with self.subTest(sigma=sigma, seed=seed):
+                    self.assertEqual(run_calls(5000, sigma=sigma, seed=seed), (0, 32))
+
+    def test_sustained_slowdown_decreases_window(self):
+        decreases, window = run_calls(600, sigma=0.3, slowdown_from=300)
+        self.assertGreater(decreases, 0)
+        self.assertLess(window, 32)
+
+    def test_overload_halves_once_per_burst(self):
+        now = [10.0]
+        controller = AIMDController({}, 8, clock=lambda: now[0])
+        self.assertTrue(controller.on_overload(started_at=5.0))
+        self.assertFalse(controller.on_overload(started_at=6.0))
+        self.assertEqual(controller.window, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Tests for ChecklistGenerator against the built-in mock provider.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from core.checklist_generator import ChecklistGenerator
+from core.decomposition_policy import DecompositionPolicy
+from llm.gateway import LLMGateway
+from utils.metrics import METRICS
+from utils.prompt_manager import PromptManager
+
+PROMPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "prompts"))
+
+
+def make_generator(latency=0.0, **config):
+    config = {
+        "provider": "mock",
+        "model": "mock",
+        "mock": {"items_per_list": 3, "latency": {"default": {"distribution": "fixed", "seconds": latency}}},
+        "max_phases": 3,
+        "max_tasks_per_phase": 3,
+        "max_steps_per_task": 3,
+        "journal": {"enabled": False},
+        **config,
+    }
+    return ChecklistGenerator(config, PromptManager(PROMPTS_DIR), llm_client=LLMGateway(config))
+
+
+def mock_calls(generator):
+    return generator.llm_client.client_for("mock").usage_snapshot()["total"]["calls"]
+
+
+class TestExpandNode(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        METRICS.reset()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_expansion_counts_fresh_shared_and_cached(self):
+        generator = make_generator(latency=0.05)
+        checklist = await generator.generate_checklist("Build a todo app", depth="phases")
+        plan_id = checklist["metadata"]["plan_id"]
+        calls = mock_calls(generator)
+
+        results = await asyncio.gather(*(generator.expand_node(plan_id, 0) for _ in range(3)))
+        self.assertTrue(all(result is results[0] for result in results))
+        await generator.expand_node(plan_id, 0)
+        self.assertEqual(mock_calls(generator) - calls, 1)
+
+        counters = METRICS.snapshot()["counters"]
+        self.assertEqual(counters.get("plan.node_expansions{cached=false,level=tasks}"), 1)
+        self.assertEqual(counters.get("plan.node_expansions{cached=shared,level=tasks}"), 2)
+        self.assertEqual(counters.get("plan.node_expansions{cached=true,level=tasks}"), 1)
+
+
+class TestAdaptiveDepth(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        METRICS.reset()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_atomic_tasks_get_one_step_with_unique_ids(self):
+        # Every generated task is flagged atomic
+        generator = make_generator(adaptive_depth={"enabled": True}, mock={"items_per_list": 3, "atomic_rate": 1.0})
+        checklist = await generator.generate_checklist("Build a todo app")
+
+        tasks = [task for phase in checklist["phases"] for task in phase["tasks"]]
+        self.assertGreaterEqual(len(tasks), 2)
+        self.assertTrue(all(len(task["steps"]) == 1 for task in tasks))
+        step_ids = [task["steps"][0]["step_id"] for task in tasks]
+        self.assertEqual(len(set(step_ids)), len(step_ids))
+        self.assertEqual(step_ids[:2], ["phase0_task0_step0", "phase0_task1_step0"])
+
+        counters = METRICS.snapshot()["counters"]
+        self.assertEqual(counters.get("plan.step_decompositions{decision=atomic_flag}"), len(tasks))
+        self.assertNotIn("generate_steps", generator.llm_client.client_for("mock").usage_snapshot()["call_sites"])
+
+
+class TestDecompositionPolicy(unittest.TestCase):
+
+    def tasks_prompt(self, policy):
+        return PromptManager(PROMPTS_DIR).format_prompt(
+            "generate_tasks", goal="g", phase_name="p", phase_description="d", context="{}", max_tasks=3,
+            atomic_instruction=policy.task_instruction()
+        )
+
+    def test_atomic_instruction_only_when_the_flag_is_used(self):
+        self.assertIn('"atomic"', self.tasks_prompt(DecompositionPolicy({"enabled": True})))
+        self.assertNotIn('"atomic"', self.tasks_prompt(DecompositionPolicy()))
+        self.assertNotIn('"atomic"', self.tasks_prompt(DecompositionPolicy({"enabled": True, "use_atomic_flag": False})))
+
+    def test_heuristic_only_accepts_concrete_actions(self):
+        policy = DecompositionPolicy({"enabled": True, "use_atomic_flag": False})
+        self.assertEqual(policy.atomic_reason({"description": "Install the requests package"}), "heuristic")
+        for description in ("Design the database schema", "Test the API", "Implement authentication",
+                            "Review the pull request", "Document the setup"):
+            self.assertIsNone(policy.atomic_reason({"description": description}), description)
+        self.assertIsNone(policy.atomic_reason({"description": "Install and run the server"}))
+
+
+class TestBatchedSteps(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        METRICS.reset()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_batched_steps_get_plan_unique_ids(self):
+        generator = make_generator(batch_steps=True)
+        checklist = await generator.generate_checklist("Build a todo app")
+
+        call_sites = generator.llm_client.client_for("mock").usage_snapshot()["call_sites"]
+        self.assertEqual(call_sites["generate_steps_batch"]["calls"], 3)
+        self.assertNotIn("generate_steps", call_sites)
+        step_ids = [step["step_id"] for phase in checklist["phases"] for task in phase["tasks"] for step in task["steps"]]
+        self.assertEqual(len(set(step_ids)), 27)
+        self.assertEqual(checklist["phases"][1]["tasks"][2]["steps"][0]["step_id"], "phase1_task2_step0")
+
+    async def test_tasks_missing_from_the_batch_fall_back_to_their_own_call(self):
+        # The mock leaves every task out of the batched response
+        generator = make_generator(batch_steps=True, mock={"items_per_list": 3, "batch_omission_rate": 1.0})
+        checklist = await generator.generate_checklist("Build a todo app")
+
+        call_sites = generator.llm_client.client_for("mock").usage_snapshot()["call_sites"]
+        self.assertEqual(call_sites["generate_steps"]["calls"], 9)
+        self.assertEqual(METRICS.snapshot()["counters"].get("plan.batch_step_fallbacks{reason=missing}"), 9)
+        tasks = [task for phase in checklist["phases"] for task in phase["tasks"]]
+        self.assertTrue(all(len(task["steps"]) == 3 for task in tasks))
+        self.assertEqual(tasks[4]["steps"][1]["step_id"], "phase1_task1_step1")
+
+
+if __name__ == "__main__":
+    unittest.main()
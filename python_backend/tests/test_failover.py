@@ -0,0 +1,100 @@
+"""
+Tests for the ordered provider failover chain and its health probing.
+"""
+
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from llm.failover import FailoverChain
+from llm.routing import ModelRouter
+from utils.metrics import METRICS
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFailoverChain(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        METRICS.reset()
+        self.clock = FakeClock()
+        router = ModelRouter({"provider": "google", "model": "pro"})
+        self.chain = FailoverChain(
+            {
+                "chain": [{"model": "flash"}, {"provider": "openai", "model": "gpt"}, {"model": "pro"}],
+                "probe_interval_seconds": 30,
+            },
+            router=router,
+            clock=self.clock,
+        )
+        self.primary = router.resolve("generate_steps")
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def labels(self, routes):
+        return [route.label for route in routes]
+
+    def test_candidates_follow_chain_order_without_duplicates(self):
+        self.assertEqual(self.labels(self.chain.candidates(self.primary)), ["google/pro", "google/flash", "openai/gpt"])
+
+    def test_next_untried_entry_is_used_within_a_call(self):
+        self.assertEqual(self.chain.select(self.primary).label, "google/pro")
+        self.assertEqual(self.chain.select(self.primary, tried={"google/pro"}).label, "google/flash")
+        tried = {"google/pro", "google/flash", "openai/gpt"}
+        self.assertIsNone(self.chain.select(self.primary, tried=tried))
+        self.assertFalse(self.chain.has_next(self.primary, tried))
+
+    def test_unhealthy_primary_is_skipped_until_its_probe(self):
+        primary = self.chain.select(self.primary)
+        self.chain.record_failure(primary)
+        self.assertEqual(self.chain.select(self.primary).label, "google/flash")
+
+        self.clock.now = 30.0
+        probe = self.chain.select(self.primary)
+        self.assertEqual(probe.label, "google/pro")
+        # Only one probe at a time; other calls keep using the fallback
+        self.assertEqual(self.chain.select(self.primary).label, "google/flash")
+        self.assertEqual(METRICS.snapshot()["counters"]["llm.failover_probes{route=google/pro}"], 1)
+
+        self.chain.record_success(probe)
+        self.assertEqual(self.chain.select(self.primary).label, "google/pro")
+
+    def test_failed_probe_waits_another_interval(self):
+        self.chain.record_failure(self.primary)
+        self.clock.now = 30.0
+        self.chain.record_failure(self.chain.select(self.primary))
+        self.clock.now = 59.0
+        self.assertEqual(self.chain.select(self.primary).label, "google/flash")
+        self.clock.now = 60.0
+        self.assertEqual(self.chain.select(self.primary).label, "google/pro")
+
+    def test_released_probe_can_be_retried(self):
+        self.chain.record_failure(self.primary)
+        self.clock.now = 30.0
+        self.chain.release(self.chain.select(self.primary))
+        self.assertEqual(self.chain.select(self.primary).label, "google/pro")
+
+    def test_all_unhealthy_still_tries_the_first_untried_entry(self):
+        for route in self.chain.candidates(self.primary):
+            self.chain.record_failure(route)
+        self.assertEqual(self.chain.select(self.primary, tried={"google/pro"}).label, "google/flash")
+
+    def test_disabled_without_a_chain(self):
+        chain = FailoverChain({}, router=ModelRouter({}))
+        self.assertFalse(chain.enabled)
+        self.assertEqual(chain.candidates(self.primary), [self.primary])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Tests for resuming failed plans from the generation journal.
+"""
+
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from core.generation_journal import GenerationJournal
+from exceptions import ChecklistGeneratorError
+from utils.metrics import METRICS
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_checklist_generator import make_generator
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestGenerationJournal(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        METRICS.reset()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_same_request_resumes_its_journal(self):
+        journal = GenerationJournal()
+        journal.open("p1", "goal", {"team": 2}).record("phases", {"selected": [{"name": "A"}]})
+
+        resumed = journal.open("p1", "goal", {"team": 2})
+        self.assertEqual(resumed.get("phases"), {"selected": [{"name": "A"}]})
+        self.assertEqual(METRICS.snapshot()["counters"]["plan.journal_resumes"], 1)
+
+    def test_different_goal_or_context_starts_over(self):
+        journal = GenerationJournal()
+        journal.open("p1", "goal", {}).record("phases", [])
+        self.assertIsNone(journal.open("p1", "goal", {"team": 2}).get("phases"))
+        journal.open("p1", "goal", {}).record("phases", [])
+        self.assertIsNone(journal.open("p1", "other goal", {}).get("phases"))
+
+    def test_replays_are_copies(self):
+        plan_journal = GenerationJournal().open("p1", "goal", {})
+        result = {"selected": [{"name": "A"}]}
+        plan_journal.record("phases", result)
+        result["selected"].append({"name": "B"})
+        replay = plan_journal.get("phases")
+        replay["selected"].clear()
+        self.assertEqual(plan_journal.get("phases"), {"selected": [{"name": "A"}]})
+
+    def test_expired_and_least_recently_used_journals_are_dropped(self):
+        clock = FakeClock()
+        journal = GenerationJournal({"max_plans": 2, "ttl_seconds": 10}, clock=clock)
+        for plan_id in ("p1", "p2", "p3"):
+            journal.open(plan_id, "goal", {}).record("phases", [])
+        self.assertIsNone(journal.open("p1", "goal", {}).get("phases"))
+
+        clock.now = 11.0
+        self.assertIsNone(journal.open("p3", "goal", {}).get("phases"))
+
+
+class TestPlanResume(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        METRICS.reset()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_retry_with_the_plan_id_only_makes_the_missing_calls(self):
+        generator = make_generator(
+            journal={"enabled": True},
+            mock={"items_per_list": 3, "errors": {"rate": 1.0, "status_codes": [400], "call_sites": ["generate_steps"]}},
+        )
+        mock = generator.llm_client.client_for("mock")
+        with self.assertRaisesRegex(ChecklistGeneratorError, "nodes journaled"):
+            await generator.generate_checklist("Build a todo app", plan_id="p1")
+        calls = {site: usage["calls"] for site, usage in mock.usage_snapshot()["call_sites"].items()}
+        self.assertEqual(calls["generate_phases"], 1)
+
+        mock.error_rate = 0.0
+        checklist = await generator.generate_checklist("Build a todo app", plan_id="p1")
+
+        usage = mock.usage_snapshot()["call_sites"]
+        self.assertEqual(usage["generate_phases"]["calls"], 1)
+        # Tasks journaled by the failed run are replayed, the rest are generated now
+        self.assertEqual(usage["generate_tasks"]["calls"], 3)
+        self.assertEqual(usage["generate_steps"]["calls"], 9)
+        self.assertEqual(checklist["metadata"]["plan_id"], "p1")
+        self.assertTrue(all(len(task["steps"]) == 3 for phase in checklist["phases"] for task in phase["tasks"]))
+
+        counters = METRICS.snapshot()["counters"]
+        self.assertEqual(counters["plan.journal_resumes"], 1)
+        self.assertEqual(counters["plan.journal_replayed_nodes"], 1 + calls["generate_tasks"])
+
+
+if __name__ == "__main__":
+    unittest.main()
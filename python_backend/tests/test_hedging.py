@@ -0,0 +1,72 @@
+"""
+Tests for the hedge delay and the hedge credit budget.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from llm.hedging import HedgePolicy, LatencyTracker
+
+
+def make_policy(**config):
+    return HedgePolicy({"enabled": True, "min_samples": 4, "max_hedge_fraction": 0.25, **config})
+
+
+class TestHedgePolicy(unittest.TestCase):
+
+    def test_each_call_earns_a_fraction_of_a_hedge(self):
+        policy = make_policy()
+        for _ in range(3):
+            policy.hedge_delay("generate_steps")
+        self.assertFalse(policy.try_acquire_hedge())
+
+        policy.hedge_delay("generate_steps")
+        self.assertTrue(policy.try_acquire_hedge())
+        # The credit was spent
+        self.assertFalse(policy.try_acquire_hedge())
+
+    def test_saved_credit_is_capped(self):
+        policy = make_policy(max_hedge_fraction=1.0)
+        for _ in range(100):
+            policy.hedge_delay("generate_steps")
+        granted = sum(policy.try_acquire_hedge() for _ in range(100))
+        self.assertEqual(granted, HedgePolicy.MAX_CREDIT)
+
+    def test_calls_outside_the_call_sites_earn_nothing(self):
+        policy = make_policy(call_sites=["generate_steps"], max_hedge_fraction=1.0)
+        self.assertIsNone(policy.hedge_delay("select_persona"))
+        self.assertFalse(policy.try_acquire_hedge())
+        self.assertFalse(HedgePolicy({"max_hedge_fraction": 1.0}).applies_to("generate_steps"))
+
+    def test_delay_needs_enough_samples(self):
+        policy = make_policy(percentile=0.5)
+        for seconds in (1.0, 2.0, 3.0):
+            policy.record_latency("generate_steps", seconds)
+        self.assertIsNone(policy.hedge_delay("generate_steps"))
+
+        policy.record_latency("generate_steps", 4.0)
+        self.assertEqual(policy.hedge_delay("generate_steps"), 2.0)
+
+    def test_delay_never_drops_below_the_minimum(self):
+        policy = make_policy(min_delay_seconds=5.0)
+        for _ in range(4):
+            policy.record_latency("generate_steps", 0.1)
+        self.assertEqual(policy.hedge_delay("generate_steps"), 5.0)
+
+
+class TestLatencyTracker(unittest.TestCase):
+
+    def test_nearest_rank_percentile_over_a_bounded_window(self):
+        tracker = LatencyTracker(window_size=10)
+        for seconds in range(1, 21):
+            tracker.record("site", float(seconds))
+        self.assertEqual(tracker.count("site"), 10)
+        self.assertEqual(tracker.percentile("site", 0.95), 20.0)
+        self.assertEqual(tracker.percentile("site", 0.5), 15.0)
+        self.assertIsNone(tracker.percentile("other", 0.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
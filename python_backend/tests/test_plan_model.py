@@ -0,0 +1,131 @@
+"""
+Tests for the typed plan model and the plan store built on it.
+"""
+
+import json
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from core.plan_model import Plan
+from core.plan_store import PlanStore
+from utils.metrics import METRICS
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_checklist_generator import make_generator
+
+
+def build_checklist():
+    return {
+        "goal": "Build a todo app",
+        "phases": [
+            {
+                "name": f"Phase {p + 1}",
+                "description": None,
+                "tasks": [
+                    {
+                        "name": f"Task {t + 1}",
+                        # Step ids as an LLM might return them: repeated in every task
+                        "steps": [{"step_id": f"step_{s + 1}", "prompt": f"Do {s + 1}", "effort": "low"} for s in range(2)],
+                    }
+                    for t in range(2)
+                ],
+                "reasoning": {"tasks": {"selected": f"tasks/{p}", "alternatives": [f"tasks/{p}"]}},
+            }
+            for p in range(2)
+        ] + [{"name": "Lazy phase"}],
+        "metadata": {"plan_id": "p1", "schedule": {"wall_seconds": 1.0}},
+    }
+
+
+class TestPlanModel(unittest.TestCase):
+
+    def test_round_trip_is_lossless(self):
+        checklist = build_checklist()
+        plan = Plan.from_dict(checklist)
+        self.assertEqual(plan.to_dict(), checklist)
+        self.assertIsNone(plan.phases[2].tasks)
+
+    def test_node_ids_are_unique_even_with_repeated_step_ids(self):
+        plan = Plan.from_dict(build_checklist())
+        ids = [
+            node.node_id
+            for phase in plan.phases
+            for node in (phase, *(phase.tasks or ()), *(step for task in phase.tasks or () for step in task.steps))
+        ]
+        self.assertEqual(len(ids), len(set(ids)))
+        step = plan.node("phase1_task1_step0")
+        self.assertEqual((step.step_id, step.prompt), ("step_1", "Do 1"))
+
+    def test_canonical_json_matches_json_dumps(self):
+        checklist = build_checklist()
+        body = {k: v for k, v in checklist.items() if k != "metadata"}
+        expected = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        self.assertEqual(Plan.from_dict(checklist).canonical_json(), expected)
+
+    def test_digest_ignores_metadata_and_tracks_content(self):
+        checklist = build_checklist()
+        plan = Plan.from_dict(checklist)
+        other = Plan.from_dict({**checklist, "metadata": {"plan_id": "p2"}})
+        self.assertEqual(plan.digest, other.digest)
+
+        changed = plan.with_node(0, 1, {"name": "Task 2", "steps": []})
+        self.assertNotEqual(changed.digest, plan.digest)
+        # Untouched subtrees are shared, not copied
+        self.assertIs(changed.phases[1], plan.phases[1])
+        self.assertIs(changed.phases[0].tasks[0], plan.phases[0].tasks[0])
+
+    def test_at_rejects_missing_paths(self):
+        plan = Plan.from_dict(build_checklist())
+        self.assertEqual(plan.at(0, 1)[1].name, "Task 2")
+        with self.assertRaises(ValueError):
+            plan.at(3)
+        with self.assertRaises(ValueError):
+            plan.at(2, 0)
+
+
+class TestPlanStore(unittest.TestCase):
+
+    def test_update_applies_to_the_current_plan(self):
+        store = PlanStore()
+        plan_id = store.put(build_checklist())
+        stale = store.get(plan_id)
+        store.update(plan_id, lambda plan: plan.with_node(0, 0, {"name": "First"}))
+        store.update(plan_id, lambda plan: plan.with_node(0, 1, {"name": "Second"}))
+
+        tasks = store.get(plan_id).phases[0].tasks
+        self.assertEqual([task.name for task in tasks], ["First", "Second"])
+        self.assertEqual(stale.phases[0].tasks[0].name, "Task 1")
+
+
+class TestLazyPlanExpansion(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        METRICS.reset()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_expansion_does_not_change_returned_plans(self):
+        generator = make_generator()
+        checklist = await generator.generate_checklist("Build a todo app", depth="phases")
+        plan_id = checklist["metadata"]["plan_id"]
+
+        phase = await generator.expand_node(plan_id, 0)
+        await generator.expand_node(plan_id, 0, 0)
+
+        self.assertNotIn("tasks", checklist["phases"][0])
+        self.assertNotIn("steps", phase["tasks"][0])
+        stored = generator.plan_store.get(plan_id)
+        self.assertEqual(len(stored.phases[0].tasks[0].steps), 3)
+        self.assertEqual(stored.phases[0].tasks[0].steps[0].step_id, "phase0_task0_step0")
+        # Expanding again is answered from the stored plan
+        cached = await generator.expand_node(plan_id, 0, 0)
+        self.assertEqual(cached, stored.phases[0].tasks[0].to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Tests for the dependency-graph scheduler of checklist generation jobs.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from core.plan_scheduler import PlanScheduler
+
+
+class TestPlanScheduler(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.events = []
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def job(self, key, seconds=0.0, result=None):
+        async def run():
+            self.events.append(f"start {key}")
+            await asyncio.sleep(seconds)
+            self.events.append(f"end {key}")
+            return result
+        return run
+
+    async def test_nodes_start_after_their_dependencies(self):
+        scheduler = PlanScheduler(concurrency=4)
+        scheduler.add("phases", self.job("phases", 0.01))
+        scheduler.add("tasks/0", self.job("tasks/0", 0.03), deps=("phases",))
+        scheduler.add("tasks/1", self.job("tasks/1", 0.01), deps=("phases",))
+        scheduler.add("steps/0/0", self.job("steps/0/0"), deps=("tasks/0",))
+        await scheduler.run()
+
+        position = self.events.index
+        self.assertLess(position("end phases"), position("start tasks/0"))
+        self.assertLess(position("end phases"), position("start tasks/1"))
+        self.assertLess(position("end tasks/0"), position("start steps/0/0"))
+        # Independent branches overlap: tasks/1 finished while tasks/0 was still running
+        self.assertLess(position("end tasks/1"), position("end tasks/0"))
+
+    async def test_jobs_can_add_nodes_while_running(self):
+        scheduler = PlanScheduler()
+
+        async def tasks_job():
+            scheduler.add("steps/0/0", self.job("steps/0/0", result=["step"]), deps=("tasks/0",))
+            return ["task"]
+
+        scheduler.add("tasks/0", tasks_job)
+        await scheduler.run()
+        self.assertEqual(scheduler.result("steps/0/0"), ["step"])
+        self.assertEqual(scheduler.critical_path(), ["tasks/0", "steps/0/0"])
+
+    async def test_concurrency_bounds_running_jobs(self):
+        scheduler = PlanScheduler(concurrency=2)
+        running = []
+        peak = []
+
+        async def job():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+        for i in range(5):
+            scheduler.add(f"steps/0/{i}", job)
+        await scheduler.run()
+        self.assertEqual(max(peak), 2)
+
+    async def test_failure_cancels_other_nodes_and_is_raised(self):
+        scheduler = PlanScheduler()
+
+        async def fail():
+            raise RuntimeError("tasks failed")
+
+        scheduler.add("tasks/0", fail)
+        slow = scheduler.add("tasks/1", self.job("tasks/1", 10))
+        dependent = scheduler.add("steps/0/0", self.job("steps/0/0"), deps=("tasks/0",))
+        with self.assertRaisesRegex(RuntimeError, "tasks failed"):
+            await scheduler.run()
+        await asyncio.gather(slow.future, dependent.future, return_exceptions=True)
+        self.assertTrue(slow.future.cancelled())
+        self.assertNotIn("end tasks/1", self.events)
+        self.assertNotIn("start steps/0/0", self.events)
+
+    async def test_unknown_and_duplicate_nodes_are_rejected(self):
+        scheduler = PlanScheduler()
+        scheduler.add("phases", self.job("phases"))
+        with self.assertRaises(ValueError):
+            scheduler.add("phases", self.job("phases"))
+        with self.assertRaises(ValueError):
+            scheduler.add("tasks/0", self.job("tasks/0"), deps=("missing",))
+        await scheduler.run()
+
+    async def test_report_has_per_node_timings(self):
+        scheduler = PlanScheduler()
+        scheduler.add("phases", self.job("phases", 0.01))
+        scheduler.add("tasks/0", self.job("tasks/0", 0.01), deps=("phases",))
+        await scheduler.run()
+
+        report = scheduler.report()
+        self.assertEqual(report["critical_path"], ["phases", "tasks/0"])
+        node = report["nodes"]["tasks/0"]
+        self.assertEqual(node["deps"], ["phases"])
+        self.assertGreaterEqual(node["start"], report["nodes"]["phases"]["end"])
+        self.assertEqual(report["wall_seconds"], node["end"])
+
+
+if __name__ == "__main__":
+    unittest.main()
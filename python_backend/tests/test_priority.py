@@ -0,0 +1,82 @@
+"""
+Tests for priority lanes and the priority turnstile.
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from llm.priority import PriorityTurnstile
+
+
+class TestPriorityTurnstile(unittest.IsolatedAsyncioTestCase):
+
+    async def test_lowest_rank_is_served_first(self):
+        turnstile = PriorityTurnstile(aging_seconds=0)
+        await turnstile.acquire(0)
+        served = []
+
+        async def waiter(rank):
+            async with turnstile.slot(rank):
+                served.append(rank)
+
+        tasks = [asyncio.ensure_future(waiter(rank)) for rank in (2, 1, 0)]
+        await asyncio.sleep(0)
+        turnstile.release()
+        await asyncio.gather(*tasks)
+        self.assertEqual(served, [0, 1, 2])
+        self.assertFalse(turnstile.locked())
+
+    async def test_cancelled_waiters_do_not_lock_the_turnstile(self):
+        turnstile = PriorityTurnstile(aging_seconds=0)
+        await turnstile.acquire(0)
+        waiters = [asyncio.ensure_future(turnstile.acquire(rank % 3)) for rank in range(20)]
+        await asyncio.sleep(0)
+
+        # Cancel every queued waiter and release before any of them runs again
+        for task in waiters:
+            task.cancel()
+        turnstile.release()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        self.assertTrue(all(isinstance(r, asyncio.CancelledError) for r in results))
+
+        self.assertFalse(turnstile.locked())
+        await asyncio.wait_for(turnstile.acquire(2), timeout=1)
+        turnstile.release()
+        self.assertFalse(turnstile.locked())
+
+    async def test_live_waiter_is_served_after_cancelled_ones(self):
+        turnstile = PriorityTurnstile(aging_seconds=0)
+        await turnstile.acquire(0)
+        cancelled = [asyncio.ensure_future(turnstile.acquire(0)) for _ in range(5)]
+        live = asyncio.ensure_future(turnstile.acquire(2))
+        await asyncio.sleep(0)
+
+        for task in cancelled:
+            task.cancel()
+        turnstile.release()
+        await asyncio.wait_for(live, timeout=1)
+        self.assertTrue(turnstile.locked())
+        turnstile.release()
+        await asyncio.gather(*cancelled, return_exceptions=True)
+        self.assertFalse(turnstile.locked())
+
+    async def test_waiter_cancelled_after_being_granted_hands_on(self):
+        turnstile = PriorityTurnstile(aging_seconds=0)
+        await turnstile.acquire(0)
+        first = asyncio.ensure_future(turnstile.acquire(0))
+        second = asyncio.ensure_future(turnstile.acquire(1))
+        await asyncio.sleep(0)
+
+        turnstile.release()  # Grants `first`...
+        first.cancel()  # ...which is cancelled before it resumes
+        await asyncio.gather(first, return_exceptions=True)
+        await asyncio.wait_for(second, timeout=1)
+        turnstile.release()
+        self.assertFalse(turnstile.locked())
+
+
+if __name__ == "__main__":
+    unittest.main()
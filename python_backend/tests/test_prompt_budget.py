@@ -0,0 +1,85 @@
+"""
+Tests for context compaction and per-call-site prompt budgets.
+"""
+
+import json
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from llm.prompt_budget import PromptBudget, compact_json
+from utils.metrics import METRICS
+
+
+def build_context():
+    step = {"step_id": "s", "prompt": "Write the code " * 10}
+    return {
+        "goal": "Build a todo app",
+        "phases": [{"name": f"Phase {p}", "tasks": [{"name": "Task", "steps": [step] * 5}] * 3} for p in range(4)],
+        "current_phase": {"name": "Phase 1", "description": "Set up the project"},
+        "notes": None,
+    }
+
+
+def render(serialized):
+    return f"Plan the next steps.\nContext:\n{serialized}"
+
+
+class TestPromptBudget(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        METRICS.reset()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def observation(self, name, call_site):
+        return METRICS.snapshot()["observations"][f"{name}{{call_site={call_site}}}"]
+
+    def test_siblings_are_reduced_to_names(self):
+        compacted = PromptBudget().compact_context(build_context())
+        self.assertEqual(compacted["phases"], ["Phase 0", "Phase 1", "Phase 2", "Phase 3"])
+        self.assertNotIn("notes", compacted)
+        self.assertEqual(compacted["current_phase"], build_context()["current_phase"])
+
+    def test_unlimited_call_site_sends_compacted_context(self):
+        budget = PromptBudget()
+        prompt = budget.build_prompt("generate_steps", build_context(), render)
+        self.assertEqual(prompt, render(compact_json(budget.compact_context(build_context()))))
+
+    def test_over_budget_context_drops_siblings_then_truncates(self):
+        context = build_context()
+        context["current_phase"]["description"] = "x" * 2000
+        budget = PromptBudget({"max_prompt_tokens": {"generate_steps": 200}})
+
+        prompt = budget.build_prompt("generate_steps", context, render)
+        sent = json.loads(prompt.split("Context:\n", 1)[1])
+        self.assertNotIn("phases", sent)
+        self.assertEqual(len(sent["current_phase"]["description"]), PromptBudget.TRUNCATED_VALUE_CHARS + 3)
+
+    def test_budget_exceeded_is_counted(self):
+        budget = PromptBudget({"max_prompt_tokens": {"default": 5}})
+        budget.build_prompt("generate_tasks", build_context(), render)
+        self.assertEqual(METRICS.snapshot()["counters"]["llm.prompt_budget_exceeded{call_site=generate_tasks}"], 1)
+
+    def test_tokens_before_compaction_are_estimated(self):
+        context = build_context()
+        PromptBudget().build_prompt("generate_steps", context, render)
+
+        before = self.observation("llm.prompt_tokens_before", "generate_steps")["sum"]
+        after = self.observation("llm.prompt_tokens_after", "generate_steps")["sum"]
+        uncompacted = len(render(compact_json(context))) / 4
+        self.assertGreater(before, after)
+        self.assertAlmostEqual(before, uncompacted, delta=2)
+
+    def test_disabled_budget_sends_the_indented_context(self):
+        budget = PromptBudget({"enabled": False})
+        self.assertEqual(budget.build_prompt("generate_steps", build_context(), render),
+                         render(json.dumps(build_context(), indent=2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
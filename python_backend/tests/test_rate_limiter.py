@@ -0,0 +1,70 @@
+"""
+Tests for the provider rate limiter's admission order and bucket accounting.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from llm.rate_limiter import LLMRateLimiter
+from utils.metrics import METRICS
+
+
+class TestLLMRateLimiter(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        METRICS.reset()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def make_limiter(self, **limits):
+        return LLMRateLimiter({"requests_per_minute": 60, "tokens_per_minute": 600, "max_concurrency": 1, **limits})
+
+    def balance(self, limiter):
+        lane = limiter._lane("mock", "m")
+        # Round away the refill that accrues while the test runs
+        return round(lane.requests._tokens), round(lane.tokens._tokens)
+
+    async def test_calls_waiting_for_the_gate_are_not_debited(self):
+        limiter = self.make_limiter()
+        release = asyncio.Event()
+
+        async def call():
+            async with limiter.slot("mock", "m", token_estimate=100):
+                await release.wait()
+
+        first = asyncio.ensure_future(call())
+        second = asyncio.ensure_future(call())
+        await asyncio.sleep(0.01)
+        # Only the call holding the gate has been charged
+        self.assertEqual(self.balance(limiter), (59, 500))
+
+        release.set()
+        await asyncio.gather(first, second)
+        self.assertEqual(self.balance(limiter), (58, 400))
+        self.assertEqual(limiter._lane("mock", "m").gate.active, 0)
+
+    async def test_cancelled_bucket_wait_releases_the_gate(self):
+        limiter = self.make_limiter(requests_per_minute=1)
+
+        async with limiter.slot("mock", "m"):
+            pass
+        # The request bucket is now empty for about a minute
+        waiting = asyncio.ensure_future(limiter.slot("mock", "m").__aenter__())
+        await asyncio.sleep(0.01)
+        self.assertEqual(limiter._lane("mock", "m").gate.active, 1)
+
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(limiter._lane("mock", "m").gate.active, 0)
+        self.assertEqual(self.balance(limiter)[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
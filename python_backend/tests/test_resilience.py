@@ -0,0 +1,116 @@
+"""
+Tests for error classification and the per-provider circuit breaker.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from exceptions import LLMCircuitOpenError, LLMError
+from llm.resilience import CircuitBreaker, RetryPolicy, classify_error
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StatusError(Exception):
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TestClassifyError(unittest.TestCase):
+
+    def test_transient_statuses_are_retryable_with_their_hint(self):
+        self.assertEqual(classify_error(StatusError(429, retry_after="2.5")), (True, 2.5))
+        self.assertEqual(classify_error(StatusError(503)), (True, None))
+        self.assertEqual(classify_error(StatusError(400)), (False, None))
+
+    def test_timeouts_and_sdk_messages(self):
+        self.assertTrue(classify_error(asyncio.TimeoutError())[0])
+        self.assertTrue(classify_error(RuntimeError("Resource_exhausted: quota"))[0])
+        self.assertFalse(classify_error(ValueError("bad prompt"))[0])
+
+    def test_own_errors_and_open_circuits_are_final(self):
+        self.assertFalse(classify_error(LLMError("empty response, connection fine"))[0])
+        self.assertFalse(classify_error(LLMCircuitOpenError("open"))[0])
+
+    def test_backoff_honours_retry_after_within_the_cap(self):
+        policy = RetryPolicy({"base_delay_seconds": 0.0, "max_delay_seconds": 5.0})
+        self.assertEqual(policy.backoff(1, retry_after=2.0), 2.0)
+        self.assertEqual(policy.backoff(1, retry_after=60.0), 5.0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("mock", {"failure_threshold": 2, "reset_timeout_seconds": 10}, clock=self.clock)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def fail(self, times=1):
+        for _ in range(times):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(LLMCircuitOpenError):
+            self.breaker.before_call()
+
+    def test_success_resets_the_failure_count(self):
+        self.fail()
+        self.breaker.before_call()
+        self.breaker.record_success()
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_lets_one_probe_through(self):
+        self.fail(2)
+        self.clock.now = 10.0
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(LLMCircuitOpenError):
+            self.breaker.before_call()
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.before_call()
+
+    def test_failed_probe_reopens_for_another_timeout(self):
+        self.fail(2)
+        self.clock.now = 10.0
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.clock.now = 19.0
+        with self.assertRaises(LLMCircuitOpenError):
+            self.breaker.before_call()
+
+    def test_released_probe_frees_the_slot(self):
+        self.fail(2)
+        self.clock.now = 10.0
+        self.breaker.before_call()
+        self.breaker.release_probe()
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for JSON-RPC framing and concurrent request dispatch.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from rpc_server import serve
+
+
+def frame(message):
+    body = json.dumps(message).encode("utf-8")
+    return f"Content-Length: {len(body)}\r\n\r\n".encode("utf-8") + body
+
+
+class RecordingWriter:
+    """
+    Collects the bytes ``serve`` writes, in place of the stdout pipe.
+    """
+
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def messages(self):
+        messages = []
+        data = self.data
+        while data:
+            header, _, data = data.partition(b"\r\n\r\n")
+            length = int(header.split(b":")[1])
+            messages.append(json.loads(data[:length]))
+            data = data[length:]
+        return messages
+
+
+class TestServe(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_overlapping_requests_complete_with_matching_ids(self):
+        started = []
+
+        async def echo(params):
+            started.append(params["text"])
+            await asyncio.sleep(params["delay"])
+            return {"text": params["text"]}
+
+        reader = asyncio.StreamReader()
+        reader.feed_data(frame({"jsonrpc": "2.0", "id": 1, "method": "echo", "params": {"text": "slow", "delay": 0.05}}))
+        reader.feed_data(frame({"jsonrpc": "2.0", "id": 2, "method": "echo", "params": {"text": "fast", "delay": 0.0}}))
+        reader.feed_eof()
+        writer = RecordingWriter()
+
+        await asyncio.wait_for(serve(reader, writer, {"echo": echo}), timeout=1)
+
+        responses = writer.messages()
+        self.assertEqual(started, ["slow", "fast"])
+        # The second request did not wait for the first, and each response carries its own id
+        self.assertEqual([response["id"] for response in responses], [2, 1])
+        self.assertEqual({response["id"]: response["result"]["text"] for response in responses}, {1: "slow", 2: "fast"})
+
+    async def test_unknown_method_gets_an_error_response(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(frame({"jsonrpc": "2.0", "id": 7, "method": "missing"}))
+        reader.feed_eof()
+        writer = RecordingWriter()
+
+        await serve(reader, writer, {})
+
+        (response,) = writer.messages()
+        self.assertEqual((response["id"], response["error"]["code"]), (7, -32601))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Tests for single-flight coalescing of identical in-flight LLM calls.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from llm.call_context import priority_scope
+from llm.gateway import LLMGateway
+from llm.single_flight import SingleFlight
+from llm.usage import USAGE
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "done"
+
+        results = await asyncio.gather(*(flight.run("key", call) for _ in range(3)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [("done", False), ("done", True), ("done", True)])
+        self.assertEqual(flight.in_flight(), 0)
+
+    async def test_every_waiter_gets_the_exception(self):
+        flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider failed")
+
+        results = await asyncio.gather(*(flight.run("key", call) for _ in range(2)), return_exceptions=True)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+    async def test_cancelling_one_waiter_leaves_the_call_running(self):
+        flight = SingleFlight()
+        finished = asyncio.Event()
+
+        async def call():
+            await asyncio.sleep(0.05)
+            finished.set()
+            return "done"
+
+        first = asyncio.ensure_future(flight.run("key", call))
+        second = asyncio.ensure_future(flight.run("key", call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        self.assertEqual(await second, ("done", True))
+        self.assertTrue(finished.is_set())
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+
+    async def test_cancelling_every_waiter_cancels_the_call(self):
+        flight = SingleFlight()
+        started = []
+        cancelled = asyncio.Event()
+
+        async def call():
+            started.append(1)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "done"
+
+        waiters = [asyncio.ensure_future(flight.run("key", call)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        self.assertEqual(flight.in_flight(), 0)
+
+        # The next caller starts a new call rather than joining the cancelled one
+        async def quick():
+            started.append(1)
+            return "again"
+
+        self.assertEqual(await flight.run("key", quick), ("again", False))
+        self.assertEqual(len(started), 2)
+
+    async def test_finished_calls_are_not_cached(self):
+        flight = SingleFlight()
+        results = iter(("first", "second"))
+
+        async def call():
+            return next(results)
+
+        self.assertEqual(await flight.run("key", call), ("first", False))
+        self.assertEqual(await flight.run("key", call), ("second", False))
+
+
+class TestGatewaySingleFlight(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        USAGE.reset()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def make_gateway(self):
+        config = {
+            "provider": "mock",
+            "model": "mock",
+            "mock": {"latency": {"default": {"distribution": "fixed", "seconds": 0.05}}},
+        }
+        return LLMGateway(config)
+
+    async def request(self, gateway, method, priority=None):
+        with USAGE.request_scope(method) as usage, priority_scope(priority):
+            await gateway.generate("Name one colour.", call_site="default")
+        return usage.to_dict()
+
+    async def test_joined_requests_record_a_shared_call(self):
+        gateway = self.make_gateway()
+        first, second = await asyncio.gather(self.request(gateway, "first"), self.request(gateway, "second"))
+
+        self.assertEqual(gateway.client_for("mock").usage_snapshot()["total"]["calls"], 1)
+        self.assertEqual((first["llm_calls"], first["shared_calls"]), (1, 0))
+        self.assertEqual((second["llm_calls"], second["shared_calls"]), (0, 1))
+        self.assertEqual(second["cost_usd"], 0.0)
+        self.assertEqual(second["by_call_site"]["default"]["shared_calls"], 1)
+        self.assertEqual(USAGE.snapshot()["methods"]["second"]["shared_calls"], 1)
+
+    async def test_calls_in_different_lanes_are_not_coalesced(self):
+        gateway = self.make_gateway()
+        background, interactive = await asyncio.gather(
+            self.request(gateway, "plan", "background"), self.request(gateway, "select", "interactive")
+        )
+
+        self.assertEqual(gateway.client_for("mock").usage_snapshot()["total"]["calls"], 2)
+        self.assertEqual(background["llm_calls"], 1)
+        self.assertEqual(interactive["llm_calls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests for tolerant JSON extraction and local schema validation of LLM responses.
+"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from exceptions import LLMResponseFormatError
+from llm.structured_output import extract_json, parse_structured, schema_for
+
+
+class TestExtractJson(unittest.TestCase):
+
+    def test_bare_json(self):
+        self.assertEqual(extract_json('  {"phases": []}\n'), {"phases": []})
+
+    def test_fenced_json(self):
+        text = 'Here is the plan:\n```json\n{"phases": [{"name": "A"}]}\n```\nLet me know.'
+        self.assertEqual(extract_json(text), {"phases": [{"name": "A"}]})
+
+    def test_unlabelled_fence_after_an_undecodable_one(self):
+        text = '```\nnot json\n```\nActually:\n```\n[1, 2]\n```'
+        self.assertEqual(extract_json(text), [1, 2])
+
+    def test_json_surrounded_by_prose(self):
+        text = 'Sure! {"score": 7, "justification": "ok"} Hope that helps.'
+        self.assertEqual(extract_json(text), {"score": 7, "justification": "ok"})
+
+    def test_skips_brackets_that_do_not_start_json(self):
+        text = 'Steps [see below]: {"steps": [{"prompt": "a"}]}'
+        self.assertEqual(extract_json(text), {"steps": [{"prompt": "a"}]})
+
+    def test_string_contents_are_not_rewritten(self):
+        text = 'Result: {"prompt": "Use ```code``` and \\"quotes\\"\\n"}'
+        self.assertEqual(extract_json(text), {"prompt": 'Use ```code``` and "quotes"\n'})
+
+    def test_no_json_raises_decode_error(self):
+        with self.assertRaises(json.JSONDecodeError):
+            extract_json("I cannot help with that.")
+
+    def test_truncated_json_raises_decode_error(self):
+        with self.assertRaises(json.JSONDecodeError):
+            extract_json('{"phases": [{"name": "A"')
+
+
+class TestParseStructured(unittest.TestCase):
+
+    def test_valid_response(self):
+        schema = schema_for("generate_tasks")
+        value = parse_structured('{"tasks": [{"name": "A", "description": "B", "atomic": true}]}', schema)
+        self.assertTrue(value["tasks"][0]["atomic"])
+
+    def test_schema_mismatch_raises_format_error(self):
+        with self.assertRaises(LLMResponseFormatError) as ctx:
+            parse_structured('{"tasks": [{"name": "A"}]}', schema_for("generate_tasks"))
+        self.assertIn("$.tasks[0]: missing required key 'description'", str(ctx.exception))
+
+    def test_glob_call_sites_and_free_text(self):
+        self.assertIs(schema_for("evaluate_phases"), schema_for("evaluate_*"))
+        self.assertIsNone(schema_for("execute_step"))
+
+
+if __name__ == "__main__":
+    unittest.main()
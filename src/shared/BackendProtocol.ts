@@ -110,10 +110,29 @@ export interface ExitParams {}
 
 // --- Reasoning Methods ---
 
+// Optional LLM usage block, added to a result when the request params set `includeUsage: true`
+interface LLMUsageTotals {
+	llm_calls: number
+	shared_calls: number // Answered by an identical call already in flight for another request; tokens and cost count there
+	prompt_tokens: number // Estimated
+	completion_tokens: number // Estimated
+	total_tokens: number
+	latency_seconds: number // Summed provider latency across calls
+	cost_usd: number // Priced via llm.pricing in config.yaml; 0 for unpriced models
+}
+export interface LLMUsage extends LLMUsageTotals {
+	by_call_site: Record<string, LLMUsageTotals & { models: string[] }> // e.g. "generate_steps"
+}
+
 // reasoning/generatePlan (Request Params)
 export interface GeneratePlanParams {
 	goal: string
 	context?: Record<string, any> | null
+	includeUsage?: boolean // Optional: attach a `usage` block to the result
+	taskId?: string // Optional: stream the plan as $/planProgress notifications
+	depth?: "phases" | "tasks" | "steps" // Optional: lazy plan down to this level (default "steps"); see reasoning/expandNode
+	planId?: string // Optional: plan id (generated if omitted); retrying a failed plan with the same id, goal and context resumes it
+	includeReasoning?: boolean // Optional: false omits reasoning metadata (alternatives, evaluations)
 }
 
 // reasoning/generatePlan (Result - Success)
@@ -126,24 +145,80 @@ interface BackendStep {
 interface BackendTask {
 	name: string
 	description: string
-	steps: BackendStep[]
+	atomic?: boolean // Single action; its only step is the task itself (adaptive depth)
+	steps?: BackendStep[] // Absent until expanded in a lazy plan
+}
+// Reasoning behind a generated list; alternatives are ids ("phases", "tasks/<p>" or "<id>/alt<n>" in `nodes`)
+export interface BackendReasoningEntry {
+	selected: string
+	alternatives: string[]
+	evaluations: Record<string, any>[] // Each names its alternative by id in `alternative`
+	justification: string
 }
 interface BackendPhase {
 	name: string
 	description: string
-	tasks: BackendTask[]
-	reasoning?: Record<string, any> // Optional reasoning metadata
+	tasks?: BackendTask[] // Absent until expanded in a lazy plan
+	reasoning?: { tasks?: BackendReasoningEntry; nodes?: Record<string, BackendTask[]> } // Absent with includeReasoning: false
 }
 export interface BackendChecklist {
 	goal: string
 	phases: BackendPhase[]
-	metadata?: Record<string, any> // Optional metadata
+	metadata?: Record<string, any> // Optional metadata; plan_id (lazy plans), schedule (per-node timings)
+}
+// $/planProgress (Notification Params), sent during reasoning/generatePlan or regenerateNode when a taskId was supplied
+export interface PlanProgressParams {
+	taskId: string
+	event: "phases_ready" | "tasks_ready" | "steps_ready" | "done"
+	phaseIndex?: number // tasks_ready, steps_ready
+	taskIndex?: number // steps_ready
+	phases?: Omit<BackendPhase, "tasks">[] // phases_ready
+	tasks?: Omit<BackendTask, "steps">[] // tasks_ready
+	steps?: BackendStep[] // steps_ready
 }
 export interface GeneratePlanResult {
 	// The handler directly returns the checklist structure
 	goal: string
 	phases: BackendPhase[]
 	metadata?: Record<string, any>
+	usage?: LLMUsage // Present when requested via includeUsage
+}
+
+// reasoning/regenerateNode (Request Params)
+export interface RegenerateNodeParams {
+	checklist: BackendChecklist // The plan the node belongs to; the rest of it is used as context
+	phaseIndex: number
+	taskIndex?: number // Optional: regenerate only this task's steps instead of the whole phase
+	taskId?: string // Optional: stream progress as $/planProgress notifications
+	includeUsage?: boolean // Optional: attach a `usage` block to the result
+}
+
+// reasoning/regenerateNode (Result - Success): only the replaced subtree
+export interface RegenerateNodeResult {
+	phaseIndex: number
+	taskIndex?: number
+	phase?: BackendPhase // Present when taskIndex was omitted
+	task?: BackendTask // Present when taskIndex was given
+	usage?: LLMUsage // Present when requested via includeUsage
+}
+
+// reasoning/expandNode (Request Params)
+export interface ExpandNodeParams {
+	planId: string // metadata.plan_id of a lazy plan from reasoning/generatePlan
+	phaseIndex: number
+	taskIndex?: number // Optional: expand this task's steps instead of the phase's tasks
+	taskId?: string // Optional: stream progress as $/planProgress notifications
+	includeUsage?: boolean // Optional: attach a `usage` block to the result
+}
+
+// reasoning/expandNode (Result - Success)
+export interface ExpandNodeResult {
+	planId: string
+	phaseIndex: number
+	taskIndex?: number
+	tasks?: BackendTask[] // Present when taskIndex was omitted (without steps)
+	steps?: BackendStep[] // Present when taskIndex was given
+	usage?: LLMUsage // Present when requested via includeUsage
 }
 
 // reasoning/refineSteps (Request Params)
@@ -158,11 +233,14 @@ export interface RefineStepsParams {
 		task_description?: string
 		// Add other relevant context fields if needed
 	}
+	taskId?: string // Optional: stream the revision as $/partialResult notifications
+	includeUsage?: boolean // Optional: attach a `usage` block to the result
 }
 
 // reasoning/refineSteps (Result - Success)
 export interface RefineStepsResult {
 	refined_steps: BackendStep[] // Returns the list of refined steps
+	usage?: LLMUsage // Present when requested via includeUsage
 }
 
 // reasoning/selectPersona (Request Params)
@@ -182,6 +260,8 @@ export interface AnalyzeAndRecoverParams {
 	error_details: Record<string, any> | string // Can be error object or stringified version
 	action_history: Array<Record<string, any>> | string // List of actions or stringified version
 	plan_state?: Record<string, any> | string | null // Optional plan state
+	taskId?: string // Optional: stream the analysis as $/partialResult notifications
+	includeUsage?: boolean // Optional: attach a `usage` block to the result
 }
 
 // reasoning/analyzeAndRecover (Result - Success)